@@ -0,0 +1,120 @@
+#
+# Blue Brain Nexus Forge is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Blue Brain Nexus Forge is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU Lesser
+# General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
+"""Compares the conversion of resources to JSON in one pass with the former hjson round-trip.
+
+Run from the root of the repository: python -m benchmarks.as_json [--resources 2000] [--repeat 7]
+"""
+import argparse
+import json
+import timeit
+from typing import Dict, List
+from unittest import mock
+
+import hjson
+
+from kgforge.core.commons.attributes import sort_attrs
+from kgforge.core.conversions.dataframe import as_dataframe
+from kgforge.core.conversions.json import as_json
+from kgforge.core.resource import Resource, encode
+from kgforge.core.wrappings.dict import wrap_dict
+
+
+def hjson_as_json(resource: Resource, store_metadata: bool) -> Dict:
+    # The implementation of kgforge.core.conversions.json._as_json replaced by the one-pass encoder.
+    data = json.loads(hjson.dumpsJSON(resource, default=encode, item_sort_key=sort_attrs))
+    _remove_context(data)
+    if store_metadata is True and resource._store_metadata:
+        data.update(json.loads(hjson.dumpsJSON(resource._store_metadata, item_sort_key=sort_attrs)))
+    return data
+
+
+def _remove_context(data) -> None:
+    if isinstance(data, dict):
+        data.pop("context", None)
+        for value in data.values():
+            _remove_context(value)
+    elif isinstance(data, list):
+        for x in data:
+            _remove_context(x)
+
+
+def make_resources(count: int) -> List[Resource]:
+    resources = []
+    for i in range(count):
+        resource = Resource(
+            id=f"https://example.org/datasets/{i}",
+            type="Dataset",
+            context="https://example.org/context",
+            name=f"dataset {i}",
+            description="A dataset with a few distributions and a contribution.",
+            distribution=[
+                Resource(
+                    type="DataDownload",
+                    name=f"file-{i}-{j}.csv",
+                    contentSize=Resource(unitCode="bytes", value=1024 * j),
+                    encodingFormat="text/csv",
+                )
+                for j in range(3)
+            ],
+            contribution=Resource(type="Contribution", agent=Resource(id="https://example.org/agents/a")),
+        )
+        resource._store_metadata = wrap_dict({
+            "_self": f"https://example.org/resources/{i}",
+            "_rev": 1,
+            "_deprecated": False,
+            "_createdAt": "2024-01-01T00:00:00.000Z",
+            "_createdBy": "https://example.org/users/u",
+        })
+        resources.append(resource)
+    return resources
+
+
+def best(statement, repeat: int) -> float:
+    return min(timeit.repeat(statement, number=1, repeat=repeat))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resources", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    resources = make_resources(args.resources)
+    assert as_json(resources, False, True, None, None, None) == [hjson_as_json(r, True) for r in resources]
+
+    def one_pass_json():
+        as_json(resources, False, True, None, None, None)
+
+    def round_trip_json():
+        with mock.patch("kgforge.core.conversions.json._as_json", hjson_as_json):
+            as_json(resources, False, True, None, None, None)
+
+    def one_pass_dataframe():
+        as_dataframe(resources, None, ".", False, True, None, None, None)
+
+    def round_trip_dataframe():
+        with mock.patch("kgforge.core.conversions.json._as_json", hjson_as_json):
+            as_dataframe(resources, None, ".", False, True, None, None, None)
+
+    print(f"{args.resources} resources with store metadata, best of {args.repeat} runs")
+    for name, round_trip, one_pass in [
+        ("as_json", round_trip_json, one_pass_json),
+        ("as_dataframe", round_trip_dataframe, one_pass_dataframe),
+    ]:
+        before, after = best(round_trip, args.repeat), best(one_pass, args.repeat)
+        print(f"  {name + ':':<14}{before * 1000:.0f} ms -> {after * 1000:.0f} ms (x{before / after:.1f})")
+
+
+if __name__ == "__main__":
+    main()
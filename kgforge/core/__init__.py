@@ -14,3 +14,4 @@
 
 from .resource import Resource
 from .forge import KnowledgeGraphForge
+from .async_forge import AsyncKnowledgeGraphForge
@@ -199,6 +199,10 @@ class Model(ABC):
         # POLICY Should notify of failures with exception ValidationError including a message.
         ...
 
+    def close(self) -> None:
+        # POLICY Should release the processes and other resources held by the model.
+        pass
+
     # Utils.
 
     def _initialize_service(self, source: str, **source_config) -> Any:
@@ -11,21 +11,27 @@
 #
 # You should have received a copy of the GNU Lesser General Public License
 # along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
+import hashlib
 import time
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from pandas import DataFrame
 
 from kgforge.core.resource import Resource
 from kgforge.core.archetypes.model import Model
 from kgforge.core.archetypes.resolver import Resolver
 from kgforge.core.commons.attributes import repr_class
 from kgforge.core.commons.context import Context
+from kgforge.core.commons.query_cache import QueryCache
+from kgforge.core.commons.resource_cache import ResourceCache
 from kgforge.core.commons.exceptions import (
     DownloadingError,
 )
-from kgforge.core.commons.execution import not_supported
-from kgforge.core.commons.sparql_query_builder import SPARQLQueryBuilder
+from kgforge.core.commons.execution import not_supported, paginate
+from kgforge.core.commons.sparql_query_builder import PreparedSparql, SPARQLQueryBuilder
+from kgforge.core.conversions.dataframe import sparql_results_as_dataframe
 from kgforge.core.reshaping import collect_values, collect_values_jp
 from kgforge.core.wrappings import Filter
 from kgforge.core.wrappings.dict import DictWrapper
@@ -48,8 +54,16 @@ class ReadOnlyStore(ABC):
     def __init__(
             self,
             model: Optional[Model] = None,
+            query_cache: Optional[Dict] = None,
+            resource_cache: Optional[Dict] = None,
     ) -> None:
         self.model: Optional[Model] = model
+        # Results of sparql() and elastic() are cached only when a configuration is given, even empty.
+        self.query_cache: Optional[QueryCache] = QueryCache(**query_cache) \
+            if query_cache is not None else None
+        # Likewise for the resources returned by retrieve().
+        self.resource_cache: Optional[ResourceCache] = ResourceCache(**resource_cache) \
+            if resource_cache is not None else None
 
     def __repr__(self) -> str:
         return repr_class(self)
@@ -125,33 +139,53 @@ class ReadOnlyStore(ABC):
         dirpath = Path(path)
         dirpath.mkdir(parents=True, exist_ok=True)
         timestamp = time.strftime("%Y%m%d%H%M%S")
-        filepaths = []
-        buckets = []
         download_urls = []
-        download_store_metadata = []
+        buckets = []
         for i, x in enumerate(urls):
             x_download_url, x_bucket = self._prepare_download_one(x, store_metadata[i],
                                                                   cross_bucket)
-            filename, store_content_type = self._retrieve_filename(x_download_url)
-            if not content_type or (content_type and store_content_type == content_type):
-                filepath = dirpath / filename
-                if not overwrite and filepath.exists():
-                    filepaths.append(f"{filepath}.{timestamp}")
-                else:
-                    filepaths.append(str(filepath))
-                download_urls.append(x_download_url)
-                buckets.append(x_bucket)
-                download_store_metadata.append(store_metadata[i])
+            download_urls.append(x_download_url)
+            buckets.append(x_bucket)
+        downloaded = self._download_files(download_urls, store_metadata, buckets, dirpath, overwrite,
+                                          timestamp, cross_bucket, content_type)
+        if downloaded == 0:
+            raise DownloadingError(
+                f"No resource with content_type {content_type} was found when following the resource path '{follow}'."
+            )
+
+    def _download_files(
+            self,
+            urls: List[str],
+            store_metadata: List[Optional[DictWrapper]],
+            buckets: List[str],
+            dirpath: Path,
+            overwrite: bool,
+            timestamp: str,
+            cross_bucket: bool,
+            content_type: Optional[str]
+    ) -> int:
+        # Returns the number of downloaded files, i.e. the ones with content_type when given.
+        # Retrieving the file names could be pipelined with the downloads by overriding this method
+        # in the specialization.
+        # POLICY Should follow self._download_one() policies.
+        filepaths = []
+        download_urls = []
+        download_store_metadata = []
+        download_buckets = []
+        for url, store_m, bucket in zip(urls, store_metadata, buckets):
+            filename, store_content_type = self._retrieve_filename(url)
+            if not content_type or store_content_type == content_type:
+                filepaths.append(_download_path(dirpath, filename, overwrite, timestamp))
+                download_urls.append(url)
+                download_store_metadata.append(store_m)
+                download_buckets.append(bucket)
         if len(download_urls) > 1:
             self._download_many(download_urls, filepaths, download_store_metadata, cross_bucket,
-                                content_type, buckets)
+                                content_type, download_buckets)
         elif len(download_urls) == 1:
             self._download_one(download_urls[0], filepaths[0], download_store_metadata[0],
-                               cross_bucket, content_type, buckets[0])
-        else:
-            raise DownloadingError(
-                f"No resource with content_type {content_type} was found when following the resource path '{follow}'."
-            )
+                               cross_bucket, content_type, download_buckets[0])
+        return len(download_urls)
 
     def _download_many(
             self,
@@ -209,27 +243,50 @@ class ReadOnlyStore(ABC):
         # TODO These two operations might be abstracted here when other stores will be implemented.
         ...
 
-    def sparql(
-            self, query: str,
-            debug: bool,
-            limit: int = DEFAULT_LIMIT,
-            offset: int = DEFAULT_OFFSET,
-            **params
-    ) -> List[Resource]:
-        rewrite = params.get("rewrite", True)
+    def search_iter(
+            self, resolvers: Optional[List[Resolver]], *filters: Union[Dict, Filter], page_size: int,
+            prefetch: bool, **params
+    ) -> Iterator[Resource]:
+        # Paginated search could be optimized by overriding this method in the specialization.
+        # POLICY Should yield the resources of search() page by page, with at most page_size of them per page.
+        # POLICY Should follow self.search() policies.
+        params.pop("limit", None)
+        offset = params.pop("offset", None) or DEFAULT_OFFSET
+
+        def fetch_page(offset: int) -> Tuple[List[Resource], Optional[int]]:
+            page = self.search(*filters, resolvers=resolvers, **params, limit=page_size, offset=offset)
+            return page, offset + page_size if len(page) == page_size else None
 
+        return paginate(fetch_page, offset, prefetch)
+
+    def prepare_sparql(self, query: str, rewrite: bool) -> PreparedSparql:
+        # POLICY Should do the work which does not depend on the values bound at execution, e.g. rewriting.
         if self.model_context() is not None and rewrite:
 
             context_as_dict, prefixes, vocab = self.get_context_prefix_vocab()
 
-            qr = SPARQLQueryBuilder.rewrite_sparql(
+            query = SPARQLQueryBuilder.rewrite_sparql(
                 query,
                 context_as_dict=context_as_dict,
                 prefixes=prefixes,
                 vocab=vocab
             )
+
+        return PreparedSparql(query)
+
+    def sparql(
+            self, query: Union[str, PreparedSparql],
+            debug: bool,
+            limit: int = DEFAULT_LIMIT,
+            offset: int = DEFAULT_OFFSET,
+            **params
+    ) -> Union[List[Resource], DataFrame]:
+        if isinstance(query, PreparedSparql):
+            statement = query
         else:
-            qr = query
+            statement = self.prepare_sparql(query, params.get("rewrite", True))
+
+        qr = statement.bind(params.get("bindings", None))
 
         qr = SPARQLQueryBuilder.apply_limit_and_offset_to_query(
             qr,
@@ -242,15 +299,49 @@ class ReadOnlyStore(ABC):
         if debug:
             SPARQLQueryBuilder.debug_query(qr)
 
-        return self._sparql(qr, view=params.get("view", None))
+        view = params.get("view", None)
+        if params.get("as_dataframe", False):
+            if statement.form != "SELECT":
+                raise ValueError("as_dataframe is only supported for SELECT queries")
+            return self._cached_query(
+                ("sparql_dataframe", qr, view),
+                lambda: sparql_results_as_dataframe(self._sparql_results(qr, view))
+            )
+        return self._cached_query(("sparql", qr, view), lambda: self._sparql(qr, view, statement.form))
+
+    def sparql_iter(
+            self, query: Union[str, PreparedSparql], debug: bool, page_size: int, prefetch: bool, **params
+    ) -> Iterator[Resource]:
+        # Paginated querying could be optimized by overriding this method in the specialization.
+        # POLICY Should yield the results of sparql() page by page, with at most page_size of them per page.
+        # The query should have an ORDER BY clause for the pages to be consistent with each other.
+        offset = params.pop("offset", None) or DEFAULT_OFFSET
+        # pages are iterated as resources
+        params.pop("as_dataframe", None)
+        if not isinstance(query, PreparedSparql):
+            # rewritten once for all pages
+            query = self.prepare_sparql(query, params.pop("rewrite", True))
+
+        def fetch_page(offset: int) -> Tuple[List[Resource], Optional[int]]:
+            page = self.sparql(query, debug, page_size, offset, **params)
+            return page, offset + page_size if len(page) == page_size else None
+
+        return paginate(fetch_page, offset, prefetch)
 
     @abstractmethod
-    def _sparql(self, query: str, view: Optional[str]) -> Optional[Union[List[Resource], Resource]]:
+    def _sparql(
+            self, query: str, view: Optional[str], form: Optional[str]
+    ) -> Optional[Union[List[Resource], Resource]]:
         # POLICY Should notify of failures with exception QueryingError including a message.
         # POLICY Resource _store_metadata should not be set (default is None).
         # POLICY Resource _synchronized should not be set (default is False).
         ...
 
+    def _sparql_results(self, query: str, view: Optional[str]) -> Dict:
+        # POLICY Should return the SPARQL query results JSON format (i.e. with head and results keys) as sent.
+        # POLICY Should notify of failures with exception QueryingError including a message.
+        raise not_supported()
+
     @abstractmethod
     def elastic(
             self, query: str, debug: bool, limit: int = None, offset: int = None, **params
@@ -280,5 +371,40 @@ class ReadOnlyStore(ABC):
         """
         ...
 
+    def _cached_query(self, key: Tuple, query: Callable[[], Any]) -> Any:
+        # key should identify the final query sent to the store, e.g. after rewriting, limit and offset.
+        if self.query_cache is None:
+            return query()
+        # Results depend on what the user is allowed to read: users are told apart by a digest of their token.
+        token = getattr(self, "token", None)
+        identity = hashlib.sha256(token.encode("utf-8")).hexdigest() if token else None
+        key = (type(self).__name__, getattr(self, "endpoint", None), getattr(self, "bucket", None), identity) + key
+        found, results = self.query_cache.get(key)
+        if not found:
+            results = query()
+            self.query_cache.put(key, results)
+        return results
+
+    def clear_query_cache(self) -> None:
+        # POLICY Should be called after writes to the store so that cached query results are not stale.
+        if self.query_cache is not None:
+            self.query_cache.clear()
+
+    def clear_resource_cache(self, data: Union[Resource, List[Resource]]) -> None:
+        # POLICY Should be called after writes to the store with the written resources so that they are not stale.
+        if self.resource_cache is not None:
+            self.resource_cache.invalidate([data] if isinstance(data, Resource) else data)
+
     def model_context(self):
         return self.model.context() if self.model else None
+
+    def close(self) -> None:
+        # POLICY Should release the connections and other resources held by the store service.
+        pass
+
+
+def _download_path(dirpath: Path, filename: str, overwrite: bool, timestamp: str) -> str:
+    filepath = dirpath / filename
+    if not overwrite and filepath.exists():
+        return f"{filepath}.{timestamp}"
+    return str(filepath)
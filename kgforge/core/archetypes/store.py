@@ -14,7 +14,7 @@
 import json
 from abc import abstractmethod
 from pathlib import Path
-from typing import Any, Dict, List,  Optional, Union, Type, Match
+from typing import Any, Dict, Iterable, Iterator, List,  Optional, Tuple, Union, Type, Match
 
 from kgforge.core.archetypes.read_only_store import ReadOnlyStore, DEFAULT_LIMIT, DEFAULT_OFFSET
 from kgforge.core.archetypes.model import Model
@@ -32,7 +32,7 @@ from kgforge.core.commons.exceptions import (
     UpdatingError,
     UploadingError
 )
-from kgforge.core.commons.execution import run
+from kgforge.core.commons.execution import paginate, run, run_stream
 
 
 class Store(ReadOnlyStore):
@@ -55,9 +55,11 @@ class Store(ReadOnlyStore):
             versioned_id_template: Optional[str] = None,
             file_resource_mapping: Optional[str] = None,
             searchendpoints: Optional[Dict] = None,
+            query_cache: Optional[Dict] = None,
+            resource_cache: Optional[Dict] = None,
             **store_config,
     ) -> None:
-        super().__init__(model)
+        super().__init__(model, query_cache, resource_cache)
         self.endpoint: Optional[str] = endpoint
         self.bucket: Optional[str] = bucket
         self.token: Optional[str] = token
@@ -123,6 +125,23 @@ class Store(ReadOnlyStore):
         # POLICY Resource _store_metadata should be set using wrappers.dict.wrap_dict().
         ...
 
+    def register_stream(
+            self, data: Iterable[Resource], schema_id: Optional[str], window: int
+    ) -> Iterator[Resource]:
+        # Streamed registration could be optimized by overriding this method in the specialization.
+        # POLICY Should pull resources lazily from data and never materialize it.
+        # POLICY Should yield each resource once registered, with at most window of them in flight.
+        # POLICY Should reproduce self._register_one() and execution._run_one() behaviours.
+        return run_stream(
+            self._register_one,
+            data,
+            required_synchronized=False,
+            execute_actions=True,
+            exception=RegistrationError,
+            monitored_status="_synchronized",
+            schema_id=schema_id,
+        )
+
     # This expected that '@catch' is not used here. This is for actions.execute_lazy_actions().
     def upload(
             self, path: str, content_type: str, forge: Optional['KnowledgeGraphForge']
@@ -262,13 +281,32 @@ class Store(ReadOnlyStore):
         if debug:
             ESQueryBuilder.debug_query(query_dict)
 
-        return self._elastic(
-            query_dict,
-            view=params.get("view", None),
-            as_resource=params.get("as_resource", True),
-            build_resource_from=params.get("build_resource_from", "source")
+        view = params.get("view", None)
+        as_resource = params.get("as_resource", True)
+        build_resource_from = params.get("build_resource_from", "source")
+        return self._cached_query(
+            ("elastic", json.dumps(query_dict, sort_keys=True), view, as_resource, build_resource_from),
+            lambda: self._elastic(
+                query_dict,
+                view=view,
+                as_resource=as_resource,
+                build_resource_from=build_resource_from
+            )
         )
 
+    def elastic_iter(
+            self, query: str, debug: bool, page_size: int, prefetch: bool, **params
+    ) -> Iterator[Union[Resource, Dict]]:
+        # Paginated querying could be optimized by overriding this method in the specialization.
+        # POLICY Should yield the results of elastic() page by page, with at most page_size of them per page.
+        offset = params.pop("offset", None) or DEFAULT_OFFSET
+
+        def fetch_page(offset: int) -> Tuple[List[Union[Resource, Dict]], Optional[int]]:
+            page = self.elastic(query, debug, page_size, offset, **params)
+            return page, offset + page_size if len(page) == page_size else None
+
+        return paginate(fetch_page, offset, prefetch)
+
     @abstractmethod
     def _elastic(
             self, query: Dict, view: Optional[str], as_resource: bool, build_resource_from: str
@@ -0,0 +1,154 @@
+#
+# Blue Brain Nexus Forge is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Blue Brain Nexus Forge is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU Lesser
+# General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Union
+
+from pandas import DataFrame
+
+from kgforge.core.commons.execution import run_in_thread
+from kgforge.core.commons.sparql_query_builder import PreparedSparql
+from kgforge.core.forge import KnowledgeGraphForge
+from kgforge.core.resource import Resource
+from kgforge.core.wrappings.paths import Filter
+
+
+class AsyncKnowledgeGraphForge:
+
+    # POLICY Class name should be imported in the corresponding module __init__.py.
+
+    def __init__(self, forge: KnowledgeGraphForge, max_workers: int = 1) -> None:
+        """
+        Wrap a Knowledge Graph forge session to use it from coroutines without blocking their event loop.
+        Use AsyncKnowledgeGraphForge.create() to also configure the forge without blocking.
+
+        The network requests made concurrently by the store (e.g. bulk registration or retrieval) run on the event loop
+        awaiting the operation, with a connection pool shared by all the operations awaited from this loop. The rest of
+        each operation (e.g. mapping, validation, conversions) runs in a thread.
+
+        :param forge: the forge session to wrap
+        :param max_workers: the maximum number of operations running at the same time
+        """
+        if max_workers <= 0:
+            raise ValueError(f"max_workers value should be greater than 0 but {max_workers} is provided")
+        self.forge: KnowledgeGraphForge = forge
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    @classmethod
+    async def create(
+        cls, configuration: Union[str, Dict], max_workers: int = 1, **kwargs
+    ) -> "AsyncKnowledgeGraphForge":
+        """
+        Configure and create a Knowledge Graph forge session. See KnowledgeGraphForge.__init__() for the configuration.
+
+        :param configuration: the forge configuration, as a YAML file path, inline YAML or a dictionary
+        :param max_workers: the maximum number of operations running at the same time
+        :param kwargs: overrides of the Store configuration
+        :return: AsyncKnowledgeGraphForge
+        """
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            forge = await run_in_thread(executor, KnowledgeGraphForge, configuration, **kwargs)
+        finally:
+            executor.shutdown(wait=False)
+        return cls(forge, max_workers)
+
+    # Querying User Interface.
+
+    async def aretrieve(
+        self,
+        id: Union[str, List[str]],
+        version: Optional[Union[int, str, List[Union[str, int]]]] = None,
+        cross_bucket: bool = False,
+        **params
+    ) -> Union[Optional[Resource], List[Optional[Resource]]]:
+        """See KnowledgeGraphForge.retrieve()."""
+        return await run_in_thread(self._executor, self.forge.retrieve, id, version, cross_bucket, **params)
+
+    async def asearch(self, *filters: Union[Dict, Filter], **params) -> List[Resource]:
+        """See KnowledgeGraphForge.search()."""
+        return await run_in_thread(self._executor, self.forge.search, *filters, **params)
+
+    async def asparql(
+        self,
+        query: Union[str, PreparedSparql],
+        debug: bool = False,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        **params
+    ) -> Union[List[Resource], DataFrame]:
+        """See KnowledgeGraphForge.sparql()."""
+        return await run_in_thread(self._executor, self.forge.sparql, query, debug, limit, offset, **params)
+
+    async def aelastic(
+        self,
+        query: str,
+        debug: bool = False,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        **params
+    ) -> Union[List[Resource], Resource, List[Dict], Dict]:
+        """See KnowledgeGraphForge.elastic()."""
+        return await run_in_thread(self._executor, self.forge.elastic, query, debug, limit, offset, **params)
+
+    async def adownload(
+        self,
+        data: Union[Resource, List[Resource]],
+        follow: str = "distribution.contentUrl",
+        path: str = ".",
+        overwrite: bool = False,
+        cross_bucket: bool = False,
+        content_type: str = None,
+    ) -> None:
+        """See KnowledgeGraphForge.download()."""
+        await run_in_thread(
+            self._executor, self.forge.download, data, follow, path, overwrite, cross_bucket, content_type
+        )
+
+    # Storing User Interface.
+
+    async def aregister(
+        self, data: Union[Resource, List[Resource]], schema_id: Optional[str] = None
+    ) -> None:
+        """See KnowledgeGraphForge.register()."""
+        await run_in_thread(self._executor, self.forge.register, data, schema_id)
+
+    async def aupdate(
+        self, data: Union[Resource, List[Resource]], schema_id: Optional[str] = None
+    ) -> None:
+        """See KnowledgeGraphForge.update()."""
+        await run_in_thread(self._executor, self.forge.update, data, schema_id)
+
+    async def adeprecate(self, data: Union[Resource, List[Resource]]) -> None:
+        """See KnowledgeGraphForge.deprecate()."""
+        await run_in_thread(self._executor, self.forge.deprecate, data)
+
+    # Versioning User Interface.
+
+    async def atag(self, data: Union[Resource, List[Resource]], value: str) -> None:
+        """See KnowledgeGraphForge.tag()."""
+        await run_in_thread(self._executor, self.forge.tag, data, value)
+
+    async def aclose(self) -> None:
+        """
+        Release the connections held by the configured store, including the ones of the event loop awaiting the
+        operations, and the processes held by the configured model. The forge should not be used afterwards.
+        """
+        await run_in_thread(self._executor, self.forge.close)
+        self._executor.shutdown()
+
+    async def __aenter__(self) -> "AsyncKnowledgeGraphForge":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
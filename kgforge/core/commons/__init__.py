@@ -12,5 +12,6 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
 
-from .context import Context
+from .context import Context, ContextRegistry, context_registry
+from .query_cache import QueryCache
 from .parser import _parse_type
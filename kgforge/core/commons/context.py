@@ -12,7 +12,11 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
 
-from typing import Optional, Union, Dict, List
+import hashlib
+import json
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Hashable, Optional, Union, Dict, List
 from rdflib.plugins.shared.jsonld.context import (
     source_to_json,
     Context as JSONLD_Context,
@@ -69,3 +73,62 @@ class Context(JSONLD_Context):
 
     def has_vocab(self):
         return self.vocab is not None
+
+
+class ContextRegistry:
+    """Process-wide registry of Context instances interned by IRI or by content.
+
+    Building a Context resolves its document and indexes its terms and prefixes. The registry does it once per
+    distinct context so that converting many resources reuses the same Context and its term indexes. The least
+    recently used contexts are evicted beyond 'maxsize'. Registered contexts are shared: they should not be modified.
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self._contexts: "OrderedDict[Hashable, Context]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(
+        self,
+        document: Union[Dict, List, str],
+        iri: Optional[str] = None,
+        factory: Optional[Callable[[], Context]] = None,
+        resolver: Optional[Hashable] = None,
+    ) -> Context:
+        """Returns the Context registered for document and iri, building it first if needed.
+
+        Contexts built by a factory resolving the document with a resolver (e.g. through a store) are registered
+        apart from the ones loaded directly and from the ones resolved by other resolvers.
+
+        Args:
+            document (Dict, List, str): resolved or resolvable document
+            iri (str): the iri for the provided document
+            factory (Callable): builds the Context when it is not registered, default to Context(document, iri)
+            resolver (Hashable): what the factory resolves the document with, default to None for a direct load
+        """
+        key = (self._key(document), iri, resolver)
+        with self._lock:
+            context = self._contexts.get(key)
+            if context is not None:
+                self._contexts.move_to_end(key)
+                return context
+        context = factory() if factory else Context(document, iri)
+        with self._lock:
+            self._contexts[key] = context
+            if len(self._contexts) > self.maxsize:
+                self._contexts.popitem(last=False)
+        return context
+
+    def clear(self) -> None:
+        with self._lock:
+            self._contexts.clear()
+
+    @staticmethod
+    def _key(document: Union[Dict, List, str]) -> Hashable:
+        if isinstance(document, str):
+            return "iri", document
+        content = json.dumps(document, sort_keys=True, default=str)
+        return "content", hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+context_registry = ContextRegistry()
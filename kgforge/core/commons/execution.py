@@ -12,10 +12,13 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
 
+import asyncio
+import contextvars
 import inspect
 import traceback
+from concurrent.futures import Executor, ThreadPoolExecutor
 from functools import wraps
-from typing import Any, Callable, List, Optional, Tuple, Union, Type
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple, Union, Type
 import requests
 
 from kgforge.core.resource import Resource
@@ -26,6 +29,9 @@ from kgforge.core.commons.exceptions import NotSupportedError, RunException
 
 # POLICY Should have only one function called 'wrapper'. See catch().
 
+# Event loop of the coroutine awaiting the operation run by the current thread, if any. See run_in_thread().
+_awaiting_loop: contextvars.ContextVar = contextvars.ContextVar("awaiting_loop", default=None)
+
 
 def not_supported(arg: Optional[Tuple[str, Any]] = None) -> Exception:
     # TODO When 'arg' is specified, compare with the value in the frame to know if it applies.
@@ -140,6 +146,70 @@ def run(
         raise TypeError("not a Resource nor a list of Resource")
 
 
+def run_stream(
+        fun_one: Callable,
+        data: Iterable[Resource],
+        exception: Type[RunException],
+        id_required: bool = False,
+        required_synchronized: Optional[bool] = None,
+        execute_actions: bool = False,
+        monitored_status: Optional[str] = None,
+        **kwargs
+) -> Iterator[Resource]:
+    # POLICY Should be called for operations on streamed resources where recovering from errors is needed.
+    # Resources are pulled from data one at a time and yielded once processed, without printing actions.
+    for resource in data:
+        if not isinstance(resource, Resource):
+            raise TypeError("not a Resource")
+        _run_one(fun_one, resource, exception, id_required, required_synchronized, execute_actions,
+                 monitored_status, True, **kwargs)
+        yield resource
+
+
+def paginate(
+        fetch_page: Callable[[Any], Tuple[List[Any], Optional[Any]]],
+        cursor: Any,
+        prefetch: bool
+) -> Iterator[Any]:
+    # POLICY Should be called for operations iterating over all the pages of a query result.
+    # fetch_page(cursor) returns the items of a page and the cursor of the next one, None after the last page.
+    # When prefetch is True, the next page is fetched in a background thread while the current one is consumed.
+    if not prefetch:
+        while cursor is not None:
+            items, cursor = fetch_page(cursor)
+            yield from items
+        return
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(fetch_page, cursor)
+    try:
+        while future is not None:
+            items, cursor = future.result()
+            future = executor.submit(fetch_page, cursor) if cursor is not None else None
+            yield from items
+    finally:
+        # The consumer may stop iterating early: a page being prefetched is discarded.
+        if future is not None:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def awaiting_loop() -> Optional[asyncio.AbstractEventLoop]:
+    # POLICY Specializations should run their coroutines on this loop when there is one instead of on their own.
+    return _awaiting_loop.get()
+
+
+async def run_in_thread(executor: Executor, fun: Callable, *args, **kwargs) -> Any:
+    # The blocking parts of fun run in a thread of executor while its coroutines run on the running loop.
+    loop = asyncio.get_running_loop()
+
+    def call() -> Any:
+        _awaiting_loop.set(loop)
+        return fun(*args, **kwargs)
+
+    return await loop.run_in_executor(executor, contextvars.copy_context().run, call)
+
+
 def _run_many(fun: Callable, resources: List[Resource], *args, **kwargs) -> None:
     for x in resources:
         _run_one(fun, x, *args, **kwargs)
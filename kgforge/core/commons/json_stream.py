@@ -0,0 +1,112 @@
+#
+# Blue Brain Nexus Forge is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Blue Brain Nexus Forge is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU Lesser
+# General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
+import codecs
+import json
+from typing import Any, Iterable, Iterator, Sequence
+
+# consumed text is dropped from the buffer once it is longer than this
+_COMPACTION_SIZE = 64 * 1024
+_WHITESPACE = " \t\n\r"
+_NUMBER = "-+.eE0123456789"
+
+
+def iter_json_array(chunks: Iterable[bytes], path: Sequence[str]) -> Iterator[Any]:
+    """Yield the items of the array found at path in a JSON document received as UTF-8 chunks.
+
+    Only one item and the chunk being read are held in memory at a time, e.g. the bindings of a SPARQL result
+    with path ("results", "bindings"). The members preceding path are skipped and the ones following the array
+    are not read. Nothing is yielded if path is missing. json.JSONDecodeError is raised on malformed documents.
+    """
+    reader = _Reader(chunks)
+    for depth, key in enumerate(path):
+        reader.expect("{")
+        while True:
+            if reader.next_is("}"):
+                return
+            member = reader.value()
+            reader.expect(":")
+            if member == key:
+                break
+            reader.value()
+            if not reader.next_is(","):
+                reader.expect("}")
+                return
+    reader.expect("[")
+    if reader.next_is("]"):
+        return
+    while True:
+        yield reader.value()
+        if not reader.next_is(","):
+            reader.expect("]")
+            return
+
+
+class _Reader:
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._exhausted = False
+
+    def value(self) -> Any:
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._read():
+                    continue
+                raise
+            # a number ending the buffer could go on in the next chunk, e.g. 1.5 received as 1 and .5
+            if self._buffer[self._pos] in _NUMBER and self._buffer[end:end + 1] in ("", *_NUMBER) and self._read():
+                continue
+            self._pos = end
+            return value
+
+    def next_is(self, char: str) -> bool:
+        self._skip_whitespace()
+        if self._buffer.startswith(char, self._pos):
+            self._pos += 1
+            return True
+        return False
+
+    def expect(self, char: str) -> None:
+        if not self.next_is(char):
+            raise json.JSONDecodeError(f"Expecting '{char}'", self._buffer, self._pos)
+
+    def _skip_whitespace(self) -> None:
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer) or not self._read():
+                return
+
+    def _read(self) -> bool:
+        # Appends the next chunk to the buffer. False when the document was entirely read.
+        if self._exhausted:
+            return False
+        if self._pos > _COMPACTION_SIZE:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        for chunk in self._chunks:
+            text = self._decoder.decode(chunk)
+            if text:
+                self._buffer += text
+                return True
+        self._buffer += self._decoder.decode(b"", final=True)
+        self._exhausted = True
+        return True
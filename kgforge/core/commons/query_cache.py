@@ -0,0 +1,160 @@
+#
+# Blue Brain Nexus Forge is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Blue Brain Nexus Forge is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU Lesser
+# General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Hashable, Optional, Tuple, Union
+
+
+class QueryCache:
+    """Cache of query results, keyed by the final query sent to the store and by who sent it.
+
+    Results are kept pickled so that each hit returns fresh copies that callers can modify, and so that their size
+    is known. Entries expire 'ttl' seconds after being stored. The least recently used ones are evicted beyond
+    'maxsize' entries or 'max_bytes' bytes. When 'directory' is given, results are also written there and looked up
+    on a memory miss, e.g. by another session, until they expire. As results are unpickled from it, the directory
+    should only be writable by trusted users.
+    """
+
+    SUFFIX = ".query"
+
+    def __init__(
+        self,
+        maxsize: int = 1000,
+        ttl: Optional[float] = 300,
+        max_bytes: Optional[int] = None,
+        directory: Optional[Union[str, Path]] = None,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.directory = Path(directory).expanduser() if directory else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self._entries: "OrderedDict[Hashable, Tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Returns whether results are cached for key and a copy of them."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[0], now):
+                self._remove(key)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None and self.directory is not None:
+            entry = self._load(key, now)
+            if entry is not None:
+                with self._lock:
+                    self._add(key, entry)
+        results = None
+        if entry is not None:
+            try:
+                results = pickle.loads(entry[1])
+            except Exception:
+                # unreadable results are treated as a cache miss
+                self._discard(key)
+                entry = None
+        with self._lock:
+            if entry is None:
+                self._misses += 1
+                return False, None
+            self._hits += 1
+        return True, results
+
+    def put(self, key: Hashable, results: Any) -> None:
+        entry = (time.time(), pickle.dumps(results, protocol=pickle.HIGHEST_PROTOCOL))
+        with self._lock:
+            self._add(key, entry)
+        if self.directory is not None:
+            self._save(key, entry)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self.directory is not None:
+            for path in self.directory.glob(f"*{self.SUFFIX}"):
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def _discard(self, key: Hashable) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+        if self.directory is not None:
+            self._path(key).unlink(missing_ok=True)
+
+    def _expired(self, stored: float, now: float) -> bool:
+        return self.ttl is not None and now - stored > self.ttl
+
+    def _add(self, key: Hashable, entry: Tuple[float, bytes]) -> None:
+        if key in self._entries:
+            self._remove(key)
+        if self.max_bytes is not None and len(entry[1]) > self.max_bytes:
+            return
+        self._entries[key] = entry
+        self._bytes += len(entry[1])
+        while len(self._entries) > self.maxsize or (self.max_bytes is not None and self._bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+            self._evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        _, data = self._entries.pop(key)
+        self._bytes -= len(data)
+
+    def _path(self, key: Hashable) -> Path:
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}{self.SUFFIX}"
+
+    def _load(self, key: Hashable, now: float) -> Optional[Tuple[float, bytes]]:
+        path = self._path(key)
+        try:
+            stored = path.stat().st_mtime
+            if self._expired(stored, now):
+                path.unlink(missing_ok=True)
+                return None
+            return stored, path.read_bytes()
+        except OSError:
+            return None
+
+    def _save(self, key: Hashable, entry: Tuple[float, bytes]) -> None:
+        # written to a temporary file first so that concurrent readers never see partial results
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(entry[1])
+            os.replace(tmp, self._path(key))
+        except OSError:
+            Path(tmp).unlink(missing_ok=True)
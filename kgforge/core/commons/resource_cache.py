@@ -0,0 +1,69 @@
+#
+# Blue Brain Nexus Forge is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Blue Brain Nexus Forge is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU Lesser
+# General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from kgforge.core.commons.query_cache import QueryCache
+from kgforge.core.resource import Resource
+
+
+class ResourceCache(QueryCache):
+    """Cache of retrieved resources, keyed by the request made to the store (e.g. an identifier and a revision).
+
+    Each resource is cached with a validator (e.g. an ETag) for the store to check that a lookup without a revision
+    still returns the latest one. Entries do not expire but the least recently used ones are evicted beyond
+    'maxsize' entries or 'max_bytes' bytes, and the entries of a resource are removed once it is written.
+    """
+
+    def __init__(self, maxsize: int = 10000, max_bytes: Optional[int] = None) -> None:
+        super().__init__(maxsize, None, max_bytes)
+        self._keys: Dict[str, Set[Hashable]] = {}
+        self._identifiers: Dict[Hashable, List[str]] = {}
+
+    @staticmethod
+    def identifiers(resource: Resource) -> List[str]:
+        metadata = getattr(resource, "_store_metadata", None)
+        return [x for x in (getattr(resource, "id", None), getattr(metadata, "_self", None)) if x]
+
+    def put(self, key: Hashable, results: Tuple[Optional[str], Resource]) -> None:
+        """Caches a (validator, resource) pair for key."""
+        identifiers = self.identifiers(results[1])
+        super().put(key, results)
+        with self._lock:
+            if key in self._entries:
+                self._identifiers[key] = identifiers
+                for x in identifiers:
+                    self._keys.setdefault(x, set()).add(key)
+
+    def invalidate(self, resources: Iterable[Resource]) -> None:
+        with self._lock:
+            for resource in resources:
+                for x in self.identifiers(resource):
+                    for key in list(self._keys.get(x, ())):
+                        if key in self._entries:
+                            self._remove(key)
+
+    def clear(self) -> None:
+        super().clear()
+        with self._lock:
+            self._keys.clear()
+            self._identifiers.clear()
+
+    def _remove(self, key: Hashable) -> None:
+        super()._remove(key)
+        for x in self._identifiers.pop(key, ()):
+            keys = self._keys.get(x)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys[x]
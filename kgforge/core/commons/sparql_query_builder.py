@@ -18,13 +18,13 @@ import json
 from pyld import jsonld
 import rdflib
 import re
-from rdflib import Graph
-from rdflib.plugins.sparql.parser import Query
+import weakref
+from rdflib import RDF, XSD, Graph, Literal, URIRef
 from typing import Any, Dict, List, Match, Optional, Tuple, Union, Type, Pattern
 
 from kgforge.core.commons.exceptions import QueryingError
 from kgforge.core.resource import Resource
-from kgforge.core.conversions.rdf import from_jsonld
+from kgforge.core.conversions.rdf import _remove_ld_keys, from_jsonld
 from kgforge.core.archetypes.resolver import Resolver
 from kgforge.core.commons.context import Context
 from kgforge.core.commons.files import is_valid_url
@@ -109,6 +109,20 @@ format_type = {
     ),
 }
 
+# Query form keywords, once IRIs (which may contain '#') and comments are removed from the query.
+_SPARQL_IRI = re.compile(r"<[^<>\"{}|^`\\\s]*>")
+_SPARQL_COMMENT = re.compile(r"#[^\n\r]*")
+_SPARQL_QUERY_FORM = re.compile(r"(?<![\w:$?])(SELECT|CONSTRUCT|ASK|DESCRIBE)(?![\w:])", flags=re.IGNORECASE)
+# Parts of a query where '$' does not start a variable: IRIs, string literals and comments.
+_SPARQL_VERBATIM = re.compile(
+    r"<[^<>\"{}|^`\\\s]*>"
+    r'|"""(?:[^"\\]|\\.|"(?!""))*"""'
+    r"|'''(?:[^'\\]|\\.|'(?!''))*'''"
+    r'|"(?:[^"\\\n\r]|\\.)*"'
+    r"|'(?:[^'\\\n\r]|\\.)*'"
+    r"|#[^\n\r]*"
+)
+
 sparql_operator_map = {
     "__lt__": "<",
     "__le__": "<=",
@@ -189,11 +203,12 @@ class SPARQLQueryBuilder(QueryBuilder):
     def build_resource_from_response(
         query: str, response: Dict, context: Context, *args, **params
     ) -> List[Resource]:
-        _, q_comp = Query.parseString(query)
         bindings = response["results"]["bindings"]
+        # the form of a prepared query is given so that the query is not scanned again
+        form = params.get("form", None) or SPARQLQueryBuilder.query_form(query)
         # FIXME workaround to parse a CONSTRUCT query, this fix depends on
         #  https://github.com/BlueBrain/nexus/issues/1155
-        if q_comp.name == "ConstructQuery":
+        if form == "CONSTRUCT":
             return SPARQLQueryBuilder.build_resource_from_construct_query(
                 bindings, context
             )
@@ -201,10 +216,29 @@ class SPARQLQueryBuilder(QueryBuilder):
         # SELECT QUERY
         return SPARQLQueryBuilder.build_resource_from_select_query(bindings)
 
+    @staticmethod
+    def query_form(query: str) -> Optional[str]:
+        """Return the form of a SPARQL query (SELECT, CONSTRUCT, ASK or DESCRIBE) without parsing it."""
+        stripped = _SPARQL_COMMENT.sub("", _SPARQL_IRI.sub("<>", query))
+        match = _SPARQL_QUERY_FORM.search(stripped)
+        return match.group(1).upper() if match else None
+
     @staticmethod
     def build_resource_from_construct_query(
         results: List, context: Context
     ) -> List[Resource]:
+        compaction = _ConstructCompaction.from_context(context)
+        if compaction is not None:
+            try:
+                return compaction.build_resources(results, context)
+            except _UnsupportedCompaction:
+                pass
+        return SPARQLQueryBuilder._build_resource_from_construct_query_with_pyld(results, context)
+
+    @staticmethod
+    def _build_resource_from_construct_query_with_pyld(
+        results: List, context: Context
+    ) -> List[Resource]:
 
         subject_triples = {}
 
@@ -416,6 +450,290 @@ class SPARQLQueryBuilder(QueryBuilder):
         return f"SELECT {select_vars} WHERE {where_clauses}"
 
 
+class PreparedSparql:
+    """A SPARQL query rewritten once to be run many times with values bound to its $parameters.
+
+    Parameters are SPARQL variables prefixed by '$' (e.g. $label), outside of IRIs, string literals and comments, that
+    are replaced at execution by the values given for them. Values are formatted as SPARQL terms: URIRef as IRIs, lists as space separated terms (e.g. in a
+    VALUES block) and other values as literals, escaped by rdflib. Variables without values are left unchanged.
+    """
+
+    _PARAMETER = re.compile(rf"{_SPARQL_VERBATIM.pattern}|\$([A-Za-z_][A-Za-z0-9_]*)")
+
+    def __init__(self, query: str) -> None:
+        self.query = query
+        self.form = SPARQLQueryBuilder.query_form(query)
+        # text of the query alternating with the names of its parameters
+        self._parts = []
+        start = 0
+        for match in self._PARAMETER.finditer(query):
+            if match.group(1) is not None:
+                self._parts.extend((query[start:match.start()], match.group(1)))
+                start = match.end()
+        self._parts.append(query[start:])
+        self.parameters = set(self._parts[1::2])
+
+    def bind(self, bindings: Optional[Dict[str, Any]]) -> str:
+        if not bindings:
+            return self.query
+        unknown = set(bindings) - self.parameters
+        if unknown:
+            raise QueryingError(f"Unknown query parameters: {sorted(unknown)}")
+        parts = list(self._parts)
+        for i in range(1, len(parts), 2):
+            name = parts[i]
+            parts[i] = _format_sparql_term(bindings[name]) if name in bindings else f"${name}"
+        return "".join(parts)
+
+    def __repr__(self) -> str:
+        return f"PreparedSparql({self.query!r})"
+
+
+def _format_sparql_term(value: Any) -> str:
+    if isinstance(value, (list, tuple, set)):
+        return " ".join(_format_sparql_term(x) for x in value)
+    if isinstance(value, URIRef):
+        if _SPARQL_IRI.fullmatch(f"<{value}>") is None:
+            raise QueryingError(f"Invalid IRI for a query parameter: {value!r}")
+        return f"<{value}>"
+    if isinstance(value, Literal):
+        return value.n3()
+    if isinstance(value, (str, bool, int, float, datetime)):
+        return Literal(value).n3()
+    raise QueryingError(f"Unsupported type for a query parameter: {type(value).__name__}")
+
+
+class _UnsupportedCompaction(Exception):
+    pass
+
+
+class _ConstructCompaction:
+    """Compaction of the triples of CONSTRUCT query results into resources, with the same output as pyld.
+
+    The terms of the context are indexed once to compact the results without building, framing and compacting a
+    JSON-LD document per resource. Blank nodes are embedded in the resources referring to them. Only contexts made of
+    prefixes, terms with a '@type' coercion or a '@set' container and aliases of '@id' and '@type' are supported (see
+    from_context), the others are compacted with pyld.
+    """
+
+    _TERM_KEYS = {"@id", "@type", "@container", "@prefix", "@protected"}
+    _CONTEXT_KEYS = {"@vocab", "@base", "@version", "@protected"}
+    # Literals of these datatypes are given as native values by rdflib.
+    _NATIVE_TYPES = {str(XSD.boolean), str(XSD.integer), str(XSD.double), str(XSD.string)}
+    _GEN_DELIMS = (":", "/", "?", "#", "[", "]", "@")
+
+    _compactions: "weakref.WeakKeyDictionary[Context, Optional[_ConstructCompaction]]" = weakref.WeakKeyDictionary()
+
+    def __init__(self, context: Context, document: Dict) -> None:
+        self.vocab = context.vocab
+        self.base = document.get("@base", "")
+        self.authority = re.match(r"[A-Za-z][\w+.-]*://[^/?#]*", self.base) if self.base else None
+        if self.base and self.authority is None:
+            raise _UnsupportedCompaction()
+        self.names = {k for k in document if not k.startswith("@")}
+        self.ids: Dict[str, str] = {}
+        self.types: Dict[str, str] = {}
+        self.sets = set()
+        self.prefixes: List[Tuple[str, str, bool]] = []
+        self.aliases: Dict[str, str] = {}
+        # IRI -> container -> '@type' or '@language' -> preferred value -> term, as the pyld inverse context.
+        self.inverse: Dict[str, Dict[str, Dict[str, Dict[str, str]]]] = {}
+        for name in sorted(self.names, key=lambda x: (len(x), x)):
+            definition = document[name]
+            if definition is None:
+                continue
+            if definition in ("@id", "@type"):
+                self.aliases.setdefault(definition, name)
+                continue
+            if isinstance(definition, str):
+                definition = {"@id": definition}
+                is_prefix = ":" not in name and definition["@id"].endswith(self._GEN_DELIMS)
+            elif isinstance(definition, dict) and not set(definition) - self._TERM_KEYS:
+                is_prefix = definition.get("@prefix", False)
+            else:
+                raise _UnsupportedCompaction()
+            term = context.terms.get(name)
+            container = definition.get("@container")
+            coercion = term.type if term is not None and term.type else None
+            if (
+                term is None or not isinstance(term.id, str) or term.id.startswith("@")
+                or container not in (None, "@set", ["@set"]) or coercion in ("@none", "@json")
+            ):
+                raise _UnsupportedCompaction()
+            self.ids[name] = term.id
+            if coercion:
+                self.types[name] = coercion
+            if container:
+                self.sets.add(name)
+            if ":" not in name:
+                self.prefixes.append((name, term.id, is_prefix))
+            entry = self.inverse.setdefault(term.id, {}).setdefault(
+                "@set" if container else "@none", {"@type": {}, "@language": {}}
+            )
+            if coercion:
+                entry["@type"].setdefault(coercion, name)
+            else:
+                entry["@type"].setdefault("@none", name)
+                entry["@language"].setdefault("@none", name)
+
+    @staticmethod
+    def from_context(context: Context) -> Optional["_ConstructCompaction"]:
+        try:
+            return _ConstructCompaction._compactions[context]
+        except KeyError:
+            pass
+        document = context.document.get("@context") if isinstance(context.document, dict) else None
+        try:
+            if not isinstance(document, dict) or any(
+                k.startswith("@") and k not in _ConstructCompaction._CONTEXT_KEYS for k in document
+            ):
+                raise _UnsupportedCompaction()
+            compaction = _ConstructCompaction(context, document)
+        except _UnsupportedCompaction:
+            compaction = None
+        _ConstructCompaction._compactions[context] = compaction
+        return compaction
+
+    def build_resources(self, results: List, context: Context) -> List[Resource]:
+        # subject -> predicate -> objects
+        nodes: Dict[Tuple[str, str], Dict[str, List[Dict]]] = {}
+        referenced = set()
+        for r in results:
+            subject = (r["subject"]["type"], r["subject"]["value"])
+            o = r["object"]
+            if o["type"] == "bnode":
+                referenced.add((o["type"], o["value"]))
+            nodes.setdefault(subject, {}).setdefault(r["predicate"]["value"], []).append(o)
+        memo: Dict[Tuple, str] = {}
+        resources = []
+        for subject in nodes:
+            if subject[0] == "bnode" and subject in referenced:
+                continue
+            resource = _remove_ld_keys(self._compact_node(subject, nodes, memo, ()), context)
+            resource.context = (
+                context.iri if context.is_http_iri() else context.document["@context"]
+            )
+            resources.append(resource)
+        return resources
+
+    def _compact_node(self, subject: Tuple[str, str], nodes: Dict, memo: Dict, path: Tuple) -> Dict:
+        properties = nodes.get(subject, {})
+        compacted = {}
+        expanded = sorted(properties)
+        if subject[0] == "uri":
+            compacted[self.aliases.get("@id", "@id")] = self._compact_iri(subject[1], None, False, memo)
+        rdf_type = str(RDF.type)
+        if rdf_type in properties and all(o["type"] == "uri" for o in properties[rdf_type]):
+            types = list(dict.fromkeys(self._compact_iri(o["value"], None, True, memo) for o in properties[rdf_type]))
+            compacted[self.aliases.get("@type", "@type")] = types[0] if len(types) == 1 else types
+            expanded.remove(rdf_type)
+        elif rdf_type in properties:
+            raise _UnsupportedCompaction()
+        path = path + (subject,)
+        for predicate in expanded:
+            # values are compared once converted as pyld does, e.g. "1" and "true" booleans are duplicates
+            seen = set()
+            for o in properties[predicate]:
+                if o["type"] in ("uri", "bnode"):
+                    expanded_value = (o["type"], o["value"])
+                else:
+                    value = o["value"] if o.get("datatype") is None else _literal_value(o["value"], o["datatype"])
+                    datatype = None if o.get("datatype") in self._NATIVE_TYPES else o.get("datatype")
+                    expanded_value = (type(value), value, datatype)
+                if expanded_value in seen:
+                    continue
+                seen.add(expanded_value)
+                key, value = self._compact_value(predicate, o, nodes, memo, path)
+                if key in compacted:
+                    if not isinstance(compacted[key], list):
+                        compacted[key] = [compacted[key]]
+                    compacted[key].append(value)
+                else:
+                    compacted[key] = [value] if key in self.sets else value
+        return compacted
+
+    def _compact_value(self, predicate: str, o: Dict, nodes: Dict, memo: Dict, path: Tuple) -> Tuple[str, Any]:
+        if o["type"] == "bnode" and ("bnode", o["value"]) not in path:
+            key = self._compact_iri(predicate, ("@node",), True, memo)
+            return key, self._compact_node(("bnode", o["value"]), nodes, memo, path)
+        if o["type"] in ("uri", "bnode"):
+            iri = o["value"] if o["type"] == "uri" else f"_:{o['value']}"
+            term = self._compact_iri(iri, None, True, memo)
+            key = self._compact_iri(predicate, ("@id", self.ids.get(term) == iri), True, memo)
+            coercion = self.types.get(key)
+            compacted = self._compact_iri(iri, None, coercion == "@vocab", memo)
+            return key, compacted if coercion in ("@id", "@vocab") else {self.aliases.get("@id", "@id"): compacted}
+        datatype = o.get("datatype")
+        if datatype is None:
+            return self._compact_iri(predicate, ("@null",), True, memo), o["value"]
+        value = _literal_value(o["value"], datatype)
+        if datatype in self._NATIVE_TYPES:
+            return self._compact_iri(predicate, ("@null",), True, memo), value
+        key = self._compact_iri(predicate, ("@type", datatype), True, memo)
+        if self.types.get(key) == datatype:
+            return key, value
+        return key, {
+            self.aliases.get("@type", "@type"): self._compact_iri(datatype, None, True, memo),
+            "@value": value,
+        }
+
+    def _compact_iri(self, iri: str, kind: Optional[Tuple], vocab: bool, memo: Dict) -> str:
+        # kind describes the value of the property to compact: None (no value), ('@id', whether the value is the IRI
+        # of a term), ('@node',) for an embedded node, ('@type', datatype) or ('@null',) for other literals.
+        key = (iri, kind, vocab)
+        if key not in memo:
+            memo[key] = self._compact_iri_uncached(iri, kind, vocab, memo)
+        return memo[key]
+
+    def _compact_iri_uncached(self, iri: str, kind: Optional[Tuple], vocab: bool, memo: Dict) -> str:
+        if vocab and iri in self.inverse:
+            if kind is None or kind[0] == "@node":
+                type_or_language, preferences = "@type", ["@id", "@none"]
+            elif kind[0] == "@id":
+                type_or_language, preferences = "@type", ["@vocab", "@id", "@none"] if kind[1] else ["@id", "@vocab", "@none"]
+            elif kind[0] == "@type":
+                type_or_language, preferences = "@type", [kind[1], "@none"]
+            else:
+                type_or_language, preferences = "@language", ["@null", "@none"]
+            for container in ("@set", "@none"):
+                entries = self.inverse[iri].get(container, {}).get(type_or_language, {})
+                for preference in preferences:
+                    if preference in entries:
+                        return entries[preference]
+        if vocab and self.vocab and iri.startswith(self.vocab) and iri != self.vocab:
+            suffix = iri[len(self.vocab):]
+            if suffix not in self.names:
+                return suffix
+        candidate = None
+        for name, prefix, is_prefix in self.prefixes:
+            if prefix == iri or not iri.startswith(prefix):
+                continue
+            curie = f"{name}:{iri[len(prefix):]}"
+            usable = (is_prefix and curie not in self.names) or (kind is None and self.ids.get(curie) == iri)
+            if usable and (candidate is None or (len(curie), curie) < (len(candidate), candidate)):
+                candidate = curie
+        if candidate is not None:
+            return candidate
+        if any(is_prefix and iri.startswith(f"{name}:") for name, _, is_prefix in self.prefixes):
+            # pyld reports the IRI as confused with a compact IRI
+            raise _UnsupportedCompaction()
+        if not vocab and self.authority is not None and iri.startswith(self.authority.group(0)):
+            compacted = jsonld.compact(
+                {"http://p": {"@id": iri}}, {"@base": self.base, "p": {"@id": "http://p", "@type": "@id"}}
+            )
+            return compacted["p"]
+        return iri
+
+
+def _literal_value(value: str, datatype: str) -> Any:
+    # as given by rdflib: native values for some datatypes and normalized lexical forms for the others
+    literal = Literal(value, datatype=datatype)
+    if datatype in _ConstructCompaction._NATIVE_TYPES:
+        native = literal.toPython()
+        return str(native) if isinstance(native, Literal) else native
+    return str(literal)
+
+
 def _box_value_as_full_iri(value):
     return f"<{value}>" if is_valid_url(value) else value
 
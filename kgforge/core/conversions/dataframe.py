@@ -12,9 +12,10 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
 
-from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
 
 import numpy as np
+import pandas as pd
 from pandas import DataFrame, Series
 
 from kgforge.core.resource import Resource
@@ -35,6 +36,56 @@ def as_dataframe(data: Union[Resource, List[Resource]], na: Union[Any, List[Any]
     return df
 
 
+def sparql_results_as_dataframe(results: Dict) -> DataFrame:
+    # One column per variable of a SELECT query, built from the bindings without an object per row. Columns of
+    # literals sharing an XSD datatype are typed, the others (e.g. URIs) hold the values as str. Missing values
+    # are None, NaN, NaT or NA according to the dtype.
+    variables = results["head"]["vars"]
+    bindings = results["results"]["bindings"]
+    columns = {}
+    for var in variables:
+        terms = [b.get(var) for b in bindings]
+        values = Series([t["value"] if t is not None else None for t in terms], dtype=object)
+        kinds = {(t["type"], t.get("datatype")) for t in terms if t is not None}
+        columns[var] = _typed_column(values, kinds)
+    return DataFrame(columns, columns=variables)
+
+
+def _typed_column(values: Series, kinds: Set[Tuple[str, Optional[str]]]) -> Series:
+    if len(kinds) == 1:
+        term_type, datatype = next(iter(kinds))
+        # 'typed-literal' is the term type of the SPARQL 1.0 JSON results
+        converter = _XSD_CONVERTERS.get(datatype) if term_type in ("literal", "typed-literal") else None
+        if converter is not None:
+            try:
+                return converter(values)
+            except (ValueError, TypeError, OverflowError):
+                pass
+    return values
+
+
+def _to_integer(values: Series) -> Series:
+    # missing values are left out of the conversion as they would turn the integers into floats
+    return pd.to_numeric(values.dropna()).astype("Int64").reindex(values.index)
+
+
+def _to_boolean(values: Series) -> Series:
+    return values.map({"true": True, "1": True, "false": False, "0": False}).astype("boolean")
+
+
+_XSD = "http://www.w3.org/2001/XMLSchema#"
+_XSD_CONVERTERS: Dict[str, Callable[[Series], Series]] = {
+    **{f"{_XSD}{t}": _to_integer for t in (
+        "integer", "int", "long", "short", "byte", "nonNegativeInteger", "positiveInteger", "nonPositiveInteger",
+        "negativeInteger", "unsignedLong", "unsignedInt", "unsignedShort", "unsignedByte"
+    )},
+    **{f"{_XSD}{t}": pd.to_numeric for t in ("decimal", "float", "double")},
+    f"{_XSD}boolean": _to_boolean,
+    f"{_XSD}dateTime": lambda values: pd.to_datetime(values, utc=True),
+    f"{_XSD}date": pd.to_datetime,
+}
+
+
 def flatten(data: Dict, sep: str) -> Dict:
     return dict(_flatten(data, sep, []))
 
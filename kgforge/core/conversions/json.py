@@ -12,11 +12,10 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
 
-import json
+import math
+from decimal import Decimal
 from typing import Any, Dict, List, Union, Optional, Callable
 
-import hjson
-
 from kgforge.core.resource import Resource
 from kgforge.core.commons.attributes import sort_attrs
 from kgforge.core.commons.context import Context
@@ -43,21 +42,59 @@ def from_json(data: Union[Dict, List[Dict]], na: Union[Any, List[Any]]
 
 
 def _as_json(resource: Resource, store_metadata: bool) -> Dict:
-    data = json.loads(hjson.dumpsJSON(resource, default=encode, item_sort_key=sort_attrs))
-    _remove_context(data)
+    data = _encode(resource, True)
     if store_metadata is True and resource._store_metadata:
-        data.update(json.loads(hjson.dumpsJSON(resource._store_metadata, item_sort_key=sort_attrs)))
+        data.update(_encode(resource._store_metadata, False))
     return data
 
 
-def _remove_context(dictionary: dict):
-    if isinstance(dictionary, dict):
-        for i in list(dictionary):
-            if i == "context":
-                dictionary.pop("context")
-            else:
-                if isinstance(dictionary[i], dict):
-                    _remove_context(dictionary[i])
-                elif isinstance(dictionary[i], list):
-                    for x in dictionary[i]:
-                        _remove_context(x)
+def _encode(data: Any, remove_context: bool) -> Any:
+    # Plain JSON values in one pass, as serializing with hjson.dumpsJSON(data, default=encode,
+    # item_sort_key=sort_attrs) and loading the result back would give. The 'context' keys are removed on the way
+    # when remove_context is True.
+    if isinstance(data, str):
+        return str.__str__(data)
+    if data is None or isinstance(data, bool):
+        return data
+    if isinstance(data, int):
+        return int(data)
+    if isinstance(data, float):
+        return float(data) if math.isfinite(data) else None
+    if isinstance(data, bytes):
+        return data.decode("utf-8")
+    if isinstance(data, list):
+        return [_encode(x, remove_context) for x in data]
+    as_dict = getattr(data, "_asdict", None)
+    if callable(as_dict):
+        # namedtuple
+        return _encode_dict(as_dict(), remove_context)
+    if isinstance(data, tuple):
+        return [_encode(x, remove_context) for x in data]
+    if isinstance(data, dict):
+        return _encode_dict(data, remove_context)
+    if isinstance(data, Decimal):
+        return float(data)
+    encoded = encode(data)
+    if type(encoded) is type(data):
+        raise ValueError(f"{type(data).__name__} is not JSON serializable")
+    return _encode(encoded, remove_context)
+
+
+def _encode_dict(data: Dict, remove_context: bool) -> Dict:
+    return {
+        _encode_key(k): _encode(v, remove_context)
+        for k, v in sorted(data.items(), key=sort_attrs)
+        if not (remove_context and k == "context")
+    }
+
+
+def _encode_key(key: Any) -> str:
+    if isinstance(key, str):
+        return str.__str__(key)
+    if key is None or isinstance(key, bool):
+        return {None: "null", True: "true", False: "false"}[key]
+    if isinstance(key, (int, Decimal)):
+        return str(key)
+    if isinstance(key, float):
+        return repr(float(key))
+    raise TypeError(f"keys must be str, int, float, bool or None, not {type(key).__name__}")
@@ -26,7 +26,7 @@ from rdflib.namespace import RDF
 from pyld import jsonld
 
 from kgforge.core.commons.actions import LazyAction
-from kgforge.core.commons.context import Context
+from kgforge.core.commons.context import Context, context_registry
 from kgforge.core.commons.exceptions import NotSupportedError
 from kgforge.core.commons.execution import dispatch
 from kgforge.core.resource import Resource
@@ -164,7 +164,7 @@ def _from_jsonld_many(dataset: List[Dict]) -> List[Resource]:
 def _from_jsonld_one(data: Dict) -> Resource:
     if "@context" in data:
         try:
-            resolved_context = Context(data["@context"])
+            resolved_context = context_registry.get(data["@context"])
         except URLError as e:
             raise ValueError("context not resolvable") from e
 
@@ -206,7 +206,8 @@ def _as_jsonld_one(
     **params,
 ) -> Dict:
     context = _resource_context(resource, model_context, context_resolver)
-    resolved_context = deepcopy(context.document)
+    # Not copied as it is only read by pyld when expanding or compacting.
+    resolved_context = context.document
     output_context = (
         context.iri if context.is_http_iri() else context.document["@context"]
     )
@@ -223,8 +224,11 @@ def _as_jsonld_one(
         else:
             raise NotSupportedError("no available context in the metadata")
     try:
-        data_graph, metadata_graph, encoded_resource, json_array = _as_graphs(
-            resource, store_metadata, context, metadata_context
+        encoded_resource = _encode_resource(resource, context)
+        metadata_graph = (
+            _metadata_to_graph(resource._store_metadata, store_metadata, metadata_context)
+            if store_metadata
+            else None
         )
     except Exception as e:
         raise ValueError(e) from e
@@ -280,20 +284,67 @@ def _as_graph_many(
     context_resolver: Optional[Callable],
 ) -> Graph:
     graph = Graph()
-    for resource in resources:
-        # Do not use _as_graph_one as it will lead to using graph1 + graph2 operation which can lead to blank node collisions
-        json_ld = _as_jsonld_one(
-            resource,
-            Form.EXPANDED,
-            store_metadata,
-            model_context,
-            metadata_context,
-            context_resolver,
+    if store_metadata:
+        for resource in resources:
+            # Do not use _as_graph_one as it will lead to using graph1 + graph2 operation which can lead to blank node collisions
+            json_ld = _as_jsonld_one(
+                resource,
+                Form.EXPANDED,
+                store_metadata,
+                model_context,
+                metadata_context,
+                context_resolver,
+            )
+            graph.parse(data=json.dumps(json_ld), format="json-ld")
+        return graph
+
+    # Resources sharing a context are expanded together as the @graph of a single document which is parsed once.
+    # Blank node identifiers are made unique per resource so that they do not collide within the document.
+    documents: Dict[str, Tuple[Context, List[Dict]]] = {}
+    for i, resource in enumerate(resources):
+        context = _resource_context(resource, model_context, context_resolver)
+        key = (
+            ""
+            if context is model_context
+            else json.dumps(context.document, sort_keys=True, default=str)
+        )
+        try:
+            encoded = _encode_resource(resource, context)
+        except Exception as e:
+            raise ValueError(e) from e
+        encoded.pop("@context")
+        documents.setdefault(key, (context, []))[1].append(
+            _relabel_blank_nodes(encoded, f"r{i}", context)
         )
-        graph.parse(data=json.dumps(json_ld), format="json-ld")
+    for context, nodes in documents.values():
+        try:
+            expanded = jsonld.expand(
+                {"@context": context.document["@context"], "@graph": nodes}
+            )
+        except Exception as e:
+            raise ValueError(e) from e
+        graph.parse(data=json.dumps(expanded), format="json-ld")
     return graph
 
 
+def _relabel_blank_nodes(data: Union[Dict, List, str], prefix: str, context: Context, reference: bool = False) -> Union[Dict, List, str]:
+    # Strings are node identifiers as values of @id and @type and of the terms coerced to @id or @vocab.
+    if isinstance(data, list):
+        return [_relabel_blank_nodes(x, prefix, context, reference) for x in data]
+    if isinstance(data, dict):
+        return {k: _relabel_blank_nodes(v, prefix, context, _is_node_reference(k, context)) for k, v in data.items()}
+    if reference and isinstance(data, str) and data.startswith("_:"):
+        return f"_:{prefix}_{data[2:]}"
+    return data
+
+
+def _is_node_reference(key: str, context: Context) -> bool:
+    if key in ("@id", "@type"):
+        return True
+    term = context.terms.get(key)
+    return term is not None and term.type in ("@id", "@vocab")
+
+
 def _as_graph_one(
     resource: Resource,
     store_metadata: bool,
@@ -312,35 +363,25 @@ def _as_graph_one(
     return Graph().parse(data=json.dumps(json_ld), format="json-ld")
 
 
-def _as_graphs(
-    resource: Resource,
-    store_metadata: bool,
-    context: Context,
-    metadata_context: Context,
-) -> Tuple[Graph, Graph, Dict, List[str]]:
-    """Returns a data and a metadata graph"""
+def _encode_resource(resource: Resource, context: Context) -> Dict:
+    """Returns the resource as a JSON-LD dictionary with the resolved context.
+
+    No RDF graph is built: the data is only converted to a graph when it is expanded or parsed.
+    """
     if hasattr(resource, "context"):
         output_context = resource.context
     else:
         output_context = (
             context.iri if context.is_http_iri() else context.document["@context"]
         )
-    converted, json_array = _add_ld_keys(resource, output_context, context.base)
+    converted, _ = _add_ld_keys(resource, output_context, context.base)
     converted["@context"] = context.document["@context"]
-    return (
-        _dicts_to_graph(
-            converted, resource._store_metadata, store_metadata, metadata_context
-        )
-        + (converted,)
-        + (json_array,)
-    )
+    return converted
 
 
-def _dicts_to_graph(
-    data: Dict, metadata: Dict, store_meta: bool, metadata_context: Context
-) -> Tuple[Graph, Graph]:
-    json_str = json.dumps(data)
-    graph = Graph().parse(data=json_str, format="json-ld")
+def _metadata_to_graph(
+    metadata: Dict, store_meta: bool, metadata_context: Context
+) -> Graph:
     meta_data_graph = Graph()
     if store_meta is True and metadata is not None:
         if "id" not in metadata:
@@ -351,7 +392,7 @@ def _dicts_to_graph(
             meta_data_graph.parse(data=json.dumps(metadata), format="json-ld")
         except Exception as e:
             raise ValueError("generated an invalid json-ld") from e
-    return graph, meta_data_graph
+    return meta_data_graph
 
 
 def recursive_resolve(
@@ -385,21 +426,12 @@ def _resource_context(
             context = model_context
         else:
             iri = resource.context if isinstance(resource.context, str) else None
-            try:
-                document = recursive_resolve(
-                    resource.context,
-                    context_resolver,
-                    [
-                        "https://bluebrainnexus.io/contexts/metadata.json",
-                        "https://bluebrain.github.io/nexus/contexts/metadata.json",
-                    ],
-                )
-                context = Context(document, iri)
-            except (HTTPError, URLError, NotSupportedError):
-                try:
-                    context = Context(resource.context, iri)
-                except URLError as e:
-                    raise ValueError(f"{resource.context} is not resolvable") from e
+            context = context_registry.get(
+                resource.context,
+                iri,
+                lambda: _resolve_resource_context(resource.context, iri, context_resolver),
+                resolver=context_resolver,
+            )
     else:
         context = model_context
 
@@ -409,6 +441,26 @@ def _resource_context(
     return context
 
 
+def _resolve_resource_context(
+    document: Union[Dict, List, str], iri: Optional[str], context_resolver: Callable
+) -> Context:
+    try:
+        resolved = recursive_resolve(
+            document,
+            context_resolver,
+            [
+                "https://bluebrainnexus.io/contexts/metadata.json",
+                "https://bluebrain.github.io/nexus/contexts/metadata.json",
+            ],
+        )
+        return Context(resolved, iri)
+    except (HTTPError, URLError, NotSupportedError):
+        try:
+            return Context(document, iri)
+        except URLError as e:
+            raise ValueError(f"{document} is not resolvable") from e
+
+
 def _unpack_from_list(data):
     if isinstance(data, list):
         node = data
@@ -438,7 +490,7 @@ def _add_ld_keys(
         if k not in Resource._RESERVED:
             if k == "context":
                 if v != context:
-                    local_context = Context(v)
+                    local_context = context_registry.get(v)
                     base = local_context.base
             else:
                 key = LD_KEYS.get(k, k)
@@ -13,7 +13,7 @@
 # along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
 
 from copy import deepcopy
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union, Type
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union, Type
 
 import os
 import numpy as np
@@ -34,6 +34,7 @@ from kgforge.core.commons.execution import catch
 from kgforge.core.commons.imports import import_class
 from kgforge.core.commons.strategies import ResolvingStrategy
 from kgforge.core.commons.formatter import Formatter
+from kgforge.core.commons.sparql_query_builder import PreparedSparql
 from kgforge.core.conversions.dataframe import as_dataframe, from_dataframe
 from kgforge.core.conversions.json import as_json, from_json
 from kgforge.core.conversions.rdf import (
@@ -72,6 +73,7 @@ class KnowledgeGraphForge:
            bucket: <when 'origin' is 'store', a Store bucket>
            endpoint: <when 'origin' is 'store', a Store endpoint, default to Store:endpoint>
            token: <when 'origin' is 'store', a Store token, default to Store:token>
+           cache_dir: <when 'origin' is 'store', a directory where to cache the schemas and ontologies>
            context:
              iri: <an IRI>
              bucket: <when 'origin' is 'store', a Store bucket, default to Model:bucket>
@@ -91,6 +93,14 @@ class KnowledgeGraphForge:
                    param: <http query param value to use for the Store method>
            versioned_id_template: <a string template using 'x' to access resource fields>
            file_resource_mapping: <an Hjson string, a file path, or an URL>
+           query_cache: <when set, even empty, caches the results of sparql and elastic queries>
+             maxsize: <the maximum number of cached query results, default to 1000>
+             ttl: <the number of seconds during which query results are cached, default to 300>
+             max_bytes: <the maximum size of the cached query results in bytes>
+             directory: <a directory where to also cache the query results>
+           resource_cache: <when set, even empty, caches the resources retrieved by identifier>
+             maxsize: <the maximum number of cached resources, default to 10000>
+             max_bytes: <the maximum size of the cached resources in bytes>
 
          Resolvers:
            <scope>:
@@ -124,6 +134,7 @@ class KnowledgeGraphForge:
                  "bucket": <str>,
                  "endpoint": <str>,
                  "token": <str>,
+                 "cache_dir": <str>,
                  "context": {
                        "iri": <str>,
                        "bucket": <str>,
@@ -148,6 +159,16 @@ class KnowledgeGraphForge:
                  },
                  "versioned_id_template": <str>,
                  "file_resource_mapping": <str>,
+                 "query_cache": {
+                     "maxsize": <int>,
+                     "ttl": <float>,
+                     "max_bytes": <int>,
+                     "directory": <str>,
+                 },
+                 "resource_cache": {
+                     "maxsize": <int>,
+                     "max_bytes": <int>,
+                 },
              },
              "Resolvers": {
                  "<scope>": [
@@ -671,24 +692,39 @@ class KnowledgeGraphForge:
         )
         return self._store.search(resolvers=resolvers, *filters, **params)
 
+    @catch
+    def prepare_sparql(self, query: str, rewrite: bool = True) -> PreparedSparql:
+        """
+        Prepare a SPARQL query to run it many times with forge.sparql(), binding values to its $parameters.
+        The query is rewritten once instead of on each run.
+
+        :param query: a SPARQL query where parameters are variables prefixed by '$' (e.g. $name)
+        :param rewrite: whether to rewrite the sparql query (True) or run it as is (False)
+        :return: PreparedSparql
+        """
+        return self._store.prepare_sparql(query, rewrite)
+
     @catch
     def sparql(
         self,
-        query: str,
+        query: Union[str, PreparedSparql],
         debug: bool = False,
         limit: Optional[int] = None,
         offset: Optional[int] = None,
         **params,
-    ) -> List[Resource]:
+    ) -> Union[List[Resource], DataFrame]:
         """
         Search for resources using a SPARQL query. See SPARQL docs: https://www.w3.org/TR/sparql11-query.
 
-        :param query: a SPARQL query
+        :param query: a SPARQL query or a query prepared with forge.prepare_sparql()
         :param debug: a boolean
         :param limit: the number of resources to retrieve. Default to 100. If provided in query limit will be replaced
         :param offset: how many results to skip from the first one. If provided in query offset will be replaced
-        :param params: a dictionary of parameters. Supported params are: rewrite (whether to rewrite the sparql query or run it as is)
-        :return: List[Resource]
+        :param params: a dictionary of parameters. Supported params are: rewrite (whether to rewrite the sparql query or run it as is),
+                       bindings (a dictionary of values for the $parameters of the query, escaped as SPARQL terms), as_dataframe (whether
+                       to return the results of a SELECT query as a pandas.DataFrame with one column per variable, typed from the XSD
+                       datatypes of the values, instead of resources)
+        :return: Union[List[Resource], pandas.DataFrame]
         """
         return self._store.sparql(query, debug, limit, offset, **params)
 
@@ -712,6 +748,99 @@ class KnowledgeGraphForge:
         """
         return self._store.elastic(query, debug, limit, offset, **params)
 
+    # No @catch because errors are raised while iterating.
+    def search_iter(
+        self, *filters: Union[Dict, Filter], page_size: int = 1000, prefetch: bool = True, **params
+    ) -> Iterator[Resource]:
+        """
+        Search for resources based on a list of filters and iterate over all of them, page by page.
+        Only one page is held in memory at a time. See forge.search() for the supported parameters.
+
+        :param filters: a list of filters
+        :param page_size: the number of resources to retrieve per page
+        :param prefetch: whether to retrieve the next page while the current one is consumed (True) or not (False)
+        :param params: a dictionary of parameters. The limit parameter is ignored and the offset one is where to start
+        :return: Iterator[Resource]
+        """
+        if page_size <= 0:
+            raise ValueError(f"page_size value should be greater than 0 but {page_size} is provided")
+        resolvers = (
+            list(self._resolvers.values()) if self._resolvers is not None else None
+        )
+        return self._store.search_iter(
+            resolvers, *filters, page_size=page_size, prefetch=prefetch, **params
+        )
+
+    # No @catch because errors are raised while iterating.
+    def sparql_iter(
+        self,
+        query: Union[str, PreparedSparql],
+        debug: bool = False,
+        page_size: int = 1000,
+        prefetch: bool = True,
+        **params,
+    ) -> Iterator[Resource]:
+        """
+        Search for resources using a SPARQL query and iterate over all the results, page by page.
+        The query should have an ORDER BY clause for the pages to be consistent with each other.
+
+        :param query: a SPARQL query or a query prepared with forge.prepare_sparql()
+        :param debug: a boolean
+        :param page_size: the number of results to retrieve per page. If provided in query limit will be replaced
+        :param prefetch: whether to retrieve the next page while the current one is consumed (True) or not (False)
+        :param params: a dictionary of parameters. Supported params are: rewrite (whether to rewrite the sparql query or run it as is),
+                       bindings (a dictionary of values for the $parameters of the query), offset, stream (whether to send a SELECT query
+                       once, as is, and yield its results while they are received instead of page by page, if supported by the store)
+        :return: Iterator[Resource]
+        """
+        if page_size <= 0:
+            raise ValueError(f"page_size value should be greater than 0 but {page_size} is provided")
+        return self._store.sparql_iter(query, debug, page_size, prefetch, **params)
+
+    # No @catch because errors are raised while iterating.
+    def elastic_iter(
+        self,
+        query: str,
+        debug: bool = False,
+        page_size: int = 1000,
+        prefetch: bool = True,
+        **params,
+    ) -> Iterator[Union[Resource, Dict]]:
+        """
+        Search for resources using an ElasticSearch DSL query and iterate over all the results, page by page.
+
+        :param query: an ElasticSerach DSL query
+        :param debug: a boolean
+        :param page_size: the number of results to retrieve per page
+        :param prefetch: whether to retrieve the next page while the current one is consumed (True) or not (False)
+        :param params: a dictionary of parameters. Supported params are the ones of forge.elastic(), offset and stream
+                       (whether to yield the results of each page while they are received, without prefetching, if supported by the store)
+        :return: Iterator[Union[Resource, Dict]]
+        """
+        if page_size <= 0:
+            raise ValueError(f"page_size value should be greater than 0 but {page_size} is provided")
+        return self._store.elastic_iter(query, debug, page_size, prefetch, **params)
+
+    @catch
+    def query_cache_stats(self) -> Optional[Dict]:
+        """
+        Return the statistics (hits, misses, evictions, entries and bytes) of the query result cache of the configured store.
+        The cache is configured with the Store query_cache key and cleared after each write made through the forge.
+
+        :return: Optional[Dict], None if no query result cache is configured
+        """
+        return self._store.query_cache.stats() if self._store.query_cache is not None else None
+
+    @catch
+    def resource_cache_stats(self) -> Optional[Dict]:
+        """
+        Return the statistics (hits, misses, evictions, entries and bytes) of the retrieved resource cache of the configured store.
+        The cache is configured with the Store resource_cache key. Resources written through the forge are removed from it.
+
+        :return: Optional[Dict], None if no retrieved resource cache is configured
+        """
+        return self._store.resource_cache.stats() if self._store.resource_cache is not None else None
+
     @catch
     def download(
         self,
@@ -749,6 +878,34 @@ class KnowledgeGraphForge:
         """
         # self._store.mapper = self._store.mapper(self)
         self._store.register(data, schema_id)
+        self._store.clear_query_cache()
+        self._store.clear_resource_cache(data)
+
+    # No @catch because the error handling is done by execution.run_stream().
+    def register_stream(
+        self, data: Iterable[Resource], schema_id: Optional[str] = None, window: int = 1000
+    ) -> Iterator[Resource]:
+        """
+        Store resources pulled lazily from an iterable (e.g. a generator) in the configured Store.
+        The iterable is never materialized: at most window resources are in flight at any time and each one is
+        yielded (in completion order) once registered. Check the yielded resources' _last_action to know whether
+        their registration succeeded. Nothing is registered until the returned iterator is consumed.
+
+        :param data: the resources to register
+        :param schema_id: an identifier of the schema the registered resources should conform to
+        :param window: the maximum number of resources being registered at the same time
+        :return: Iterator[Resource]
+        """
+        if window <= 0:
+            raise ValueError(f"window value should be greater than 0 but {window} is provided")
+
+        def registered() -> Iterator[Resource]:
+            for resource in self._store.register_stream(data, schema_id, window):
+                self._store.clear_query_cache()
+                self._store.clear_resource_cache(resource)
+                yield resource
+
+        return registered()
 
     # No @catch because the error handling is done by execution.run().
     def update(
@@ -761,6 +918,8 @@ class KnowledgeGraphForge:
         :param schema_id: an identifier of the schema the updated resources should conform to
         """
         self._store.update(data, schema_id)
+        self._store.clear_query_cache()
+        self._store.clear_resource_cache(data)
 
     # No @catch because the error handling is done by execution.run().
     def deprecate(self, data: Union[Resource, List[Resource]]) -> None:
@@ -770,6 +929,8 @@ class KnowledgeGraphForge:
         :param: the resources to deprecate
         """
         self._store.deprecate(data)
+        self._store.clear_query_cache()
+        self._store.clear_resource_cache(data)
 
     # Versioning User Interface.
 
@@ -782,6 +943,8 @@ class KnowledgeGraphForge:
         :param value: the tag value
         """
         self._store.tag(data, value)
+        self._store.clear_query_cache()
+        self._store.clear_resource_cache(data)
 
     # No @catch because the error handling is done by execution.run().
     def freeze(self, data: Union[Resource, List[Resource]]) -> None:
@@ -978,6 +1141,20 @@ class KnowledgeGraphForge:
         """Expose the context used in the model."""
         return self._model.context()
 
+    def close(self) -> None:
+        """
+        Release the connections held by the configured store and the processes held by the configured model.
+        The forge should not be used afterwards.
+        """
+        self._store.close()
+        self._model.close()
+
+    def __enter__(self) -> "KnowledgeGraphForge":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
 
 def prepare_resolvers(
     config: Dict, store_config: Dict
@@ -0,0 +1,67 @@
+#
+# Blue Brain Nexus Forge is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Blue Brain Nexus Forge is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU Lesser
+# General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Union
+
+from rdflib import Graph
+
+
+class SchemaCache:
+    """On-disk cache of the graphs of schemas and ontologies, keyed by resource id and revision.
+
+    Graphs are stored as N-Triples files named after a hash of the namespace (e.g. the store endpoint and bucket)
+    and the resource id, suffixed with the revision. Storing a revision removes the files of the other revisions.
+    """
+
+    FORMAT = "nt"
+
+    def __init__(self, directory: Union[str, Path], namespace: str) -> None:
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.namespace = namespace
+
+    def load(self, graph: Graph, resource_id: str, rev: Union[int, str]) -> bool:
+        path = self._path(resource_id, rev)
+        if not path.exists():
+            return False
+        try:
+            graph.parse(path.as_posix(), format=self.FORMAT)
+        except Exception:
+            # an unreadable file is treated as a cache miss, graph should then be discarded
+            return False
+        return True
+
+    def save(self, graph: Graph, resource_id: str, rev: Union[int, str]) -> None:
+        path = self._path(resource_id, rev)
+        for stale in self.directory.glob(f"{self._key(resource_id)}-*.{self.FORMAT}"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+        # written to a temporary file first so that concurrent readers never see a partial graph
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            graph.serialize(destination=tmp, format=self.FORMAT, encoding="utf-8")
+            os.replace(tmp, path)
+        except Exception:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def _key(self, resource_id: str) -> str:
+        return hashlib.sha1(f"{self.namespace}|{resource_id}".encode("utf-8")).hexdigest()
+
+    def _path(self, resource_id: str, rev: Union[int, str]) -> Path:
+        return self.directory / f"{self._key(resource_id)}-{rev}.{self.FORMAT}"
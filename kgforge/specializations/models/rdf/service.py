@@ -20,7 +20,7 @@ from pyshacl.validate import Validator, validate
 from pyshacl.consts import SH_Violation
 from pyshacl.constraints.constraint_component import CustomConstraintComponentFactory
 from pyshacl.shapes_graph import ShapesGraph
-from rdflib import OWL, SH, BNode, Graph, Namespace, URIRef, RDF, XSD
+from rdflib import OWL, SH, BNode, Graph, Literal, Namespace, URIRef, RDF, XSD
 from rdflib.paths import ZeroOrMore
 from rdflib import Dataset as RDFDataset
 from rdflib.collection import Collection as RDFCollection
@@ -61,6 +61,8 @@ ALL_COLLECTORS = [
     HasValueCollector,
 ]
 ALL_COLLECTORS_MAP = {c.constraint(): c for c in ALL_COLLECTORS}
+# Constraints which can read the triples of any node.
+_SPARQL_PARAMETERS = (SH.sparql, SH.select, SH.ask)
 
 
 class ShapeWrapper(Shape):
@@ -140,6 +142,23 @@ class ShapesGraphWrapper(ShapesGraph):
 
         return ShapeWrapper(shape)
 
+    def register_shapes(self, graph: Graph) -> None:
+        """Registers the shapes defined in graph which are not registered yet.
+
+        The shapes already registered are kept so that loading a schema does not rebuild
+        the shapes of all the schemas loaded before.
+
+        Args:
+            graph (Graph): A graph of the dataset with the shapes to register.
+        """
+        # the shapes are discovered in a copy as pyshacl adds system triples to the graph it wraps
+        discovered = ShapesGraph(Graph() + graph, logger=self.logger)
+        discovered._build_node_shape_cache()
+        for node, shape in discovered._node_shape_cache.items():
+            if node not in self._node_shape_cache:
+                self._node_shape_cache[node] = Shape(self, node, p=shape._p, path=shape._path, logger=self.logger)
+        self._shapes = list(self._node_shape_cache.values())
+
     @property
     def shapes(self):  # pyshacl implementation returns dict_values (not list). This cannot be pickled.
         """
@@ -171,8 +190,9 @@ class RdfService:
             self.defining_resource_to_named_graph,
         ) = self._build_shapes_map()
         self.ont_to_named_graph = self._build_ontology_map()
-        self._imported = []
+        self._imported = set()
         self._defining_resource_to_imported_ontology = {}
+        self._shape_graphs: Dict[URIRef, Tuple[ShapeWrapper, Graph, Graph]] = {}
 
     @abstractmethod
     def schema_source_id(self, shape_uri: str) -> str:
@@ -240,31 +260,121 @@ class RdfService:
         # the validation fails when type_to_validate is not present in the data
         if conforms and len(shape.focus_nodes(data_graph)) == 0:
             conforms = False
-            # Create a dedicated validation report
-            result_desc = (
-                f"No data matching the targets (i.e. what the schema can validate) of {type_to_validate}'s schema"
-                + f" were found in the provided resource. The {type_to_validate} schema can validate the following types: {list(shape.target_classes())}."
-                + f" Consider providing a resource with type in {list(shape.target_classes())}."
-            )
-            r_node = BNode()
-            result = (
-                result_desc,
-                r_node,
-                [
-                    (r_node, RDF.type, SH.ValidationResult),
-                    (r_node, SH.sourceShape, (shape.sg, shape.node)),
-                    (
-                        r_node,
-                        SH.resultSeverity,
-                        SH.Warning,
-                    ),  # what is the severity here ?
-                ],
-            )
-            report_graph, report_text = Validator.create_validation_report(
-                sg=shape.sg, conforms=conforms, results=[result]
-            )
+            report_graph, report_text = RdfService._no_target_report(shape, type_to_validate)
         return conforms, report_graph, report_text
 
+    @staticmethod
+    def validate_many(
+            resources: List[Resource], shape: ShapeWrapper, shacl_graph: Graph, ont_graph: Graph, type_to_validate: str,
+            inference: str, context: Context
+    ) -> List[Tuple[bool, Graph]]:
+        """Validates resources against the same shape in a single pyshacl pass over their merged data graphs.
+
+        The validation results are split back to each resource according to their focus node. Resources describing
+        a node already described by another resource are validated separately, as merging them would validate
+        the union of their descriptions. Likewise, resources referring to a node described by another resource, or
+        described nodes referred to by another resource, are validated separately: constraints following links
+        (e.g. sh:class, sh:node or inverse paths) would otherwise read the triples of the other resource, and the
+        result of a resource would depend on the resources validated with it. SPARQL-based constraints can read any
+        triple and inference can type nodes from the triples of other resources, so all resources are validated
+        separately with them.
+
+        Returns:
+            a Tuple (conforms, report_graph) per resource, in the order of resources
+        """
+        inplace = inference and inference != "none"
+        if inplace or any((None, p, None) in shacl_graph for p in _SPARQL_PARAMETERS):
+            return [
+                RdfService.validate(r, shape, shacl_graph, ont_graph, type_to_validate, inference, context)[:2]
+                for r in resources
+            ]
+
+        validated: List[Optional[Tuple[bool, Graph]]] = [None] * len(resources)
+        data_graphs = [as_graph(r, False, context, None, None) for r in resources]
+        merged_graph = Graph()
+        merged = []
+        node_to_resource = {}
+        referred = set()
+        for i, data_graph in enumerate(data_graphs):
+            nodes = set(data_graph.subjects())
+            references = {o for o in data_graph.objects() if not isinstance(o, Literal)} - nodes
+            if any(n in node_to_resource or n in referred for n in nodes) \
+                    or any(o in node_to_resource for o in references):
+                conforms, report_graph, _ = RdfService.validate(
+                    resources[i], shape, shacl_graph, ont_graph, type_to_validate, inference, context
+                )
+                validated[i] = conforms, report_graph
+            else:
+                node_to_resource.update(dict.fromkeys(nodes, i))
+                referred.update(references)
+                merged_graph += data_graph
+                merged.append(i)
+        if not merged:
+            return validated
+
+        _, report_graph, _ = validate(
+            data_graph=merged_graph,
+            shacl_graph=shacl_graph,
+            ont_graph=ont_graph,
+            inference=inference,
+            inplace=inplace,
+        )
+
+        resource_results = {i: [] for i in merged}
+        for result in report_graph.subjects(RDF.type, SH.ValidationResult):
+            focus_node = report_graph.value(result, SH.focusNode)
+            if focus_node in node_to_resource:
+                resource_results[node_to_resource[focus_node]].append(result)
+            else:
+                # focus nodes targeted as objects (e.g. sh:targetObjectsOf) are not described by any resource
+                for i in merged:
+                    if (None, None, focus_node) in data_graphs[i]:
+                        resource_results[i].append(result)
+
+        focus_nodes = set(shape.focus_nodes(merged_graph))
+        targeted = {node_to_resource[n] for n in focus_nodes if n in node_to_resource}
+        for i, results in resource_results.items():
+            if results:
+                resource_report = Graph()
+                report = BNode()
+                resource_report.add((report, RDF.type, SH.ValidationReport))
+                resource_report.add((report, SH.conforms, Literal(False)))
+                for result in results:
+                    resource_report.add((report, SH.result, result))
+                    resource_report += report_graph.cbd(result)
+                validated[i] = False, resource_report
+            elif i not in targeted:
+                validated[i] = False, RdfService._no_target_report(shape, type_to_validate)[0]
+            else:
+                validated[i] = True, Graph()
+        return validated
+
+    @staticmethod
+    def _no_target_report(shape: ShapeWrapper, type_to_validate: str) -> Tuple[Graph, str]:
+        # Create a dedicated validation report
+        result_desc = (
+            f"No data matching the targets (i.e. what the schema can validate) of {type_to_validate}'s schema"
+            + f" were found in the provided resource. The {type_to_validate} schema can validate the following types: {list(shape.target_classes())}."
+            + f" Consider providing a resource with type in {list(shape.target_classes())}."
+        )
+        r_node = BNode()
+        result = (
+            result_desc,
+            r_node,
+            [
+                (r_node, RDF.type, SH.ValidationResult),
+                (r_node, SH.sourceShape, (shape.sg, shape.node)),
+                (
+                    r_node,
+                    SH.resultSeverity,
+                    SH.Warning,
+                ),  # what is the severity here ?
+            ],
+        )
+        return Validator.create_validation_report(
+            sg=shape.sg, conforms=False, results=[result]
+        )
+
     @abstractmethod
     def resolve_context(self, iri: str) -> Dict:
         """For a given IRI return its resolved context recursively"""
@@ -486,7 +596,7 @@ class RdfService:
                     f"Failed to parse the rdf graph of the imported resource {imported_resource_uriref}: {str(pe)}"
                 ) from pe
 
-        self._imported.append(resource_uriref)
+        self._imported.add(resource_uriref)
         if transitive_imported_ontologies or locally_imported_ontologies:
             if resource_uriref not in self._defining_resource_to_imported_ontology:
                 self._defining_resource_to_imported_ontology[resource_uriref] = []
@@ -609,8 +719,7 @@ class RdfService:
                 rdfcollection_item_index,
             ) in rdfcollection_items_to_remove:
                 del rdfcollection[rdfcollection_item_index]
-            # reloads the shapes graph
-            self._init_shape_graph_wrapper()
+            self.get_shape_graph_wrapper().register_shapes(shape_graph)
             shape = self.get_shape_graph_wrapper().lookup_shape_from_node(
                 node_shape_uriref
             )
@@ -624,6 +733,11 @@ class RdfService:
         if node_shape_uriref not in self.shape_to_defining_resource:
             raise ValueError(f"Unknown shape '{node_shape_uriref}'")
 
+        if node_shape_uriref not in self._shape_graphs:
+            self._shape_graphs[node_shape_uriref] = self._load_shape_graph(node_shape_uriref)
+        return self._shape_graphs[node_shape_uriref]
+
+    def _load_shape_graph(self, node_shape_uriref: URIRef) -> Tuple[ShapeWrapper, Graph, Graph]:
         if self.shape_to_defining_resource[node_shape_uriref] not in self._imported:
             return self._import_shape(node_shape_uriref)
 
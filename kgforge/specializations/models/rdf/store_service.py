@@ -18,7 +18,7 @@ import json
 from rdflib import URIRef, Namespace, Graph
 from rdflib import Dataset as RDFDataset
 
-from kgforge.core.commons.exceptions import RetrievalError
+from kgforge.core.commons.exceptions import QueryingError, RetrievalError
 from kgforge.core.commons.sparql_query_builder import (
     build_ontology_query,
     build_shacl_query,
@@ -26,6 +26,7 @@ from kgforge.core.commons.sparql_query_builder import (
 from kgforge.core.conversions.rdf import as_jsonld
 from kgforge.core.archetypes.store import Store
 from kgforge.specializations.models.rdf.node_properties import NodeProperties
+from kgforge.specializations.models.rdf.schema_cache import SchemaCache
 from kgforge.specializations.models.rdf.service import RdfService
 from kgforge.specializations.stores.nexus import Service
 
@@ -37,10 +38,18 @@ class StoreService(RdfService):
         default_store: Store,
         context_iri: Optional[str] = None,
         context_store: Optional[Store] = None,
+        cache_dir: Optional[str] = None,
     ) -> None:
 
         self.default_store = default_store
         self.context_store = context_store or default_store
+        # Schemas and ontologies graphs are cached on disk by id and revision when a cache_dir is configured.
+        self._schema_cache = (
+            SchemaCache(cache_dir, f"{self.context_store.endpoint}|{self.context_store.bucket}")
+            if cache_dir
+            else None
+        )
+        self._revisions: Optional[Dict[str, str]] = None
         # FIXME: define a store independent strategy
         self.store_metadata_iri = (
             self.default_store.service.store_context
@@ -70,11 +79,10 @@ class StoreService(RdfService):
     def generate_context(self) -> Dict:
         for shape_uriref, schema_uriref in self.shape_to_defining_resource.items():
             if schema_uriref not in self._imported:
-                self._transitive_load_resource_graph(
+                schema_graph, _ = self._transitive_load_resource_graph(
                     self._get_named_graph_from_shape(shape_uriref), schema_uriref
                 )
-        # reloads the shapes graph
-        self._init_shape_graph_wrapper()
+                self.get_shape_graph_wrapper().register_shapes(schema_graph)
         return self._generate_context()
 
     def _build_shapes_map(self) -> Tuple[Dict, Dict, Dict]:
@@ -83,6 +91,8 @@ class StoreService(RdfService):
             deprecated_property_uri=self.NXV.deprecated,
             context=self.context,
         )
+        # rewritten once for all pages
+        query = self.context_store.prepare_sparql(query, rewrite=True)
         # consider taking this from the forge config
         limit = 1000
         offset = 0
@@ -114,7 +124,7 @@ class StoreService(RdfService):
         )
 
     def _build_ontology_map(self) -> Dict:
-        query = build_ontology_query()
+        query = self.context_store.prepare_sparql(build_ontology_query(), rewrite=True)
         limit = 1000
         offset = 0
         count = limit
@@ -162,6 +172,14 @@ class StoreService(RdfService):
         return document
 
     def load_resource_graph_from_source(self, graph_id: str, schema_id: str) -> Graph:
+        rev = self._get_revisions().get(str(schema_id)) if self._schema_cache else None
+        if rev is not None:
+            cached_graph = Graph()
+            if self._schema_cache.load(cached_graph, schema_id, rev):
+                schema_graph = self._dataset_graph.graph(URIRef(graph_id))
+                schema_graph.remove((None, None, None))
+                schema_graph += cached_graph
+                return schema_graph
         try:
             schema_resource = self.context_store.retrieve(
                 schema_id, version=None, cross_bucket=False
@@ -179,4 +197,34 @@ class StoreService(RdfService):
         schema_graph = self._dataset_graph.graph(URIRef(graph_id))
         schema_graph.remove((None, None, None))
         schema_graph.parse(data=json.dumps(json_dict), format="json-ld")
+        retrieved_rev = getattr(schema_resource._store_metadata, "_rev", None)
+        if self._schema_cache and retrieved_rev is not None:
+            self._schema_cache.save(schema_graph, schema_id, retrieved_rev)
         return schema_graph
+
+    def _get_revisions(self) -> Dict[str, str]:
+        # The revisions of all the schemas and ontologies are fetched at once, the first time one is loaded.
+        if self._revisions is None:
+            resource_ids = sorted(
+                {str(x) for x in self.shape_to_defining_resource.values()}
+                | {str(x) for x in self.ont_to_named_graph.keys()}
+            )
+            self._revisions = {}
+            limit = 1000
+            try:
+                query = self.context_store.prepare_sparql(
+                    f"SELECT ?resource_id ?rev WHERE {{ VALUES ?resource_id {{ $ids }} "
+                    f"?resource_id <{self.NXV.rev}> ?rev }}",
+                    rewrite=False
+                )
+                for i in range(0, len(resource_ids), limit):
+                    ids = [URIRef(x) for x in resource_ids[i:i + limit]]
+                    resources = self.context_store.sparql(
+                        query, debug=False, limit=limit, offset=0, bindings={"ids": ids}
+                    )
+                    for r in resources:
+                        self._revisions[str(r.resource_id)] = str(r.rev)
+            except QueryingError:
+                # Without revisions to check against, the schemas are retrieved from the store.
+                self._revisions = {}
+        return self._revisions
@@ -0,0 +1,86 @@
+#
+# Blue Brain Nexus Forge is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Blue Brain Nexus Forge is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU Lesser
+# General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
+from multiprocessing import Pool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from rdflib import Graph, URIRef
+
+from kgforge.core.commons.context import Context
+from kgforge.specializations.models.rdf.service import ShapeWrapper
+
+ShapeGraphs = Tuple[ShapeWrapper, Graph, Graph]
+
+# State of a worker process, set once by _initialize_worker().
+_worker_shapes: Dict[URIRef, ShapeGraphs] = {}
+_worker_context: Optional[Context] = None
+
+
+class ValidationExecutor:
+    """Pool of processes validating resources against SHACL shapes.
+
+    The pool lives as long as the model. The shapes, shapes graphs and ontology graphs are loaded once in each
+    worker when the pool starts so that only the resources are sent to the workers afterwards. The pool is
+    restarted when a validation requires shapes it was not started with.
+    """
+
+    def __init__(self, processes: int) -> None:
+        if processes <= 0:
+            raise ValueError(f"processes value should be greater than 0 but {processes} is provided")
+        self.processes = processes
+        self._pool = None
+        self._shapes: Dict[URIRef, ShapeGraphs] = {}
+        self._context: Optional[Context] = None
+
+    def starmap(
+            self,
+            fc: Callable[..., Any],
+            get_shape_graph: Callable[[URIRef], ShapeGraphs],
+            context: Context,
+            tasks: List[Tuple[URIRef, ...]],
+    ) -> List[Any]:
+        # Each task is a tuple (shape_uriref, *args) run in a worker as fc(shape, shacl_graph, ont_graph, context, *args).
+        # get_shape_graph is only called for the shapes the workers were not started with.
+        missing = {}
+        for task in tasks:
+            shape_uriref = task[0]
+            if shape_uriref not in self._shapes and shape_uriref not in missing:
+                missing[shape_uriref] = get_shape_graph(shape_uriref)
+        if self._pool is None or missing or context is not self._context:
+            self._start({**self._shapes, **missing}, context)
+        return self._pool.starmap(_call, [(fc, *task) for task in tasks])
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        self._shapes = {}
+        self._context = None
+
+    def _start(self, shapes: Dict[URIRef, ShapeGraphs], context: Context) -> None:
+        self.close()
+        self._pool = Pool(processes=self.processes, initializer=_initialize_worker, initargs=(shapes, context))
+        self._shapes = shapes
+        self._context = context
+
+
+def _initialize_worker(shapes: Dict[URIRef, ShapeGraphs], context: Context) -> None:
+    global _worker_shapes, _worker_context
+    _worker_shapes = shapes
+    _worker_context = context
+
+
+def _call(fc: Callable[..., Any], shape_uriref: URIRef, *args) -> Any:
+    shape, shacl_graph, ont_graph = _worker_shapes[shape_uriref]
+    return fc(shape, shacl_graph, ont_graph, _worker_context, *args)
@@ -13,7 +13,6 @@
 # along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
 import datetime
 import re
-from multiprocessing import Pool
 from pathlib import Path
 from typing import Dict, List, Callable, Optional, Any, Union, Tuple
 
@@ -33,6 +32,7 @@ from kgforge.specializations.models.rdf.collectors import NodeProperties
 from kgforge.specializations.models.rdf.directory_service import DirectoryService
 from kgforge.specializations.models.rdf.service import RdfService, ShapeWrapper
 from kgforge.specializations.models.rdf.store_service import StoreService
+from kgforge.specializations.models.rdf.validation_executor import ValidationExecutor
 from kgforge.specializations.models.rdf.utils import as_term
 
 DEFAULT_VALUE = {
@@ -65,11 +65,18 @@ DEFAULT_VALUE = {
 DEFAULT_TYPE_ORDER = [str, float, int, bool, datetime.date, datetime.time]
 
 VALIDATION_PARALLELISM = 10
+VALIDATION_BATCH_SIZE = 1000
 
 
 class RdfModel(Model):
     """Specialization of Model that follows SHACL shapes"""
 
+    def __init__(self, source: str, **source_config) -> None:
+        # The number of processes validating resources in bulk can be set with 'validation_parallelism'.
+        processes = source_config.pop("validation_parallelism", VALIDATION_PARALLELISM)
+        self._validation_executor = ValidationExecutor(processes)
+        super().__init__(source, **source_config)
+
     # Vocabulary.
 
     def _prefixes(self) -> Dict[str, str]:
@@ -138,6 +145,13 @@ class RdfModel(Model):
 
         conforms, graph, report = RdfService.validate(resource, shape, shacl_graph, ont_graph, type_to_validate, inference, context=context)
 
+        return RdfModel._set_validation_status(resource, conforms, graph, report, short_message, raise_)
+
+    @staticmethod
+    def _set_validation_status(
+            resource: Resource, conforms: bool, graph: Graph, report: Optional[str], short_message: bool, raise_: bool
+    ) -> Resource:
+
         if not conforms:
             if not short_message:
                 message = report
@@ -161,32 +175,51 @@ class RdfModel(Model):
         return resource
 
     def _prepare_shapes(self, r: Resource, type_: str) -> Tuple[str, ShapeWrapper, Graph, Graph, Resource]:
-        type_to_validate = RdfService.type_to_validate_against(r, type_)
-        shape, shacl_graph, ont_graph = self.service.get_shape_graph(
-            node_shape_uriref=self.service.get_shape_uriref_from_class_fragment(type_to_validate)
-        )
+        type_to_validate, shape_uriref = self._prepare_shape_uriref(r, type_)
+        shape, shacl_graph, ont_graph = self.service.get_shape_graph(node_shape_uriref=shape_uriref)
         return type_to_validate, shape, shacl_graph, ont_graph, r
 
+    def _prepare_shape_uriref(self, r: Resource, type_: str) -> Tuple[str, URIRef]:
+        type_to_validate = RdfService.type_to_validate_against(r, type_)
+        return type_to_validate, self.service.get_shape_uriref_from_class_fragment(type_to_validate)
+
     @staticmethod
-    def fc_call(type_to_validate, shape, shacl_graph, ont_graph, r, inference, context):
+    def fc_call(shape, shacl_graph, ont_graph, context, resources, type_to_validate, inference):
 
-        return RdfModel._validate(
-            resource=r, type_to_validate=type_to_validate, inference=inference, shape=shape, shacl_graph=shacl_graph,
-            ont_graph=ont_graph, short_message=True, raise_=False, context=context
+        validated = RdfService.validate_many(
+            resources, shape, shacl_graph, ont_graph, type_to_validate, inference, context
         )
+        return [
+            RdfModel._set_validation_status(r, conforms, graph, None, short_message=True, raise_=False)
+            for r, (conforms, graph) in zip(resources, validated)
+        ]
 
     def _validate_many(self, resources: List[Resource], type_: str, inference: str) -> None:
 
-        def validate_iterator():
-            for r in resources:
-                type_to_validate, shape, shacl_graph, ont_graph, r = self._prepare_shapes(r, type_)
-                yield type_to_validate, shape, shacl_graph, ont_graph, r, inference, self.service.context
-
-        resources_2 = Pool(processes=VALIDATION_PARALLELISM).starmap(RdfModel.fc_call, validate_iterator())
+        # Resources are grouped by the shape they are validated against. Each group is split in
+        # chunks validated in a single SHACL validation pass, spread over the validation processes.
+        groups: Dict[Tuple[URIRef, str], List[int]] = {}
+        for i, r in enumerate(resources):
+            type_to_validate, shape_uriref = self._prepare_shape_uriref(r, type_)
+            groups.setdefault((shape_uriref, type_to_validate), []).append(i)
+
+        tasks = []
+        chunks = []
+        for (shape_uriref, type_to_validate), indices in groups.items():
+            size = min(VALIDATION_BATCH_SIZE, -(-len(indices) // self._validation_executor.processes))
+            for start in range(0, len(indices), size):
+                chunk = indices[start:start + size]
+                tasks.append((shape_uriref, [resources[i] for i in chunk], type_to_validate, inference))
+                chunks.append(chunk)
+
+        validated = self._validation_executor.starmap(
+            RdfModel.fc_call, self.service.get_shape_graph, self.service.context, tasks
+        )
 
-        for r_1, r_2 in zip(resources, resources_2):
-            r_1._validated = r_2._validated
-            r_1._last_action = r_2._last_action
+        for chunk, resources_2 in zip(chunks, validated):
+            for i, r_2 in zip(chunk, resources_2):
+                resources[i]._validated = r_2._validated
+                resources[i]._last_action = r_2._last_action
 
     def _validate_one(self, resource: Resource, type_: str, inference: str) -> None:
 
@@ -197,6 +230,9 @@ class RdfModel(Model):
             ont_graph=ont_graph, short_message=False, raise_=True, context=self.service.context
         )
 
+    def close(self) -> None:
+        self._validation_executor.close()
+
     # Utils.
 
     @staticmethod
@@ -210,6 +246,7 @@ class RdfModel(Model):
         store: Callable, context_config: Optional[Dict], **source_config
     ) -> Any:
 
+        cache_dir = source_config.pop("cache_dir", None)
         default_store: Store = store(**source_config)
 
         if context_config:
@@ -232,11 +269,11 @@ class RdfModel(Model):
                     **source_config,
                 )
                 # FIXME: define a store independent StoreService
-                service = StoreService(default_store, context_iri, context_store)
+                service = StoreService(default_store, context_iri, context_store, cache_dir)
             else:
-                service = StoreService(default_store, context_iri, None)
+                service = StoreService(default_store, context_iri, None, cache_dir)
         else:
-            service = StoreService(default_store)
+            service = StoreService(default_store, cache_dir=cache_dir)
 
         return service
 
@@ -16,30 +16,35 @@ import os
 import asyncio
 import copy
 import collections
+import hashlib
 
 import json
 import mimetypes
 import re
-from asyncio import Semaphore, Task, AbstractEventLoop
+import tempfile
+from asyncio import Task
+from concurrent.futures import ThreadPoolExecutor
 
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union, Type, Callable
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union, Type, Callable
 from urllib.parse import quote_plus, unquote, urlparse, parse_qs
 
 import aiohttp
 import requests
-from aiohttp import ClientSession, MultipartWriter, hdrs, ClientResponseError
+from aiohttp import ClientSession, ClientTimeout, MultipartWriter, hdrs, ClientResponseError
 from aiohttp.hdrs import CONTENT_DISPOSITION, CONTENT_TYPE
 
 from kgforge.core.commons.constants import DEFAULT_REQUEST_TIMEOUT
 from kgforge.core.commons.dictionaries import update_dict
 from kgforge.core.commons.es_query_builder import ESQueryBuilder
 from kgforge.core.commons.sparql_query_builder import (
+    PreparedSparql,
     SPARQLQueryBuilder,
     format_type,
     CategoryDataType,
 )
 from kgforge.core.resource import Resource
+from kgforge.core.archetypes.read_only_store import _download_path
 from kgforge.core.archetypes.store import Store
 from kgforge.core.archetypes.mapping import Mapping
 from kgforge.core.archetypes.mapper import Mapper
@@ -57,8 +62,10 @@ from kgforge.core.commons.exceptions import (
     UploadingError,
     SchemaUpdateError,
 )
-from kgforge.core.commons.execution import run, not_supported, catch_http_error
+from kgforge.core.commons.execution import run, not_supported, catch_http_error, paginate
 from kgforge.core.commons.files import is_valid_url
+from kgforge.core.commons.json_stream import iter_json_array
+from kgforge.core.commons.resource_cache import ResourceCache
 from kgforge.core.conversions.json import as_json
 from kgforge.core.wrappings.dict import DictWrapper
 from kgforge.core.wrappings.paths import Filter, create_filters_from_dict
@@ -67,14 +74,23 @@ from kgforge.specializations.mappings.dictionaries import DictionaryMapping
 from kgforge.specializations.stores.nexus.batch_request_handler import (
     BatchRequestHandler,
     BatchResult,
+    BatchResults,
 )
 from kgforge.specializations.stores.nexus.service import Service, _error_message
+from kgforge.specializations.stores.nexus.throttling import AdaptiveLimiter, RetryPolicy
 import kgforge.specializations.stores.nexus.prepare_methods as prepare_methods
 from kgforge.specializations.stores.nexus.http_helpers import files_create
 
 
 REQUEST_TIMEOUT = DEFAULT_REQUEST_TIMEOUT
 JSON_DECODER = json.JSONDecoder(object_pairs_hook=collections.OrderedDict)
+HYDRATION_BATCH_SIZE = 1000
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# Downloads of large files are not bounded as a whole, only while connecting and waiting for data.
+DOWNLOAD_TIMEOUT = ClientTimeout(total=None, sock_connect=REQUEST_TIMEOUT, sock_read=REQUEST_TIMEOUT)
+DOWNLOAD_PARTIAL_SUFFIX = ".part"
+UPLOAD_DIGEST_ALGORITHM = "sha256"
+STREAM_CHUNK_SIZE = 64 * 1024
 
 
 def catch_http_error_nexus(
@@ -91,6 +107,371 @@ def catch_http_error_nexus(
     )
 
 
+def _normalize_filters(filters: Tuple[Union[Dict, Filter], ...]) -> List[Filter]:
+    if filters:
+        if filters[0] is None:
+            raise ValueError("Filters cannot be None")
+        if isinstance(filters[0], dict):
+            return create_filters_from_dict(filters[0])
+    return list(filters)
+
+
+def _resource_cache_key(url: str, query_params: Dict) -> Tuple:
+    # Query parameters parsed from an identifier are lists while the ones of a version are not.
+    params = {k: str(v[0]) if isinstance(v, list) else str(v) for k, v in query_params.items()}
+    return url, tuple(sorted(params.items()))
+
+
+def _cached_resource(cache: Optional[ResourceCache], key: Tuple) -> Optional[Tuple[Optional[str], Resource]]:
+    if cache is None:
+        return None
+    found, cached = cache.get(key)
+    return cached if found else None
+
+
+def _conditional_headers(headers: Dict, cached: Optional[Tuple[Optional[str], Resource]]) -> Dict:
+    # A cached resource is sent back by the store only if it changed since it was retrieved.
+    if cached is None or cached[0] is None:
+        return headers
+    return {**headers, hdrs.IF_NONE_MATCH: cached[0]}
+
+
+def _build_retrieved_resource(
+    store: "BlueBrainNexus",
+    payload: Dict,
+    etag: Optional[str],
+    key: Tuple,
+    cached: Optional[Tuple[Optional[str], Resource]],
+) -> Resource:
+    rev = payload.get("_rev")
+    if cached is not None and rev is not None and rev == getattr(cached[1]._store_metadata, "_rev", None):
+        # Without an ETag, an unchanged revision is still not rebuilt.
+        resource = cached[1]
+    else:
+        try:
+            resource = store.service.to_resource(payload)
+            store.service.synchronize_resource(
+                resource, None, store.retrieve.__name__, True, True
+            )
+        except Exception as e:
+            raise RetrievalError(e) from e
+    if store.resource_cache is not None:
+        store.resource_cache.put(key, (etag, resource))
+        params = dict(key[1])
+        if rev is not None and "rev" not in params:
+            # Later lookups of this revision are served without requests.
+            params.pop("tag", None)
+            params["rev"] = str(rev)
+            store.resource_cache.put((key[0], tuple(sorted(params.items()))), (etag, resource))
+    return resource
+
+
+def _download_headers(service: Service, content_type: Optional[str]) -> Dict:
+    return (
+        service.headers_download
+        if not content_type
+        else update_dict(service.headers_download, {"Accept": content_type})
+    )
+
+
+def _partial_download_path(path: str, url: str) -> str:
+    # Named after the url so that a download interrupted in a previous call is resumed whatever the final path.
+    directory, _ = os.path.split(path)
+    return os.path.join(directory, f".{hashlib.sha1(url.encode('utf-8')).hexdigest()}{DOWNLOAD_PARTIAL_SUFFIX}")
+
+
+def _file_digest(digest: Optional[Dict]) -> Tuple[Optional[str], Optional[str]]:
+    # The hashlib algorithm and the hexadecimal value of a Nexus file _digest, (None, None) if not usable.
+    if not digest or not digest.get("_value"):
+        return None, None
+    algorithm = str(digest.get("_algorithm", "")).lower().replace("-", "")
+    if algorithm not in hashlib.algorithms_available:
+        return None, None
+    return algorithm, digest["_value"].lower()
+
+
+def _hash_file(hasher: Any, path: str) -> Any:
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    return hasher
+
+
+def _write_chunk(f: Any, hasher: Any, chunk: bytes) -> None:
+    f.write(chunk)
+    if hasher is not None:
+        hasher.update(chunk)
+
+
+def _is_identical(path: Path, digest: Optional[Dict]) -> bool:
+    algorithm, value = _file_digest(digest)
+    return algorithm is not None and path.is_file() and _hash_file(hashlib.new(algorithm), str(path)).hexdigest() == value
+
+
+async def _download_file(
+    service: Service,
+    session: ClientSession,
+    semaphore: AdaptiveLimiter,
+    url: str,
+    path: str,
+    bucket: str,
+    headers: Dict,
+    digest: Optional[Dict],
+) -> None:
+    # The file is streamed to a partial file which is resumed with a Range request after a failure, even in a later
+    # call, checked against the digest if given, and only then renamed to path. The file is written and hashed in
+    # threads so that the loop keeps serving the other downloads.
+    loop = asyncio.get_running_loop()
+    partial = _partial_download_path(path, url)
+    params_download = copy.deepcopy(service.params.get("download", {}))
+    algorithm, expected = _file_digest(digest)
+    retry_policy = service.retry_policy
+    error = f"Downloading url {url} from bucket {bucket} failed"
+    attempt = 0
+    restarted = False
+
+    while True:
+        attempt += 1
+        offset = os.path.getsize(partial) if os.path.exists(partial) else 0
+        hasher = hashlib.new(algorithm) if algorithm is not None else None
+        retryable = False
+        retry_after = None
+        try:
+            async with semaphore:
+                request_headers = update_dict(headers, {hdrs.RANGE: f"bytes={offset}-"}) if offset else headers
+                async with session.get(
+                    url, params=params_download, headers=request_headers, timeout=DOWNLOAD_TIMEOUT
+                ) as response:
+                    if offset and response.status == 416:
+                        # The partial file is complete unless the file changed since it was written.
+                        content_range = response.headers.get(hdrs.CONTENT_RANGE, "")
+                        if content_range != f"bytes */{offset}":
+                            os.remove(partial)
+                            continue
+                        if hasher is not None:
+                            await loop.run_in_executor(None, _hash_file, hasher, partial)
+                    elif retry_policy.is_retryable(hdrs.METH_GET, attempt, response.status):
+                        retryable = True
+                        retry_after = response.headers.get(hdrs.RETRY_AFTER)
+                    else:
+                        catch_http_error_nexus(
+                            response,
+                            DownloadingError,
+                            error_message_formatter=lambda e: f"{error}: {_error_message(e)}",
+                            aiohttp_error=True,
+                        )
+                        resumed = offset and response.status == 206
+                        if resumed and hasher is not None:
+                            await loop.run_in_executor(None, _hash_file, hasher, partial)
+                        mode = "ab" if resumed else "wb"
+                        f = None
+                        try:
+                            # The file is only opened once data were received: the data buffered when the
+                            # connection is lost are dropped.
+                            async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                                f = f or await loop.run_in_executor(None, open, partial, mode)
+                                await loop.run_in_executor(None, _write_chunk, f, hasher, chunk)
+                            f = f or await loop.run_in_executor(None, open, partial, mode)
+                        finally:
+                            if f is not None:
+                                await loop.run_in_executor(None, f.close)
+        except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+            if not retry_policy.is_retryable(hdrs.METH_GET, attempt):
+                raise DownloadingError(f"{error}: {e}") from e
+            await asyncio.sleep(retry_policy.delay(attempt))
+            continue
+
+        if retryable:
+            await asyncio.sleep(retry_policy.delay(attempt, retry_after))
+            continue
+
+        if hasher is not None and hasher.hexdigest() != expected:
+            os.remove(partial)
+            if offset and not restarted:
+                # The resumed partial file might have been written from another version of the file.
+                restarted = True
+                continue
+            raise DownloadingError(f"{error}: the {algorithm} digest of the downloaded file is not {expected}")
+
+        os.replace(partial, path)
+        return
+
+
+async def _upload_file(
+    service: Service, session: ClientSession, semaphore: AdaptiveLimiter, path: Path, content_type: Optional[str]
+) -> Dict:
+    # The file is only opened once a connection is available, so that at most max_connection files are open, and
+    # its content is streamed in the request body.
+    default = "application/octet-stream"
+    mime_type = content_type or mimetypes.guess_type(str(path))[0] or default
+    async with semaphore:
+        with path.open("rb") as f:
+            # FIXME Nexus seems to not parse the Content-Disposition 'filename*' field  properly.
+            # data = FormData()
+            # data.add_field("file", f, content_type=mime_type, filename=path.name)
+            # FIXME This hack is to prevent sending Content-Disposition with the 'filename*' field.
+            data = MultipartWriter("form-data")
+            part = data.append(f)
+            part.headers[CONTENT_TYPE] = mime_type
+            part.headers[CONTENT_DISPOSITION] = (
+                f'form-data; name="file"; filename="{path.name}"'
+            )
+            headers = update_dict(
+                service.headers_upload, {service.NEXUS_CONTENT_LENGTH_HEADER: str(os.path.getsize(path))}
+            )
+            async with session.post(service.url_files, data=data, headers=headers) as response:
+                text = await response.text()
+    try:
+        body = JSON_DECODER.decode(text)
+    except ValueError as e:
+        raise UploadingError(f"{response.status} {response.reason}: {text}") from e
+    if response.status < 400:
+        return body
+    error_type = body.get("@type") if isinstance(body, Dict) else None
+    if not isinstance(error_type, str):
+        raise UploadingError(f"{response.status} {response.reason}: {text}")
+    msg = " ".join(re.findall("[A-Z][^A-Z]*", error_type)).lower()
+    raise UploadingError(msg)
+
+
+def _load_upload_manifest(path: Optional[str]) -> Dict:
+    # 'digests' maps the digests of the uploaded files to their metadata and 'files' maps the local files to
+    # their size, modification time and digest, to not hash them again while they are not modified.
+    manifest = {"digests": {}, "files": {}}
+    if path is not None and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            manifest.update(json.load(f))
+    return manifest
+
+
+def _save_upload_manifest(path: str, manifest: Dict) -> None:
+    # Written to a temporary file first so that an interrupted upload does not corrupt the manifest.
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, path)
+    except OSError:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _local_digest(path: Path, manifest: Dict) -> str:
+    stat = path.stat()
+    key = str(path.absolute())
+    known = manifest["files"].get(key)
+    if known is not None and known[:2] == [stat.st_size, stat.st_mtime_ns]:
+        return known[2]
+    digest = _hash_file(hashlib.new(UPLOAD_DIGEST_ALGORITHM), str(path)).hexdigest()
+    manifest["files"][key] = [stat.st_size, stat.st_mtime_ns, digest]
+    return digest
+
+
+def _bulk_fetch_files_by_digests(service: Service, digests: List[str]) -> Dict[str, Dict]:
+    # Map the digests of the files found in the default Elasticsearch view of the configured project to their
+    # metadata, as returned when they were uploaded. Failing lookups are misses.
+    endpoint = Service.make_query_endpoint(
+        service.endpoint, service.default_es_index, Service.ELASTIC_ENDPOINT_TYPE,
+        service.organisation, service.project
+    )
+    files = {}
+    for start in range(0, len(digests), HYDRATION_BATCH_SIZE):
+        hits = _search_by_terms(
+            service, endpoint, "_digest._value", digests[start:start + HYDRATION_BATCH_SIZE], ["@id", "@type", "_*"],
+            {"term": {"_deprecated": False}}
+        )
+        for hit in hits or []:
+            original = hit.pop("_original_source", None)
+            if original is not None:
+                hit = {**(JSON_DECODER.decode(original) if isinstance(original, str) else original), **hit}
+            algorithm, value = _file_digest(hit.get("_digest"))
+            if algorithm == UPLOAD_DIGEST_ALGORITHM and hit.get("@id") is not None:
+                files.setdefault(value, hit)
+    return files
+
+
+def _search_by_ids(service: Service, endpoint: str, ids: List[str], includes: List[str]) -> Optional[List[Dict]]:
+    # Sources of the documents of an Elasticsearch view with the given @id. None if the lookup failed.
+    return _search_by_terms(service, endpoint, "@id", ids, includes)
+
+
+def _search_by_terms(
+    service: Service, endpoint: str, field: str, values: List[str], includes: List[str], *filters: Dict
+) -> Optional[List[Dict]]:
+    # Sources of the documents of an Elasticsearch view with one of the given values for field and matching
+    # the additional filters. None if the lookup failed.
+    query = {
+        "query": {"bool": {"filter": [{"terms": {field: values}}, *filters]}},
+        "size": len(values),
+        "_source": includes,
+    }
+    try:
+        response = service.http.post(
+            endpoint,
+            data=json.dumps(query),
+            headers=service.headers_elastic,
+            timeout=REQUEST_TIMEOUT,
+        )
+        catch_http_error_nexus(response, QueryingError)
+        return [hit.get("_source", {}) for hit in response.json()["hits"]["hits"]]
+    except (QueryingError, requests.RequestException, ValueError, KeyError):
+        return None
+
+
+def _bulk_fetch_by_ids(service: Service, ids: List[str]) -> Dict[str, Dict]:
+    # Map the ids found in the default Elasticsearch view of the configured project to their payload, as returned
+    # by the source endpoint with annotate=true: the original source and the metadata. Failing lookups are misses.
+    endpoint = Service.make_query_endpoint(
+        service.endpoint, service.default_es_index, Service.ELASTIC_ENDPOINT_TYPE,
+        service.organisation, service.project
+    )
+    payloads = {}
+    for start in range(0, len(ids), HYDRATION_BATCH_SIZE):
+        hits = _search_by_ids(service, endpoint, ids[start:start + HYDRATION_BATCH_SIZE], ["@id", "_*"])
+        for hit in hits or []:
+            original = hit.pop("_original_source", None)
+            if original is None or hit.get("@id") is None:
+                continue
+            payload = JSON_DECODER.decode(original) if isinstance(original, str) else original
+            payload.update((k, v) for k, v in hit.items() if k.startswith("_"))
+            payloads[hit["@id"]] = payload
+    return payloads
+
+
+def _bulk_fetch_sources(service: Service, resources: List[Resource]) -> Dict[int, Dict]:
+    # Map the index of each resource found with the same revision in the default Elasticsearch view
+    # of its project to its original source payload. Failing lookups are reported as misses.
+    positions = collections.defaultdict(list)
+    for i, resource in enumerate(resources):
+        project = getattr(resource, "_project", None)
+        if project is not None and hasattr(resource, "_rev"):
+            positions[project].append(i)
+
+    sources = {}
+    for project, indices in positions.items():
+        org, prj = project.split("/")[-2:]
+        endpoint = Service.make_query_endpoint(
+            service.endpoint, service.default_es_index, Service.ELASTIC_ENDPOINT_TYPE, org, prj
+        )
+        for start in range(0, len(indices), HYDRATION_BATCH_SIZE):
+            chunk = indices[start:start + HYDRATION_BATCH_SIZE]
+            ids = list({resources[i].id for i in chunk})
+            hits = _search_by_ids(service, endpoint, ids, ["@id", "_rev", "_original_source"])
+            if hits is None:
+                continue
+            indexed = {}
+            for source in hits:
+                if "_original_source" in source:
+                    indexed[source.get("@id")] = source
+            for i in chunk:
+                hit = indexed.get(resources[i].id)
+                if hit is not None and str(hit.get("_rev")) == str(resources[i]._rev):
+                    original = hit["_original_source"]
+                    sources[i] = JSON_DECODER.decode(original) if isinstance(original, str) else original
+    return sources
+
+
 class BlueBrainNexus(Store):
 
     @property
@@ -123,9 +504,7 @@ class BlueBrainNexus(Store):
             schema_id=schema_id,
         )
 
-    def _register_many(self, resources: List[Resource], schema_id: str) -> None:
-
-        fc_name = self._register_many.__name__
+    def _register_callback(self, fc_name: str) -> Callable:
 
         def register_callback(task: Task):
             result = task.result()
@@ -146,6 +525,12 @@ class BlueBrainNexus(Store):
                 result.resource, result.response, fc_name, succeeded, succeeded
             )
 
+        return register_callback
+
+    def _register_many(self, resources: List[Resource], schema_id: str) -> None:
+
+        fc_name = self._register_many.__name__
+
         verified = self.service.verify(
             resources,
             function_name=fc_name,
@@ -158,16 +543,45 @@ class BlueBrainNexus(Store):
         BatchRequestHandler.batch_request_on_resources(
             service=self.service,
             resources=verified,
-            callback=register_callback,
+            callback=self._register_callback(fc_name),
+            prepare_function=prepare_methods.prepare_create,
+            schema_id=schema_id,
+        )
+
+    def register_stream(
+        self, data: Iterable[Resource], schema_id: Optional[str], window: int
+    ) -> Iterator[Resource]:
+
+        fc_name = self.register_stream.__name__
+
+        def verify(resource: Resource) -> bool:
+            verified = self.service.verify(
+                [resource],
+                function_name=fc_name,
+                exception=RegistrationError,
+                id_required=False,
+                required_synchronized=False,
+                execute_actions=True,
+            )
+            return len(verified) == 1
+
+        results = BatchRequestHandler.stream_request_on_resources(
+            service=self.service,
+            resources=data,
             prepare_function=prepare_methods.prepare_create,
+            window=window,
+            callback=self._register_callback(fc_name),
+            verify=verify,
             schema_id=schema_id,
         )
+        for result in results:
+            yield result.resource
 
     def _register_one(self, resource: Resource, schema_id: str) -> None:
         method, url, resource, exception_, headers, params, payload = (
             prepare_methods.prepare_create(service=self.service, resource=resource, schema_id=schema_id)
         )
-        response = requests.request(
+        response = self.service.http.request(
             method=method,
             url=url,
             headers=headers,
@@ -189,61 +603,52 @@ class BlueBrainNexus(Store):
         self.service.sync_metadata(resource, response_json)
 
     def _upload_many(self, paths: List[Path], content_type: str) -> List[Dict]:
-        async def _bulk():
-            loop = asyncio.get_event_loop()
-            semaphore = Semaphore(self.service.max_connection)
-            async with ClientSession(headers=self.service.headers_upload) as session:
-                tasks = (_create_task(x, loop, semaphore, session) for x in paths)
-                return await asyncio.gather(*tasks)
-
-        def _create_task(path, loop, semaphore, session):
-            default = "application/octet-stream"
-            mime_type = content_type or mimetypes.guess_type(str(path))[0] or default
-            # FIXME Nexus seems to not parse the Content-Disposition 'filename*' field  properly.
-            # data = FormData()
-            # data.add_field("file", path.open("rb"), content_type=mime_type, filename=path.name)
-            # FIXME This hack is to prevent sending Content-Disposition with the 'filename*' field.
-            data = MultipartWriter("form-data")
-            part = data.append(path.open("rb"))
-            part.headers[CONTENT_TYPE] = mime_type
-            part.headers[CONTENT_DISPOSITION] = (
-                f'form-data; name="file"; filename="{path.name}"'
-            )
-            return loop.create_task(_upload(data, semaphore, session))
+        if not self.service.upload_deduplicate:
+            return self._upload_files(paths, content_type)
 
-        async def _upload(data, semaphore, session):
-            async with semaphore:
-                async with session.post(self.service.url_files, data=data) as response:
-                    body = await response.json()
-                    if response.status < 400:
-                        return body
+        # Files are identified by their digest. The ones already uploaded, according to the manifest or to the
+        # default Elasticsearch view of the project, are not uploaded again, and neither are duplicated files.
+        manifest = _load_upload_manifest(self.service.upload_manifest)
+        with ThreadPoolExecutor() as executor:
+            digests = list(executor.map(lambda x: _local_digest(x, manifest), paths))
+        uploaded = {digest: manifest["digests"][digest] for digest in digests if digest in manifest["digests"]}
+        missing = list(dict.fromkeys(digest for digest in digests if digest not in uploaded))
+        uploaded.update(_bulk_fetch_files_by_digests(self.service, missing))
 
-                    msg = " ".join(re.findall("[A-Z][^A-Z]*", body["@type"])).lower()
-                    raise UploadingError(msg)
+        first = {}
+        for path, digest in zip(paths, digests):
+            if digest not in uploaded:
+                first.setdefault(digest, path)
+        uploaded.update(zip(first.keys(), self._upload_files(list(first.values()), content_type)))
 
-        return asyncio.run(_bulk())
+        if self.service.upload_manifest is not None:
+            manifest["digests"].update(uploaded)
+            _save_upload_manifest(self.service.upload_manifest, manifest)
 
-    def _upload_one(self, path: Path, content_type: str) -> Dict:
-        file = str(path.absolute())
-        mime_type = content_type or mimetypes.guess_type(file, True)[0]
-        if mime_type is None:
-            mime_type = "application/octet-stream"
-        try:
-            headers = self.service.headers_upload
-            filename = file.split("/")[-1]
-            headers[self.service.NEXUS_CONTENT_LENGTH_HEADER] = str(
-                os.path.getsize(file)
-            )
-            file_obj = {"file": (filename, open(file, "rb"), mime_type)}
-            response = requests.post(
-                self.service.url_files, headers=headers, files=file_obj
+        return [copy.deepcopy(uploaded[digest]) for digest in digests]
+
+    def _upload_files(self, paths: List[Path], content_type: str) -> List[Dict]:
+
+        async def _bulk():
+            loop = asyncio.get_running_loop()
+            semaphore = self.service.get_limiter()
+            session = self.service.get_session()
+            tasks = (
+                loop.create_task(_upload_file(self.service, session, semaphore, path, content_type))
+                for path in paths
             )
-            response.raise_for_status()
+            return await asyncio.gather(*tasks)
+
+        return self.service.run_async(_bulk())
 
-        except requests.HTTPError as e:
-            raise UploadingError(_error_message(e)) from e
+    def _upload_one(self, path: Path, content_type: str) -> Dict:
+
+        async def _upload():
+            return await _upload_file(
+                self.service, self.service.get_session(), self.service.get_limiter(), path, content_type
+            )
 
-        return JSON_DECODER.decode(response.text)
+        return self.service.run_async(_upload())
 
     # C[R]UD.
 
@@ -273,55 +678,56 @@ class BlueBrainNexus(Store):
 
     def _get_resource_sync(self, url: str, query_params: Dict) -> Resource:
 
-        response = requests.request(
+        key = _resource_cache_key(url, query_params)
+        cached = _cached_resource(self.resource_cache, key)
+        if cached is not None and "rev" in query_params:
+            return cached[1]
+
+        response = self.service.http.request(
             method=hdrs.METH_GET,
             url=url,
-            headers=self.service.headers,
+            headers=_conditional_headers(self.service.headers, cached),
             params=query_params,
         )
 
+        if cached is not None and response.status_code == 304:
+            return cached[1]
+
         catch_http_error_nexus(
             response, RetrievalError, aiohttp_error=False
         )
 
         response_json = response.json()
 
-        try:
-            resource = self.service.to_resource(response_json)
-            self.service.synchronize_resource(
-                resource, None, self.retrieve.__name__, True, True
-            )
-            return resource
-
-        except Exception as e:
-            raise RetrievalError(e) from e
+        return _build_retrieved_resource(self, response_json, response.headers.get("ETag"), key, cached)
 
     async def _get_resource_async(
         self, session: ClientSession, url: str, query_params: Dict
     ) -> Resource:
 
+        key = _resource_cache_key(url, query_params)
+        cached = _cached_resource(self.resource_cache, key)
+        if cached is not None and "rev" in query_params:
+            return cached[1]
+
         async with session.request(
             method=hdrs.METH_GET,
             url=url,
-            headers=self.service.headers,
+            headers=_conditional_headers(self.service.headers, cached),
             params=query_params,
         ) as response:
 
+            if cached is not None and response.status == 304:
+                return cached[1]
+
             catch_http_error_nexus(
                 response, RetrievalError, aiohttp_error=True
             )
 
             response_json = await response.json()
+            etag = response.headers.get("ETag")
 
-        try:
-            resource = self.service.to_resource(response_json)
-            self.service.synchronize_resource(
-                resource, None, self.retrieve.__name__, True, True
-            )
-            return resource
-
-        except Exception as e:
-            raise RetrievalError(e) from e
+        return _build_retrieved_resource(self, response_json, etag, key, cached)
 
     def _retrieve_one(
         self, id_: str, version: Optional[Union[int, str]], cross_bucket: bool, **params
@@ -350,6 +756,44 @@ class BlueBrainNexus(Store):
         cross_bucket: bool,
         **params,
     ) -> List[Union[Resource, Action]]:
+        # Repeated identifiers are retrieved once. With bulk_retrieve, the latest revisions of the resources of the
+        # configured bucket are looked up at once in its default Elasticsearch view. Versioned identifiers and the
+        # resources missing there are fetched one by one.
+        keys = list(dict.fromkeys(zip(ids, versions)))
+        results = {}
+        if params.get("bulk_retrieve", False) and params.get("retrieve_source", True) and not cross_bucket:
+            latest = [
+                id_ for id_, version in keys
+                if version is None and not {"rev", "tag"} & set(self._local_url_parse(id_, None)[1])
+            ]
+            for id_, payload in _bulk_fetch_by_ids(self.service, latest).items():
+                try:
+                    resource = self.service.to_resource(payload)
+                except Exception:
+                    continue
+                self.service.synchronize_resource(resource, None, self.retrieve.__name__, True, True)
+                results[(id_, None)] = resource
+        misses = [key for key in keys if key not in results]
+        if misses:
+            fetched = self._fetch_many(
+                [id_ for id_, _ in misses], [version for _, version in misses], cross_bucket, **params
+            )
+            results.update(zip(misses, fetched))
+        returned = set()
+        retrieved = []
+        for key in zip(ids, versions):
+            # each occurrence of a repeated identifier gets its own copy
+            retrieved.append(copy.deepcopy(results[key]) if key in returned else results[key])
+            returned.add(key)
+        return retrieved
+
+    def _fetch_many(
+        self,
+        ids: List[str],
+        versions: List[Optional[Union[int, str]]],
+        cross_bucket: bool,
+        **params,
+    ) -> List[Union[Resource, Action]]:
 
         def retrieve_done_callback(task: Task):
             result = task.result()
@@ -366,12 +810,12 @@ class BlueBrainNexus(Store):
                 )
 
         async def create_tasks(
-            semaphore: asyncio.Semaphore,
-            loop: AbstractEventLoop,
+            semaphore: AdaptiveLimiter,
+            session: ClientSession,
             ids_: List[Any],
             service,
             **kwargs,
-        ) -> Tuple[List[asyncio.Task], List[ClientSession]]:
+        ) -> List[asyncio.Task]:
 
             async def do_catch(id_, version, session) -> Union[Resource, Action]:
                 try:
@@ -404,22 +848,17 @@ class BlueBrainNexus(Store):
                 except RetrievalError as e:
                     return Action(self._retrieve_many.__name__, False, e)
 
+            loop = asyncio.get_running_loop()
             vs = kwargs["versions"]
             tasks = []
-            sessions = []
-            for batch_i in BatchRequestHandler.batch(list(zip(ids_, vs))):
-
-                session = ClientSession()
-                sessions.append(session)
+            for id_, version in zip(ids_, vs):
+                batch_result = do_catch(id_, version, session)
+                prepared_request: asyncio.Task = loop.create_task(batch_result)
 
-                for id_, version in batch_i:
-                    batch_result = do_catch(id_, version, session)
-                    prepared_request: asyncio.Task = loop.create_task(batch_result)
+                prepared_request.add_done_callback(retrieve_done_callback)
+                tasks.append(prepared_request)
 
-                    prepared_request.add_done_callback(retrieve_done_callback)
-                    tasks.append(prepared_request)
-
-            return tasks, sessions
+            return tasks
 
         batch_results = BatchRequestHandler.batch_request(
             service=self.service,
@@ -447,6 +886,9 @@ class BlueBrainNexus(Store):
         :param params: a dictionary of parameters. Supported parameters are:
               [retrieve_source] whether to retrieve the resource payload as registered in the last update
               (default: True)
+              [bulk_retrieve] whether to look up many resources of the bucket at once in its default
+              Elasticsearch view (True) or to fetch them one by one (False, default). The view is updated
+              asynchronously: resources just updated might be returned at a previous revision.
         :return: Union[List[Optional[Resource]], Optional[Resource]]
         """
 
@@ -531,7 +973,7 @@ class BlueBrainNexus(Store):
             return url, query_params
 
     def _retrieve_file_metadata(self, id_: str) -> Dict:
-        response = requests.get(
+        response = self.service.http.get(
             id_, headers=self.service.headers, timeout=REQUEST_TIMEOUT
         )
         catch_http_error_nexus(response, DownloadingError)
@@ -551,42 +993,70 @@ class BlueBrainNexus(Store):
         content_type: str,
         buckets: List[str],
     ) -> None:
+        headers = _download_headers(self.service, content_type)
+
         async def _bulk():
-            loop = asyncio.get_event_loop()
-            semaphore = Semaphore(self.service.max_connection)
-            headers = (
-                self.service.headers_download
-                if not content_type
-                else update_dict(
-                    self.service.headers_download, {"Accept": content_type}
-                )
+            loop = asyncio.get_running_loop()
+            semaphore = self.service.get_limiter()
+            session = self.service.get_session()
+            tasks = (
+                _create_task(x, y, b, loop, semaphore, session)
+                for x, y, b in zip(urls, paths, buckets)
             )
-            async with ClientSession(headers=headers) as session:
-                tasks = (
-                    _create_task(x, y, z, b, loop, semaphore, session)
-                    for x, y, z, b in zip(urls, paths, store_metadata, buckets)
-                )
-                return await asyncio.gather(*tasks)
+            return await asyncio.gather(*tasks)
 
-        def _create_task(url, path, store_metadata, bucket, loop, semaphore, session):
+        def _create_task(url, path, bucket, loop, semaphore, session):
             return loop.create_task(
-                _download(url, path, store_metadata, bucket, semaphore, session)
+                _download_file(self.service, session, semaphore, url, path, bucket, headers, None)
             )
 
-        async def _download(url, path, store_metadata, bucket, semaphore, session):
-            async with semaphore:
-                params_download = copy.deepcopy(self.service.params.get("download", {}))
-                async with session.get(url, params=params_download) as response:
-                    catch_http_error_nexus(
-                        response,
-                        DownloadingError,
-                        error_message_formatter=lambda e: f"Downloading url {url} from bucket {bucket} failed: {_error_message(e)}",
-                    )
-                    with open(path, "wb") as f:
-                        data = await response.read()
-                        f.write(data)
+        return self.service.run_async(_bulk())
 
-        return asyncio.run(_bulk())
+    def _download_files(
+        self,
+        urls: List[str],
+        store_metadata: List[Optional[DictWrapper]],
+        buckets: List[str],
+        dirpath: Path,
+        overwrite: bool,
+        timestamp: str,
+        cross_bucket: bool,
+        content_type: Optional[str],
+    ) -> int:
+        # The metadata of the files are retrieved concurrently and each file is downloaded as soon as its
+        # metadata arrives, instead of after the metadata of all the files. The metadata also give the digest
+        # used to check the downloaded files and, with skip_identical, to skip the files already downloaded.
+        headers = _download_headers(self.service, content_type)
+
+        async def _bulk():
+            loop = asyncio.get_running_loop()
+            semaphore = self.service.get_limiter()
+            session = self.service.get_session()
+            files = asyncio.Semaphore(self.service.download_concurrency or len(urls))
+            tasks = [
+                loop.create_task(_resolve_and_download(url, bucket, semaphore, session, files))
+                for url, bucket in zip(urls, buckets)
+            ]
+            return await asyncio.gather(*tasks)
+
+        async def _resolve_and_download(url, bucket, semaphore, session, files) -> bool:
+            async with files:
+                async with semaphore:
+                    async with session.get(url, headers=self.service.headers) as response:
+                        catch_http_error_nexus(response, DownloadingError, aiohttp_error=True)
+                        metadata = await response.json()
+                if content_type and metadata["_mediaType"] != content_type:
+                    return False
+                digest = metadata.get("_digest")
+                if self.service.download_skip_identical and await asyncio.get_running_loop().run_in_executor(
+                    None, _is_identical, dirpath / metadata["_filename"], digest
+                ):
+                    return True
+                path = _download_path(dirpath, metadata["_filename"], overwrite, timestamp)
+                await _download_file(self.service, session, semaphore, url, path, bucket, headers, digest)
+                return True
+
+        return sum(self.service.run_async(_bulk()))
 
     def _download_one(
         self,
@@ -598,24 +1068,13 @@ class BlueBrainNexus(Store):
         bucket: str,
     ) -> None:
 
-        params_download = copy.deepcopy(self.service.params.get("download", {}))
-        headers = (
-            self.service.headers_download
-        )
-
-        response = requests.get(
-            url=url, headers=headers, params=params_download, timeout=REQUEST_TIMEOUT
-        )
-        catch_http_error_nexus(
-            response,
-            DownloadingError,
-            error_message_formatter=lambda e: f"Downloading from bucket {bucket} failed: "
-            f"{_error_message(e)}",
-        )
+        async def _download():
+            await _download_file(
+                self.service, self.service.get_session(), self.service.get_limiter(), url, path, bucket,
+                self.service.headers_download, None
+            )
 
-        with open(path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=4096):
-                f.write(chunk)
+        self.service.run_async(_download())
 
     def _prepare_download_one_with_org_project(self, url: str, org: str, project: str):
         file_id = url.split("/")[-1]
@@ -699,7 +1158,7 @@ class BlueBrainNexus(Store):
             prepare_methods.prepare_update(service=self.service, resource=resource, schema_id=schema_id)
         )
 
-        response = requests.request(
+        response = self.service.http.request(
             method=method,
             url=url,
             headers=headers,
@@ -720,7 +1179,7 @@ class BlueBrainNexus(Store):
                 service=self.service, resource=resource, schema_id=schema_id
             )
         )
-        response = requests.request(
+        response = self.service.http.request(
             method=method,
             url=url,
             headers=headers,
@@ -804,7 +1263,7 @@ class BlueBrainNexus(Store):
             )
         )
 
-        response = requests.request(
+        response = self.service.http.request(
             method=method,
             url=url,
             headers=headers,
@@ -854,7 +1313,7 @@ class BlueBrainNexus(Store):
             prepare_methods.prepare_deprecate(service=self.service, resource=resource)
         )
 
-        response = requests.request(
+        response = self.service.http.request(
             method=method,
             url=url,
             headers=headers,
@@ -908,14 +1367,7 @@ class BlueBrainNexus(Store):
         if bucket and not cross_bucket:
             raise not_supported(("bucket", True))
 
-        if filters:
-            if isinstance(filters, (list, tuple)) and len(filters) > 0:
-                if filters[0] is None:
-                    raise ValueError("Filters cannot be None")
-                elif isinstance(filters[0], dict):
-                    filters = create_filters_from_dict(filters[0])
-            else:
-                filters = list(filters)
+        filters = _normalize_filters(filters)
 
         if search_endpoint == Service.SPARQL_ENDPOINT_TYPE:
             if includes or excludes:
@@ -963,6 +1415,8 @@ class BlueBrainNexus(Store):
             query = SPARQLQueryBuilder.create_select_query(
                 _vars, f"?id {statements} . \n {_filters}", distinct, search_in_graph
             )
+            if params.get("order_by_id", False):
+                query = f"{query} ORDER BY ?id"
             # support @id and @type
             resources = self.sparql(
                 query,
@@ -971,12 +1425,8 @@ class BlueBrainNexus(Store):
                 offset=offset,
                 view=params.get("view", None),
             )
-            results = BatchRequestHandler.batch_request_on_resources(
-                service=self.service,
-                resources=resources,
-                prepare_function=prepare_methods.prepare_fetch,
-                callback=None,
-                retrieve_source=retrieve_source,
+            results = self._hydrate(
+                resources, retrieve_source, params.get("bulk_hydration", True)
             )
             resources = []
             for result in results:
@@ -1015,77 +1465,246 @@ class BlueBrainNexus(Store):
                 resources.append(resource)
             return resources
         else:
-            if isinstance(self.service.elastic_endpoint["view"], LazyAction):
-                self.service.elastic_endpoint["view"] = self.service.elastic_endpoint[
-                    "view"
-                ].execute()
-
-            elastic_mapping = self.service.elastic_endpoint["view"].get("mapping", None)
+            query = self._elastic_search_query(
+                filters, resolvers, deprecated, bucket, cross_bucket, includes, excludes
+            )
+            return self.elastic(
+                json.dumps(query),
+                debug=debug,
+                limit=limit,
+                offset=offset,
+                view=params.get("view", None),
+            )
 
-            default_str_keyword_field = self.service.elastic_endpoint[
-                "default_str_keyword_field"
-            ]
-            deprecated_property_context_term = self.service.metadata_context.find_term(
-                self.service.deprecated_property
+    def _elastic_search_query(
+        self,
+        filters: List[Filter],
+        resolvers: Optional[List[Resolver]],
+        deprecated: bool,
+        bucket: Optional[str],
+        cross_bucket: bool,
+        includes: Optional[List[str]],
+        excludes: Optional[List[str]],
+    ) -> Dict:
+        if isinstance(self.service.elastic_endpoint["view"], LazyAction):
+            self.service.elastic_endpoint["view"] = self.service.elastic_endpoint[
+                "view"
+            ].execute()
+
+        elastic_mapping = self.service.elastic_endpoint["view"].get("mapping", None)
+
+        default_str_keyword_field = self.service.elastic_endpoint[
+            "default_str_keyword_field"
+        ]
+        deprecated_property_context_term = self.service.metadata_context.find_term(
+            self.service.deprecated_property
+        )
+        project_property_context_term = self.service.metadata_context.find_term(
+            self.service.project_property
+        )
+        filters.append(
+            Filter(
+                operator="__eq__",
+                path=[
+                    (
+                        deprecated_property_context_term.name
+                        if deprecated_property_context_term is not None
+                        else "_deprecated"
+                    )
+                ],
+                value=deprecated,
             )
-            project_property_context_term = self.service.metadata_context.find_term(
-                self.service.project_property
+        )
+        _project = None
+        if bucket:
+            _project = "/".join([self.endpoint, "projects", bucket])
+
+        elif not cross_bucket:
+            _project = "/".join(
+                [self.endpoint, "projects", self.organisation, self.project]
             )
+
+        if _project:
             filters.append(
                 Filter(
                     operator="__eq__",
                     path=[
                         (
-                            deprecated_property_context_term.name
-                            if deprecated_property_context_term is not None
-                            else "_deprecated"
+                            project_property_context_term.name
+                            if project_property_context_term is not None
+                            else "_project"
                         )
                     ],
-                    value=deprecated,
+                    value=_project,
                 )
             )
-            _project = None
-            if bucket:
-                _project = "/".join([self.endpoint, "projects", bucket])
 
-            elif not cross_bucket:
-                _project = "/".join(
-                    [self.endpoint, "projects", self.organisation, self.project]
-                )
-
-            if _project:
-                filters.append(
-                    Filter(
-                        operator="__eq__",
-                        path=[
-                            (
-                                project_property_context_term.name
-                                if project_property_context_term is not None
-                                else "_project"
-                            )
-                        ],
-                        value=_project,
-                    )
-                )
+        return ESQueryBuilder.build(
+            elastic_mapping,
+            resolvers,
+            self.model_context(),
+            filters,
+            default_str_keyword_field=default_str_keyword_field,
+            includes=includes,
+            excludes=excludes,
+        )
 
-            query = ESQueryBuilder.build(
-                elastic_mapping,
-                resolvers,
-                self.model_context(),
-                filters,
-                default_str_keyword_field=default_str_keyword_field,
-                includes=includes,
-                excludes=excludes,
+    def _hydrate(
+        self, resources: List[Resource], retrieve_source: bool, bulk: bool
+    ) -> BatchResults:
+        # Sources are looked up in bulk in the default Elasticsearch view of each project.
+        # Only the resources missing there, or indexed at another revision, are fetched one by one.
+        sources = (
+            _bulk_fetch_sources(self.service, resources)
+            if bulk and retrieve_source
+            else {}
+        )
+        misses = [r for i, r in enumerate(resources) if i not in sources]
+        fetched = iter(
+            BatchRequestHandler.batch_request_on_resources(
+                service=self.service,
+                resources=misses,
+                prepare_function=prepare_methods.prepare_fetch,
+                callback=None,
+                retrieve_source=retrieve_source,
             )
+            if misses
+            else []
+        )
+        return [
+            BatchResult(r, sources[i]) if i in sources else next(fetched)
+            for i, r in enumerate(resources)
+        ]
 
-            return self.elastic(
-                json.dumps(query),
-                debug=debug,
-                limit=limit,
-                offset=offset,
-                view=params.get("view", None),
+    def sparql_iter(
+        self, query: Union[str, PreparedSparql], debug: bool, page_size: int, prefetch: bool, **params
+    ) -> Iterator[Resource]:
+        # With stream, a SELECT query is sent once as is and its bindings are turned into resources while
+        # they are received, so that the whole result never has to be held in memory.
+        if not params.pop("stream", False):
+            return super().sparql_iter(query, debug, page_size, prefetch, **params)
+        statement = query if isinstance(query, PreparedSparql) else self.prepare_sparql(query, params.get("rewrite", True))
+        qr = statement.bind(params.get("bindings", None))
+        if statement.form != "SELECT":
+            # CONSTRUCT results are grouped by subject, which needs all of them.
+            return super().sparql_iter(statement, debug, page_size, prefetch, **params)
+        if debug:
+            SPARQLQueryBuilder.debug_query(qr)
+
+        endpoint = self._query_endpoint(params.get("view", None), Service.SPARQL_ENDPOINT_TYPE)
+        bindings = self._stream_query(endpoint, qr, self.service.headers_sparql, ("results", "bindings"))
+        return (SPARQLQueryBuilder.build_resource_from_select_query([b])[0] for b in bindings)
+
+    def elastic_iter(
+        self, query: str, debug: bool, page_size: int, prefetch: bool, **params
+    ) -> Iterator[Union[Resource, Dict]]:
+        # Pages are chained with search_after rather than from/size so that scans are not bounded
+        # by the max_result_window of the index. The sort of the query is completed by @id as a tie-breaker.
+        if params.get("offset", None):
+            return super().elastic_iter(query, debug, page_size, prefetch, **params)
+
+        query_dict = json.loads(query)
+        query_dict.pop("from", None)
+        query_dict["size"] = page_size
+        sort = query_dict.get("sort", [])
+        sort = list(sort) if isinstance(sort, list) else [sort]
+        if not any(x == "@id" or (isinstance(x, Dict) and "@id" in x) for x in sort):
+            sort.append({"@id": "asc"})
+        query_dict["sort"] = sort
+
+        view = params.get("view", None)
+        as_resource = params.get("as_resource", True)
+        build_resource_from = params.get("build_resource_from", "source")
+
+        if params.get("stream", False):
+            return self._stream_elastic_pages(query_dict, debug, page_size, view, as_resource, build_resource_from)
+
+        def fetch_page(search_after: List) -> Tuple[List[Union[Resource, Dict]], Optional[List]]:
+            page_query = dict(query_dict, search_after=search_after) if search_after else query_dict
+            if debug:
+                ESQueryBuilder.debug_query(page_query)
+            hits = self._elastic(page_query, view, False, build_resource_from)
+            next_page = hits[-1]["sort"] if len(hits) == page_size else None
+            if as_resource:
+                return self._hits_to_resources(hits, build_resource_from), next_page
+            return hits, next_page
+
+        return paginate(fetch_page, [], prefetch)
+
+    def _stream_elastic_pages(
+        self,
+        query: Dict,
+        debug: bool,
+        page_size: int,
+        view: Optional[str],
+        as_resource: bool,
+        build_resource_from: str,
+    ) -> Iterator[Union[Resource, Dict]]:
+        # Each page is parsed while it is received and the next one is only requested once it is consumed.
+        endpoint = self._query_endpoint(view, Service.ELASTIC_ENDPOINT_TYPE)
+        search_after = []
+        while search_after is not None:
+            page_query = dict(query, search_after=search_after) if search_after else query
+            if debug:
+                ESQueryBuilder.debug_query(page_query)
+            count, last = 0, None
+            hits = self._stream_query(endpoint, json.dumps(page_query), self.service.headers_elastic, ("hits", "hits"))
+            for last in hits:
+                count += 1
+                yield self._hits_to_resources([last], build_resource_from)[0] if as_resource else last
+            search_after = last["sort"] if count == page_size else None
+
+    def _stream_query(self, endpoint: str, query: str, headers: Dict, path: Tuple[str, ...]) -> Iterator[Dict]:
+        # Results are parsed from the response while it is received, one at a time. The request is sent on the
+        # first iteration and its connection released when the iteration is over or stopped.
+        response = self.service.http.post(endpoint, data=query, headers=headers, timeout=REQUEST_TIMEOUT, stream=True)
+        try:
+            catch_http_error_nexus(response, QueryingError)
+            yield from iter_json_array(response.iter_content(STREAM_CHUNK_SIZE), path)
+        except (requests.RequestException, ValueError) as e:
+            raise QueryingError(e) from e
+        finally:
+            response.close()
+
+    def search_iter(
+        self,
+        resolvers: Optional[List[Resolver]],
+        *filters: Union[Dict, Filter],
+        page_size: int,
+        prefetch: bool,
+        **params,
+    ) -> Iterator[Resource]:
+        if params.get("search_endpoint", None) != Service.ELASTIC_ENDPOINT_TYPE or params.get("offset", None):
+            # SPARQL pages are only consistent with each other when the results are sorted.
+            params["order_by_id"] = True
+            return super().search_iter(
+                resolvers, *filters, page_size=page_size, prefetch=prefetch, **params
             )
 
+        if self.model_context() is None:
+            raise ValueError("context model missing")
+        bucket = params.get("bucket", None)
+        cross_bucket = params.get("cross_bucket", False)
+        if bucket and not cross_bucket:
+            raise not_supported(("bucket", True))
+
+        query = self._elastic_search_query(
+            _normalize_filters(filters),
+            resolvers,
+            params.get("deprecated", False),
+            bucket,
+            cross_bucket,
+            params.get("includes", None),
+            params.get("excludes", None),
+        )
+        return self.elastic_iter(
+            json.dumps(query),
+            params.get("debug", False),
+            page_size,
+            prefetch,
+            view=params.get("view", None),
+        )
+
     @staticmethod  # for testing
     def reformat_contexts(model_context: Context, metadata_context: Optional[Context]):
         ctx = {}
@@ -1106,15 +1725,16 @@ class BlueBrainNexus(Store):
             self.model_context(), self.service.metadata_context
         )
 
-    def _sparql(self, query: str, view: str) -> List[Resource]:
+    def _sparql(self, query: str, view: str, form: Optional[str]) -> List[Resource]:
+        data = self._sparql_results(query, view)
+        context = self.model_context() or self.context
+        return SPARQLQueryBuilder.build_resource_from_response(query, data, context, form=form)
 
-        endpoint = (
-            self.service.sparql_endpoint["endpoint"]
-            if view is None
-            else self.service.make_query_endpoint_self(view, endpoint_type="sparql")
-        )
+    def _sparql_results(self, query: str, view: Optional[str]) -> Dict:
+
+        endpoint = self._query_endpoint(view, Service.SPARQL_ENDPOINT_TYPE)
 
-        response = requests.post(
+        response = self.service.http.post(
             endpoint,
             data=query,
             headers=self.service.headers_sparql,
@@ -1122,10 +1742,7 @@ class BlueBrainNexus(Store):
         )
         catch_http_error_nexus(response, QueryingError)
 
-        data = response.json()
-
-        context = self.model_context() or self.context
-        return SPARQLQueryBuilder.build_resource_from_response(query, data, context)
+        return response.json()
 
     def _elastic(
         self,
@@ -1135,13 +1752,9 @@ class BlueBrainNexus(Store):
         build_resource_from: str,
     ) -> Optional[Union[List[Resource], Resource, List[Dict], Dict]]:
 
-        endpoint = (
-            self.service.elastic_endpoint["endpoint"]
-            if view is None
-            else self.service.make_query_endpoint_self(view, endpoint_type="elastic")
-        )
+        endpoint = self._query_endpoint(view, Service.ELASTIC_ENDPOINT_TYPE)
 
-        response = requests.post(
+        response = self.service.http.post(
             endpoint,
             data=json.dumps(query),
             headers=self.service.headers_elastic,
@@ -1155,6 +1768,16 @@ class BlueBrainNexus(Store):
         if not as_resource:
             return results
 
+        return self._hits_to_resources(results, build_resource_from)
+
+    def _query_endpoint(self, view: Optional[str], endpoint_type: str) -> str:
+        if view is not None:
+            return self.service.make_query_endpoint_self(view, endpoint_type=endpoint_type)
+        if endpoint_type == Service.SPARQL_ENDPOINT_TYPE:
+            return self.service.sparql_endpoint["endpoint"]
+        return self.service.elastic_endpoint["endpoint"]
+
+    def _hits_to_resources(self, results: List[Dict], build_resource_from: str) -> List[Resource]:
         supported_build_arg = {"source": "_source"}
 
         if build_resource_from not in supported_build_arg.keys():
@@ -1195,6 +1818,12 @@ class BlueBrainNexus(Store):
                 raise ValueError(
                     f"max_connection value should be great than 0 but {max_connection} is provided"
                 )
+            max_connection_per_host = store_config.pop("max_connection_per_host", 0)
+            dns_cache_ttl = store_config.pop("dns_cache_ttl", 300)
+            keepalive_timeout = store_config.pop("keepalive_timeout", 60)
+            gzip_requests = store_config.pop("gzip_requests", False)
+            retry_policy = RetryPolicy(**store_config.pop("retry", {}))
+            adaptive_concurrency = store_config.pop("adaptive_concurrency", True)
             store_context_config = store_config.pop("vocabulary", {})
             nexus_metadata_context = store_context_config.get(
                 "metadata",
@@ -1233,6 +1862,12 @@ class BlueBrainNexus(Store):
             token=token,
             model_context=self.model_context(),
             max_connection=max_connection,
+            max_connection_per_host=max_connection_per_host,
+            dns_cache_ttl=dns_cache_ttl,
+            keepalive_timeout=keepalive_timeout,
+            gzip_requests=gzip_requests,
+            retry_policy=retry_policy,
+            adaptive_concurrency=adaptive_concurrency,
             searchendpoints=searchendpoints,
             store_context=nexus_context_iri,
             store_local_context=nexus_context_local_iri,
@@ -1302,3 +1937,6 @@ class BlueBrainNexus(Store):
 
     def _freeze_many(self, resources: List[Resource]) -> None:
         raise not_supported()
+
+    def close(self) -> None:
+        self.service.close()
@@ -156,9 +156,12 @@ class DemoStore(Store):
             filters = create_filters_from_dict(filters[0])
         conditions = [f"x.{'.'.join(x.path)}.{x.operator}({x.value!r})" for x in filters]
         records = self.service.find(conditions)
+        offset = params.get("offset", None) or 0
+        limit = params.get("limit", None)
+        records = records[offset:offset + limit] if limit else records[offset:]
         return [_to_resource(x) for x in records]
 
-    def _sparql(self, query: str, view: str) -> Optional[Union[List[Resource], Resource]]:
+    def _sparql(self, query: str, view: str, form: Optional[str]) -> Optional[Union[List[Resource], Resource]]:
         raise not_supported()
 
     def _elastic(
@@ -200,7 +203,7 @@ class DemoStore(Store):
     def _deprecate_many(self, resources: List[Resource]) -> None:
         raise not_supported()
 
-    def _sparql(self, query: str, view: Optional[str]) -> List[Resource]:
+    def _sparql(self, query: str, view: Optional[str], form: Optional[str]) -> List[Resource]:
         raise not_supported()
 
     def _elastic(self, query: str, view: Optional[str]) -> List[Resource]:
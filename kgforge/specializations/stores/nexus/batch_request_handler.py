@@ -1,26 +1,23 @@
-from asyncio import AbstractEventLoop
 from collections import namedtuple
 import json
 import asyncio
 
-from typing import Callable, Dict, List, Optional, Tuple, Type, Any, Coroutine, Union
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Type, Any, Coroutine, Union
 
 from kgforge.core.commons.actions import Action
-from kgforge.core.commons.constants import DEFAULT_REQUEST_TIMEOUT
 
 from typing_extensions import Unpack
 
-from aiohttp import ClientSession, ClientTimeout
+from aiohttp import ClientConnectionError, ClientSession, hdrs
 
 from kgforge.core.resource import Resource
 from kgforge.core.commons.exceptions import RunException
 from kgforge.specializations.stores.nexus.service import Service, _error_message
+from kgforge.specializations.stores.nexus.throttling import AdaptiveLimiter, THROTTLING_STATUSES
 
 BatchResult = namedtuple("BatchResult", ["resource", "response"])
 BatchResults = List[BatchResult]
 
-BATCH_REQUEST_TIMEOUT_PER_REQUEST = DEFAULT_REQUEST_TIMEOUT
-
 
 class BatchRequestHandler:
     BATCH_SIZE = 80
@@ -37,31 +34,20 @@ class BatchRequestHandler:
             service: Service,
             data: List[Any],
             task_creator: Callable[
-                [asyncio.Semaphore, AbstractEventLoop, List[Any], Service, Unpack[Any]],
-                Coroutine[Any, Any, Tuple[List[asyncio.Task], List[ClientSession]]]
+                [AdaptiveLimiter, ClientSession, List[Any], Service, Unpack[Any]],
+                Coroutine[Any, Any, List[asyncio.Task]]
             ],
             **kwargs
     ):
 
-        loop = asyncio.get_event_loop()
-
         async def dispatch_action():
-            semaphore = asyncio.Semaphore(service.max_connection)
-
-            tasks, sessions = await task_creator(
-                semaphore, loop, data, service, **kwargs
+            tasks = await task_creator(
+                service.get_limiter(), service.get_session(), data, service, **kwargs
             )
 
-            return await asyncio.gather(*tasks), sessions
+            return await asyncio.gather(*tasks)
 
-        async def close_sessions(sesss):
-            for sess in sesss:
-                await sess.close()
-
-        res, sessions = asyncio.run(dispatch_action())
-        closing_task = loop.create_task(close_sessions(sessions))
-        asyncio.run(closing_task)
-        return res
+        return service.run_async(dispatch_action())
 
     @staticmethod
     def batch_request_on_resources(
@@ -76,77 +62,172 @@ class BatchRequestHandler:
     ) -> BatchResults:
 
         async def create_tasks_for_resources(
-                semaphore: asyncio.Semaphore,
-                loop: AbstractEventLoop,
+                semaphore: AdaptiveLimiter,
+                session: ClientSession,
                 resources: List[Resource],
                 service,
                 **kwargs
-        ) -> Tuple[List[asyncio.Task], List[ClientSession]]:
+        ) -> List[asyncio.Task]:
 
-            prepare_function = kwargs["prepare_function"]
-            callback = kwargs["callback"]
+            prepare_function = kwargs.pop("prepare_function")
+            callback = kwargs.pop("callback")
 
             async def request(resource: Optional[Resource], client_session: ClientSession) -> BatchResult:
-
-                method, url, resource, exception, headers, params, payload = prepare_function(
-                    service, resource, **kwargs
+                return await BatchRequestHandler.request_on_resource(
+                    service, client_session, semaphore, resource, prepare_function, **kwargs
                 )
 
-                async with semaphore:
+            return BatchRequestHandler.create_tasks(
+                resources, request, session, callback
+            )
 
+        return BatchRequestHandler.batch_request(
+            service=service,
+            data=resources,
+            task_creator=create_tasks_for_resources,
+            prepare_function=prepare_function,
+            callback=callback,
+            **kwargs
+        )
+
+    @staticmethod
+    def stream_request_on_resources(
+            service: Service,
+            resources: Iterable[Resource],
+            prepare_function: Callable[
+                ['Service', Resource, Dict, Unpack[Any]],
+                Tuple[str, str, Resource, Type[RunException], Dict, Optional[Dict], Optional[Dict]]
+            ],
+            window: int,
+            callback: Optional[Callable] = None,
+            verify: Optional[Callable[[Resource], bool]] = None,
+            **kwargs
+    ) -> Iterator[BatchResult]:
+        # Resources are pulled lazily so that at most 'window' of them are in flight at any time.
+        # Results are yielded in completion order, once the callback (if any) has been applied.
+        # Resources rejected by verify are yielded as BatchResult(resource, None) without any request.
+        if window <= 0:
+            raise ValueError(f"window value should be greater than 0 but {window} is provided")
+
+        async def start() -> Tuple[AdaptiveLimiter, ClientSession]:
+            return service.get_limiter(), service.get_session()
+
+        async def submit(resource: Resource) -> asyncio.Task:
+            # Created by the loop running the requests, which might run in another thread.
+            return asyncio.ensure_future(BatchRequestHandler.request_on_resource(
+                service, session, semaphore, resource, prepare_function, **kwargs
+            ))
+
+        async def wait(tasks: Set[asyncio.Task]) -> Set[asyncio.Task]:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            return done
+
+        semaphore, session = service.run_async(start())
+        iterator = iter(resources)
+        exhausted = False
+        pending: Set[asyncio.Task] = set()
+
+        try:
+            while True:
+                while not exhausted and len(pending) < window:
                     try:
-                        async with client_session.request(
-                                method=method,
-                                url=url,
-                                headers=headers,
-                                data=json.dumps(payload, ensure_ascii=True),
-                                params=params
-                        ) as response:
+                        resource = next(iterator)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    if verify is not None and not verify(resource):
+                        yield BatchResult(resource, None)
+                        continue
+                    pending.add(service.run_async(submit(resource)))
+
+                if not pending:
+                    break
+
+                done = service.run_async(wait(pending))
+                pending.difference_update(done)
+                for task in done:
+                    if callback:
+                        callback(task)
+                    yield task.result()
+        finally:
+            # The consumer may stop iterating early: requests still in flight are abandoned.
+            for task in pending:
+                task.get_loop().call_soon_threadsafe(task.cancel)
+
+    @staticmethod
+    async def request_on_resource(
+            service: Service,
+            session: ClientSession,
+            semaphore: AdaptiveLimiter,
+            resource: Resource,
+            prepare_function: Callable[
+                ['Service', Resource, Dict, Unpack[Any]],
+                Tuple[str, str, Resource, Type[RunException], Dict, Optional[Dict], Optional[Dict]]
+            ],
+            **kwargs
+    ) -> BatchResult:
+
+        method, url, resource, exception, headers, params, payload = prepare_function(
+            service, resource, **kwargs
+        )
+        data = json.dumps(payload, ensure_ascii=True)
+        retry_policy = service.retry_policy
+        loop = asyncio.get_running_loop()
+        attempt = 0
+
+        while True:
+            attempt += 1
+            retry_after = None
+
+            async with semaphore:
+                start = loop.time()
+                epoch = semaphore.epoch
+                try:
+                    async with session.request(
+                            method=method,
+                            url=url,
+                            headers=headers,
+                            data=data,
+                            params=params
+                    ) as response:
+                        if retry_policy.is_retryable(method, attempt, response.status):
+                            if response.status in THROTTLING_STATUSES:
+                                semaphore.throttled(epoch)
+                            retry_after = response.headers.get(hdrs.RETRY_AFTER)
+                        else:
                             content = await response.json()
                             if response.status < 400:
+                                semaphore.succeeded(loop.time() - start)
                                 return BatchResult(resource, content)
 
                             error = exception(_error_message(content))
                             return BatchResult(resource, error)
 
-                    except Exception as e:
+                except (ClientConnectionError, asyncio.TimeoutError) as e:
+                    if not retry_policy.is_retryable(method, attempt):
                         return BatchResult(resource, exception(str(e)))
+                except Exception as e:
+                    return BatchResult(resource, exception(str(e)))
 
-            return BatchRequestHandler.create_tasks_and_sessions(
-                loop, resources, request, callback
-            )
-
-        return BatchRequestHandler.batch_request(
-            service=service,
-            data=resources,
-            task_creator=create_tasks_for_resources,
-            prepare_function=prepare_function,
-            callback=callback,
-            **kwargs
-        )
+            await asyncio.sleep(retry_policy.delay(attempt, retry_after))
 
     @staticmethod
-    def create_tasks_and_sessions(
-            loop: AbstractEventLoop,
+    def create_tasks(
             elements: List[Union[str, Resource]],
             fc: Callable[[Union[str, Resource], ClientSession], Coroutine[Any, Any, Union[Resource, Action, BatchResult]]],
+            session: ClientSession,
             callback: Optional[Callable]
-    ) -> Tuple[List[asyncio.Task], List[ClientSession]]:
-
+    ) -> List[asyncio.Task]:
+        # POLICY Should be called from a coroutine running on the service event loop.
+        loop = asyncio.get_running_loop()
         tasks = []
-        sessions = []
-
-        for batch_i in BatchRequestHandler.batch(elements):
-
-            session = ClientSession(timeout=ClientTimeout(BATCH_REQUEST_TIMEOUT_PER_REQUEST))
-            sessions.append(session)
 
-            for res in batch_i:
-                prepared_request: asyncio.Task = loop.create_task(fc(res, session))
+        for element in elements:
+            prepared_request: asyncio.Task = loop.create_task(fc(element, session))
 
-                if callback:
-                    prepared_request.add_done_callback(callback)
+            if callback:
+                prepared_request.add_done_callback(callback)
 
-                tasks.append(prepared_request)
+            tasks.append(prepared_request)
 
-        return tasks, sessions
+        return tasks
@@ -2,14 +2,18 @@
 # This code was taken from https://github.com/BlueBrain/nexus-python-sdk
 
 import puremagic
+import gzip
 import json
 import collections
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Any, Dict, List, Optional, Tuple, Union, Type
 from urllib.parse import quote_plus as url_encode
 
 SEGMENT = "files"
 DEFAULT_MIME = "application/octet-stream"
+# request bodies smaller than this are not worth compressing
+GZIP_MIN_SIZE = 1024
 
 # to make sure the output response dictionary are always ordered like the response's json
 decode_json_ordered = json.JSONDecoder(object_pairs_hook=collections.OrderedDict).decode
@@ -33,6 +37,44 @@ default_type = "json"
 header_parts["default"] = header_parts[default_type]
 
 
+class GzipAdapter(HTTPAdapter):
+    """Transport adapter compressing with gzip the request bodies of at least 'min_size' bytes.
+
+    Multipart bodies (i.e. uploaded files) and bodies already encoded are sent as is.
+    """
+
+    __attrs__ = HTTPAdapter.__attrs__ + ["min_size"]
+
+    def __init__(self, min_size: int = GZIP_MIN_SIZE, **kwargs) -> None:
+        self.min_size = min_size
+        super().__init__(**kwargs)
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        body = request.body.encode("utf-8") if isinstance(request.body, str) else request.body
+        content_type = request.headers.get("Content-Type", "")
+        if isinstance(body, bytes) and len(body) >= self.min_size \
+                and "Content-Encoding" not in request.headers and not content_type.startswith("multipart/"):
+            request.body = gzip.compress(body)
+            request.headers["Content-Encoding"] = "gzip"
+            request.headers["Content-Length"] = str(len(request.body))
+        return super().send(request, **kwargs)
+
+
+def http_session(pool_maxsize: int, gzip_requests: bool = False) -> requests.Session:
+    """
+        Create a session keeping alive and reusing up to pool_maxsize connections per host.
+
+        :param pool_maxsize: the maximum number of connections kept open to each host
+        :param gzip_requests: OPTIONAL if True, large request bodies are compressed with gzip (default: False)
+        :return: the session, to be closed by the caller
+    """
+    session = requests.Session()
+    adapter = GzipAdapter(pool_maxsize=pool_maxsize) if gzip_requests else HTTPAdapter(pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
 def _content_type(filepath: str, content_type: Optional[str]) -> str:
     if content_type is None:
         try:
@@ -50,7 +92,8 @@ def files_create(
         endpoint: Optional[str],
         token: Optional[str],
         org_label: str, project_label: str, filepath: str, storage_id: Optional[str] = None,
-        file_id: Optional[str] = None, filename: Optional[str] = None, content_type: Optional[str] = None
+        file_id: Optional[str] = None, filename: Optional[str] = None, content_type: Optional[str] = None,
+        session: Optional[requests.Session] = None
 ) -> Dict:
     """
         Creates a file resource from a binary attachment using the POST method when the user does not provide
@@ -67,6 +110,7 @@ def files_create(
                         If not provided, an ID will be generated.
         :param filename: OPTIONAL Overrides the automatically detected filename
         :param content_type: OPTIONAL Override the automatically detected content type
+        :param session: OPTIONAL the session sending the request, to reuse its connections
         :return: A payload containing only the Nexus metadata for this updated file.
     """
 
@@ -84,14 +128,16 @@ def files_create(
     }
 
     if file_id is None:
-        return http_post(environment=endpoint, token=token, path=path, body=file_obj, data_type="file", storage=storage_id)
+        return http_post(environment=endpoint, token=token, path=path, body=file_obj, data_type="file",
+                         session=session, storage=storage_id)
     else:
         path.append(url_encode(file_id))
-        return http_put(environment=endpoint, token=token, path=path, body=file_obj, data_type="file", storage=storage_id)
+        return http_put(environment=endpoint, token=token, path=path, body=file_obj, data_type="file",
+                        session=session, storage=storage_id)
 
 
 # TODO add docstring
-def http_post(environment: Optional[str], token: Optional[str], path: Union[str, List[str]], body=None, data_type="default", use_base=False, **kwargs):
+def http_post(environment: Optional[str], token: Optional[str], path: Union[str, List[str]], body=None, data_type="default", use_base=False, session: Optional[requests.Session] = None, **kwargs):
     """
         Perform a POST request.
         :param environment: the endpoint base, mandatory is use_base is True, else it is not used
@@ -99,23 +145,25 @@ def http_post(environment: Optional[str], token: Optional[str], path: Union[str,
         :param path: complete URL if use_base is False or just the ending if use_base is True
         :param body: OPTIONAL Things to send, can be a dictionary
         :param data_type: OPTIONAL can be "json" or "text" (default: "default" = "json")
+        :param session: OPTIONAL the session sending the request, to reuse its connections
         :param params: OPTIONAL provide some URL parameters (?foo=bar&hello=world) as a dictionary
         :return: the dictionary that is equivalent to the json response
     """
     header = prepare_header(token=token, type=data_type)
     full_url = _full_url(environment, path, use_base)
 
+    client = session or requests
     if data_type != "file":
         body_data = prepare_body(body, data_type)
-        response = requests.post(full_url, headers=header, data=body_data, params=kwargs)
+        response = client.post(full_url, headers=header, data=body_data, params=kwargs)
     else:
-        response = requests.post(full_url, headers=header, files=body, params=kwargs)
+        response = client.post(full_url, headers=header, files=body, params=kwargs)
 
     response.raise_for_status()
     return decode_json_ordered(response.text)
 
 
-def http_put(environment: Optional[str], token: Optional[str], path: Union[str, List[str]], body=None, data_type="default", use_base=False, **kwargs):
+def http_put(environment: Optional[str], token: Optional[str], path: Union[str, List[str]], body=None, data_type="default", use_base=False, session: Optional[requests.Session] = None, **kwargs):
     """
         Performs a PUT request
 
@@ -125,17 +173,19 @@ def http_put(environment: Optional[str], token: Optional[str], path: Union[str,
         :param use_base: OPTIONAL if True, the Nexus env provided by nexus.config.set_environment will
         be prepended to path. (default: False)
 
+        :param session: OPTIONAL the session sending the request, to reuse its connections
         :param params: OPTIONAL provide some URL parameters (?foo=bar&hello=world) as a dictionary
         :return: the dictionary that is equivalent to the json response
     """
     header = prepare_header(token=token, type=data_type)
     full_url = _full_url(environment, path, use_base)
 
+    client = session or requests
     if data_type != "file":
         body_data = prepare_body(body, data_type)
-        response = requests.put(full_url, headers=header, data=body_data, params=kwargs)
+        response = client.put(full_url, headers=header, data=body_data, params=kwargs)
     else:
-        response = requests.put(full_url, headers=header, files=body, params=kwargs)
+        response = client.put(full_url, headers=header, files=body, params=kwargs)
 
     response.raise_for_status()
     return decode_json_ordered(response.text)
@@ -144,7 +194,7 @@ def http_put(environment: Optional[str], token: Optional[str], path: Union[str,
 def http_get(
         environment: Optional[str], token: Optional[str],
         path: Union[str, List[str]], stream=False, get_raw_response=False, use_base=False,
-        data_type="default", accept="json", **kwargs
+        data_type="default", accept="json", session: Optional[requests.Session] = None, **kwargs
 ):
     """
         Wrapper to perform a GET request.
@@ -159,16 +209,18 @@ def http_get(
         (convenient when getting a binary file). If False, a dictionary representation of the response will be returned
         (default: False)
         :param stream: OPTIONAL True if GETting a file (default: False)
+        :param session: OPTIONAL the session sending the request, to reuse its connections
         :return: if get_raw_response is True, returns the request.get object. If get_raw_response is False, return the
         dictionary that is equivalent to the json response
     """
     header = prepare_header(token=token, type=data_type, accept=accept)
     full_url = _full_url(environment=environment, path=path, use_base=use_base)
     params = kwargs.pop("params", None)
+    client = session or requests
     if params:
-        response = requests.get(full_url, headers=header, stream=stream, params=params, **kwargs)
+        response = client.get(full_url, headers=header, stream=stream, params=params, **kwargs)
     else:
-        response = requests.get(full_url, headers=header, stream=stream, params=kwargs)
+        response = client.get(full_url, headers=header, stream=stream, params=kwargs)
     response.raise_for_status()
 
     if get_raw_response:
@@ -238,7 +290,7 @@ def prepare_body(data, type="default"):
 def project_fetch(
         endpoint: Optional[str],
         token: Optional[str],
-        org_label: str, project_label: str, rev=None
+        org_label: str, project_label: str, rev=None, session: Optional[requests.Session] = None
 ):
     """
         Fetch a project and all its details.
@@ -249,6 +301,7 @@ def project_fetch(
         :param org_label: The label of the organization that contains the project to be fetched
         :param project_label: label of a the project to fetch
         :param rev: OPTIONAL The specific revision of the wanted project. If not provided, will get the last.
+        :param session: OPTIONAL the session sending the request, to reuse its connections
         :return: All the details of this project, as a dictionary
     """
 
@@ -259,13 +312,13 @@ def project_fetch(
     if rev is not None:
         path = path + "?rev=" + str(rev)
 
-    return http_get(environment=endpoint, token=token, path=path, use_base=True)
+    return http_get(environment=endpoint, token=token, path=path, use_base=True, session=session)
 
 
 def views_fetch(
         endpoint: Optional[str],
         token: Optional[str],
-        org_label, project_label, view_id, rev=None, tag=None
+        org_label, project_label, view_id, rev=None, tag=None, session: Optional[requests.Session] = None
 ):
     """
     Fetches a distant view and returns the payload as a dictionary.
@@ -278,6 +331,7 @@ def views_fetch(
     :param view_id: id of the view
     :param rev: OPTIONAL fetches a specific revision of a view (default: None, fetches the last)
     :param tag: OPTIONAL fetches the view version that has a specific tag (default: None)
+    :param session: OPTIONAL the session sending the request, to reuse its connections
     :return: Payload of the whole view as a dictionary
     """
 
@@ -297,4 +351,4 @@ def views_fetch(
     if tag is not None:
         path = path + "?tag=" + str(tag)
 
-    return http_get(environment=endpoint, token=token, path=path, use_base=True)
+    return http_get(environment=endpoint, token=token, path=path, use_base=True, session=session)
@@ -12,18 +12,20 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
 
-from typing import Callable, Dict, List, Optional, Union, Tuple, Type, Any
+from typing import Callable, Coroutine, Dict, List, Optional, Union, Tuple, Type, Any
 import asyncio
 import copy
 import json
-from asyncio import Task
+import threading
+from asyncio import AbstractEventLoop, Task
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from urllib.error import URLError
 from urllib.parse import quote_plus, urlparse, parse_qs
 
 import aiohttp
-import nest_asyncio
 import requests
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
 
 from kgforge.core.resource import Resource
 
@@ -36,7 +38,8 @@ from kgforge.core.commons.actions import (
 )
 
 from kgforge.core.commons.exceptions import ConfigurationError, RunException
-from kgforge.core.commons.context import Context
+from kgforge.core.commons.execution import awaiting_loop
+from kgforge.core.commons.context import Context, context_registry
 from kgforge.core.conversions.rdf import (
     _from_jsonld_one,
     _remove_ld_keys,
@@ -45,7 +48,8 @@ from kgforge.core.conversions.rdf import (
 )
 import kgforge
 from kgforge.core.wrappings.dict import wrap_dict
-from kgforge.specializations.stores.nexus.http_helpers import views_fetch
+from kgforge.specializations.stores.nexus.http_helpers import http_session, views_fetch
+from kgforge.specializations.stores.nexus.throttling import AdaptiveLimiter, RetryPolicy
 
 from kgforge.core.conversions.rdf import _from_jsonld_one, _remove_ld_keys, recursive_resolve
 from kgforge.core.wrappings.dict import wrap_dict
@@ -78,6 +82,12 @@ class Service:
             token: str,
             model_context: Context,
             max_connection: int,
+            max_connection_per_host: int,
+            dns_cache_ttl: Optional[int],
+            keepalive_timeout: float,
+            gzip_requests: bool,
+            retry_policy: RetryPolicy,
+            adaptive_concurrency: bool,
             searchendpoints: Dict,
             store_context: str,
             store_local_context: str,
@@ -96,6 +106,23 @@ class Service:
         self.model_context = model_context
         self.context_cache: Dict = {}
         self.max_connection = max_connection
+        self.max_connection_per_host = max_connection_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        # Connections of the synchronous requests are kept alive and reused across calls, like the ones of the
+        # asynchronous requests are by the ClientSession of each loop.
+        self.http: requests.Session = http_session(
+            max_connection_per_host or max_connection, gzip_requests=gzip_requests
+        )
+        self.retry_policy = retry_policy
+        self.adaptive_concurrency = adaptive_concurrency
+        self._loop: Optional[AbstractEventLoop] = None
+        self._loop_lock = threading.RLock()
+        self._loop_runner: Optional[ThreadPoolExecutor] = None
+        # Sessions and limiters are bound to the loop running the requests: the own loop of the service or
+        # the loops awaiting forge operations (see execution.awaiting_loop()).
+        self._sessions: Dict[AbstractEventLoop, ClientSession] = {}
+        self._limiters: Dict[AbstractEventLoop, AdaptiveLimiter] = {}
         self.params = copy.deepcopy(params)
         self.store_context = store_context
         self.store_local_context = store_local_context
@@ -135,7 +162,15 @@ class Service:
         self.headers_upload = {
             "Accept": files_upload_config.pop("Accept"),
         }
+        # Whether to not upload again the files already uploaded with the same digest, and where to record the
+        # digests of the uploaded files to not look them up in the store.
+        self.upload_deduplicate: bool = files_upload_config.pop("deduplicate", False)
+        self.upload_manifest: Optional[str] = files_upload_config.pop("manifest", None)
         self.headers_download = {"Accept": files_download_config.pop("Accept")}
+        # Maximum number of files being resolved or downloaded at the same time, on top of max_connection.
+        self.download_concurrency: Optional[int] = files_download_config.pop("concurrency", None)
+        # Whether to skip the files already downloaded with the same digest.
+        self.download_skip_identical: bool = files_download_config.pop("skip_identical", False)
 
         self.token = token
 
@@ -196,15 +231,77 @@ class Service:
             quote_plus(org),
             quote_plus(prj),
             es_mapping if es_mapping else elastic_view,  # Todo consider using Dict for es_mapping
+            None,
+            None,
+            self.http,
         )
         self.elastic_endpoint["default_str_keyword_field"] = default_str_keyword_field
 
-        # The following code is for async to work on jupyter notebooks
-        try:
-            asyncio.get_event_loop()
-            nest_asyncio.apply()
-        except RuntimeError:
-            pass
+    def get_event_loop(self) -> AbstractEventLoop:
+        # The loop outlives every bulk operation so that the pooled session bound to it can be reused.
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop
+
+    def run_async(self, coroutine: Coroutine) -> Any:
+        # Blocks until the coroutine completes. The loop awaiting the forge operation, if any, runs it natively.
+        loop = awaiting_loop()
+        if loop is not None and loop.is_running() and not _runs_in_thread(loop):
+            return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+        # Serialized as pages of a search may be prefetched from another thread while the forge is used.
+        with self._loop_lock:
+            if _running_loop() is None:
+                return self.get_event_loop().run_until_complete(coroutine)
+            # A loop already runs in this thread (e.g. in Jupyter): the own loop is run from another thread.
+            if self._loop_runner is None:
+                self._loop_runner = ThreadPoolExecutor(max_workers=1)
+            return self._loop_runner.submit(self.get_event_loop().run_until_complete, coroutine).result()
+
+    def get_session(self) -> ClientSession:
+        # POLICY Should be called from a coroutine run by run_async().
+        loop = _running_loop() or self.get_event_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            connector = TCPConnector(
+                limit=self.max_connection,
+                limit_per_host=self.max_connection_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            session = ClientSession(
+                connector=connector, timeout=ClientTimeout(Service.REQUEST_TIMEOUT)
+            )
+            self._sessions[loop] = session
+        return session
+
+    def get_limiter(self) -> AdaptiveLimiter:
+        # Shared by all bulk operations so that throttling by the store lowers the overall concurrency.
+        loop = _running_loop() or self.get_event_loop()
+        limiter = self._limiters.get(loop)
+        if limiter is None or limiter.maximum != self.max_connection:
+            limiter = AdaptiveLimiter(self.max_connection, adaptive=self.adaptive_concurrency)
+            self._limiters[loop] = limiter
+        return limiter
+
+    def close(self) -> None:
+        for loop, session in self._sessions.items():
+            if session.closed or loop.is_closed():
+                continue
+            if loop is self._loop:
+                self.run_async(session.close())
+            elif _runs_in_thread(loop):
+                loop.create_task(session.close())
+            elif loop.is_running():
+                asyncio.run_coroutine_threadsafe(session.close(), loop).result()
+        self._sessions.clear()
+        self._limiters.clear()
+        self.http.close()
+        if self._loop_runner is not None:
+            self._loop_runner.shutdown()
+        self._loop_runner = None
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.close()
+        self._loop = None
 
     @staticmethod
     def make_endpoint(endpoint: str, endpoint_type: str, organisation: str, project: str):
@@ -271,7 +368,13 @@ class Service:
         )
 
     def get_project_context(self) -> Dict:
-        project_data = kgforge.specializations.stores.nexus.http_helpers.project_fetch(endpoint=self.endpoint, token=self.token, org_label=self.organisation, project_label=self.project)
+        project_data = kgforge.specializations.stores.nexus.http_helpers.project_fetch(
+            endpoint=self.endpoint,
+            token=self.token,
+            org_label=self.organisation,
+            project_label=self.project,
+            session=self.http,
+        )
         context = {"@base": project_data["base"], "@vocab": project_data["vocab"]}
         for mapping in project_data['apiMappings']:
             context[mapping['prefix']] = mapping['namespace']
@@ -291,7 +394,7 @@ class Service:
                 resource_id=context_to_resolve
             )
 
-            response = requests.get(url, headers=self.headers, timeout=Service.REQUEST_TIMEOUT)
+            response = self.http.get(url, headers=self.headers, timeout=Service.REQUEST_TIMEOUT)
             response.raise_for_status()
             resource = response.json()
         except Exception as exc:
@@ -454,18 +557,22 @@ class Service:
                 and data_context is not None
                 and data_context == self.model_context.iri
         ):
-            resolved_ctx = self.model_context.document["@context"]
+            context = self.model_context
         elif data_context is not None:
-            resolved_ctx = recursive_resolve(
+            # The context is resolved once and then shared by all the payloads using it.
+            context = context_registry.get(
                 data_context,
-                self.resolve_context,
-                already_loaded=[self.store_local_context, self.store_context],
+                factory=lambda: Context(recursive_resolve(
+                    data_context,
+                    self.resolve_context,
+                    already_loaded=[self.store_local_context, self.store_context],
+                )),
+                resolver=self.resolve_context,
             )
         else:
-            resolved_ctx = None
-        if resolved_ctx:
-            data["@context"] = resolved_ctx
-            resource = _from_jsonld_one(data)
+            context = None
+        if context is not None and context.document["@context"]:
+            resource = _remove_ld_keys(data, context)
             resource.context = data_context
         else:
             resource = Resource.from_json(data)
@@ -508,3 +615,15 @@ def _error_message(error: Union[requests.HTTPError, aiohttp.ClientResponseError,
         return format_message(error_text)
     except Exception:
         return format_message(str(error))
+
+
+def _running_loop() -> Optional[AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _runs_in_thread(loop: AbstractEventLoop) -> bool:
+    # Whether loop is the one running in the current thread, which waiting for would block.
+    return _running_loop() is loop
@@ -0,0 +1,144 @@
+#
+# Blue Brain Nexus Forge is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Blue Brain Nexus Forge is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU Lesser
+# General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
+import asyncio
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional, Tuple
+
+from aiohttp import hdrs
+
+THROTTLING_STATUSES = (429, 503)
+
+
+class RetryPolicy:
+    """Decide whether and when a failed request to the store should be sent again.
+
+    Responses with a status in 'statuses' and connection errors are retried up to 'max_attempts' times in total,
+    waiting for the delay given by a Retry-After header or else for an exponential backoff with full jitter.
+    Non idempotent requests (i.e. POST) are only retried on throttling statuses, for which the store did not
+    process them. Delays given by Retry-After are capped at 'max_retry_after' seconds. Subclass it and assign the
+    instance to Service.retry_policy to plug another policy.
+    """
+
+    IDEMPOTENT_METHODS = (hdrs.METH_GET, hdrs.METH_HEAD, hdrs.METH_PUT, hdrs.METH_DELETE, hdrs.METH_OPTIONS)
+
+    def __init__(
+            self,
+            max_attempts: int = 3,
+            backoff_factor: float = 0.5,
+            max_backoff: float = 30,
+            statuses: Tuple[int, ...] = (429, 502, 503, 504),
+            max_retry_after: float = 300,
+    ) -> None:
+        if max_attempts <= 0:
+            raise ValueError(f"max_attempts value should be greater than 0 but {max_attempts} is provided")
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.statuses = tuple(statuses)
+        self.max_retry_after = max_retry_after
+
+    def is_retryable(self, method: str, attempt: int, status: Optional[int] = None) -> bool:
+        # status is None when the request failed without response (e.g. connection reset, timeout).
+        if attempt >= self.max_attempts:
+            return False
+        if status is not None and status not in self.statuses:
+            return False
+        return method.upper() in self.IDEMPOTENT_METHODS or status in THROTTLING_STATUSES
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        parsed = parse_retry_after(retry_after)
+        if parsed is not None:
+            return min(parsed, self.max_retry_after)
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** (attempt - 1)))
+
+
+class AdaptiveLimiter:
+    """Bound the number of concurrent requests with a limit adapting to the store responsiveness.
+
+    Usable as an asyncio.Semaphore in an 'async with' statement. The limit starts at 'maximum', is halved each time
+    the store throttles (AIMD) and grows back by one, up to 'maximum', once a limit worth of requests succeeded
+    with a latency within 'tolerance' times the best observed one. Requests sent before the last decrease do not
+    decrease the limit again, so that a burst of throttled requests in flight halves it only once.
+    """
+
+    def __init__(self, maximum: int, minimum: int = 1, tolerance: float = 2.0, adaptive: bool = True) -> None:
+        self.maximum = maximum
+        self.minimum = min(minimum, maximum)
+        self.tolerance = tolerance
+        self.adaptive = adaptive
+        self.limit = maximum
+        # incremented on each decrease, read by the requests when they are sent
+        self.epoch = 0
+        self._in_flight = 0
+        self._successes = 0
+        self._latency: Optional[float] = None
+        self._best_latency: Optional[float] = None
+        self._condition: Optional[asyncio.Condition] = None
+
+    def _get_condition(self) -> asyncio.Condition:
+        # Created lazily so that it is bound to the loop running the requests.
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def __aenter__(self) -> "AdaptiveLimiter":
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        condition = self._get_condition()
+        async with condition:
+            self._in_flight -= 1
+            condition.notify_all()
+
+    def throttled(self, epoch: int) -> None:
+        # epoch is the one of the limiter when the throttled request was sent.
+        if self.adaptive and epoch == self.epoch:
+            self.limit = max(self.minimum, self.limit // 2)
+            self._successes = 0
+            self.epoch += 1
+
+    def succeeded(self, latency: float) -> None:
+        if not self.adaptive:
+            return
+        self._latency = latency if self._latency is None else 0.8 * self._latency + 0.2 * latency
+        if self._best_latency is None or latency < self._best_latency:
+            self._best_latency = latency
+        if self.limit < self.maximum and self._latency <= self.tolerance * self._best_latency:
+            self._successes += 1
+            if self._successes >= self.limit:
+                self.limit += 1
+                self._successes = 0
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    # Retry-After is either a number of seconds or an HTTP date.
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
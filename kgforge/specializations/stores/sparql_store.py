@@ -42,9 +42,10 @@ class SPARQLStore(DatasetStore):
         endpoint: Optional[str] = None,
         file_resource_mapping: Optional[str] = None,
         searchendpoints: Optional[Dict] = None,
+        query_cache: Optional[Dict] = None,
         **store_config,
     ) -> None:
-        super().__init__(model)
+        super().__init__(model, query_cache)
         self.endpoint = endpoint
         self.file_resource_mapping = file_resource_mapping
         self.searchendpoints = searchendpoints
@@ -155,8 +156,15 @@ class SPARQLStore(DatasetStore):
         return resources
 
     def _sparql(
-        self, query: str, endpoint: str
+        self, query: str, endpoint: str, form: Optional[str]
     ) -> Optional[Union[List[Resource], Resource]]:
+        data = self._sparql_results(query, endpoint)
+
+        return SPARQLQueryBuilder.build_resource_from_response(
+            query, data, self.model_context(), form=form
+        )
+
+    def _sparql_results(self, query: str, endpoint: Optional[str]) -> Dict:
         try:
             response = requests.post(
                 (
@@ -172,11 +180,7 @@ class SPARQLStore(DatasetStore):
         except Exception as e:
             raise QueryingError(e) from e
 
-        data = response.json()
-
-        return SPARQLQueryBuilder.build_resource_from_response(
-            query, data, self.model_context()
-        )
+        return response.json()
 
     # Utils.
 
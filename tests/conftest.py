@@ -305,9 +305,11 @@ def context_iri_file(context_file_path):
 
 @pytest.fixture(scope="function")
 def rdf_model_from_dir(context_iri_file, shacl_schemas_file_path):
-    return RdfModel(
+    model = RdfModel(
         shacl_schemas_file_path, context={"iri": context_iri_file}, origin="directory"
     )
+    yield model
+    model.close()
 
 
 @pytest.fixture(scope="session")
@@ -18,7 +18,7 @@ import pytest
 from urllib.error import URLError
 from rdflib.plugins.shared.jsonld.context import URI_GEN_DELIMS
 
-from kgforge.core.commons.context import Context
+from kgforge.core.commons.context import Context, ContextRegistry
 from kgforge.core.conversions.rdf import _merge_jsonld
 
 
@@ -80,3 +80,28 @@ def test_prefix_with_non_URI_GEN_DELIMS_expands(model_context):
 
 def is_valid_document(doc):
     return isinstance(doc, dict) and "@context" in doc
+
+
+def test_context_registry_interns_contexts(custom_context, context_iri_file):
+    registry = ContextRegistry(maxsize=2)
+    context = registry.get(custom_context)
+    assert registry.get(json.loads(json.dumps(custom_context))) is context
+    assert registry.get(custom_context, "http://example.org/context") is not context
+    from_file = registry.get(context_iri_file, context_iri_file)
+    assert from_file.iri == context_iri_file
+    assert registry.get(context_iri_file, context_iri_file) is from_file
+    # the least recently used context is evicted
+    assert registry.get(custom_context) is not context
+    registry.clear()
+    assert registry.get(context_iri_file, context_iri_file, factory=lambda: context) is context
+
+
+def test_context_registry_keeps_resolved_contexts_apart(context_iri_file):
+    registry = ContextRegistry()
+    loaded = registry.get(context_iri_file)
+    resolved = registry.get(context_iri_file, factory=lambda: Context({"name": "http://a/name"}), resolver="a")
+    assert resolved is not loaded
+    assert registry.get(context_iri_file) is loaded
+    assert registry.get(context_iri_file, factory=lambda: Context({"name": "http://b/name"}), resolver="b") is not resolved
+    assert registry.get(context_iri_file, resolver="a") is resolved
+
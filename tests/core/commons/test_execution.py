@@ -11,5 +11,39 @@
 #
 # You should have received a copy of the GNU Lesser General Public License
 # along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
+import threading
+
+import pytest
+
+from kgforge.core.commons.execution import paginate
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_paginate(prefetch):
+    fetched = []
+
+    def fetch_page(offset):
+        fetched.append(offset)
+        return list(range(offset, min(offset + 3, 7))), offset + 3 if offset + 3 < 7 else None
+
+    assert list(paginate(fetch_page, 0, prefetch)) == list(range(7))
+    assert fetched == [0, 3, 6]
+
+
+def test_paginate_prefetches_next_page():
+    threads = []
+    released = threading.Event()
+
+    def fetch_page(page):
+        threads.append(threading.current_thread())
+        if page == 1:
+            released.set()
+        return [page], page + 1 if page < 2 else None
+
+    pages = paginate(fetch_page, 0, True)
+    assert next(pages) == 0
+    # the second page is retrieved in the background while the first one is consumed
+    assert released.wait(5)
+    assert threading.current_thread() not in threads
+    pages.close()
 
-# Placeholder for the test suite for functions controlling code execution.
@@ -0,0 +1,42 @@
+#
+# Blue Brain Nexus Forge is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Blue Brain Nexus Forge is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU Lesser
+# General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
+import json
+
+import pytest
+
+from kgforge.core.commons.json_stream import iter_json_array
+
+
+def chunked(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 3, 1024])
+def test_iter_json_array(size):
+    bindings = [{"name": {"type": "literal", "value": "é" * i}} for i in range(3)] + [12, -1.5e-3, True, None]
+    document = {"head": {"vars": ["bindings"]}, "results": {"bindings": bindings}, "after": [1, 2]}
+    data = json.dumps(document, ensure_ascii=False, indent=1).encode("utf-8")
+    assert list(iter_json_array(chunked(data, size), ("results", "bindings"))) == bindings
+
+
+def test_iter_json_array_missing_path():
+    assert list(iter_json_array([b'{"hits": {"total": 0}}'], ("hits", "hits"))) == []
+    assert list(iter_json_array([b'{"hits": {"hits": []}}'], ("hits", "hits"))) == []
+
+
+def test_iter_json_array_truncated():
+    items = iter_json_array(chunked(b'{"hits": {"hits": [{"a": 1}, {"b": ', 4), ("hits", "hits"))
+    assert next(items) == {"a": 1}
+    with pytest.raises(json.JSONDecodeError):
+        next(items)
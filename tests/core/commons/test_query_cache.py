@@ -0,0 +1,68 @@
+#
+# Blue Brain Nexus Forge is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Blue Brain Nexus Forge is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU Lesser
+# General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
+from unittest import mock
+
+from kgforge.core.commons.query_cache import QueryCache
+from kgforge.core.resource import Resource
+
+
+def test_get_returns_copies():
+    cache = QueryCache()
+    cache.put("q", [Resource(id="a")])
+    found, results = cache.get("q")
+    assert found and results[0].id == "a"
+    results[0].id = "b"
+    assert cache.get("q")[1][0].id == "a"
+    assert cache.get("other") == (False, None)
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_eviction():
+    cache = QueryCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.stats()["evictions"] == 1
+
+    cache = QueryCache(max_bytes=100)
+    cache.put("large", "x" * 200)
+    assert cache.get("large") == (False, None)
+    cache.put("a", "x" * 40)
+    cache.put("b", "x" * 40)
+    assert cache.get("a") == (False, None)
+    assert cache.stats()["bytes"] <= 100
+
+
+def test_expiration():
+    cache = QueryCache(ttl=10)
+    with mock.patch("kgforge.core.commons.query_cache.time.time", return_value=100):
+        cache.put("q", 1)
+    with mock.patch("kgforge.core.commons.query_cache.time.time", return_value=105):
+        assert cache.get("q") == (True, 1)
+    with mock.patch("kgforge.core.commons.query_cache.time.time", return_value=111):
+        assert cache.get("q") == (False, None)
+    assert cache.stats()["entries"] == 0
+
+
+def test_directory(tmp_path):
+    QueryCache(directory=tmp_path).put(("sparql", "q"), [1, 2])
+    cache = QueryCache(directory=tmp_path)
+    assert cache.get(("sparql", "q")) == (True, [1, 2])
+    cache.clear()
+    assert list(tmp_path.iterdir()) == []
+    assert QueryCache(directory=tmp_path).get(("sparql", "q")) == (False, None)
@@ -0,0 +1,42 @@
+#
+# Blue Brain Nexus Forge is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Blue Brain Nexus Forge is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU Lesser
+# General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
+from kgforge.core.commons.resource_cache import ResourceCache
+from kgforge.core.resource import Resource
+from kgforge.core.wrappings.dict import wrap_dict
+
+
+def test_invalidate():
+    a = Resource(id="a")
+    a._store_metadata = wrap_dict({"_self": "https://nexus/a", "_rev": 2})
+    cache = ResourceCache()
+    cache.put(("a", ()), ('"etag"', a))
+    cache.put(("a", (("rev", "2"),)), ('"etag"', a))
+    cache.put(("b", ()), (None, Resource(id="b")))
+    found, (etag, resource) = cache.get(("a", ()))
+    assert found and etag == '"etag"' and resource.id == "a" and resource is not a
+    cache.invalidate([Resource(id="https://nexus/a")])
+    assert cache.get(("a", ())) == (False, None)
+    assert cache.get(("a", (("rev", "2"),))) == (False, None)
+    assert cache.get(("b", ()))[0]
+    assert cache.stats()["entries"] == 1
+
+
+def test_eviction_unindexes():
+    cache = ResourceCache(maxsize=1)
+    cache.put("a", (None, Resource(id="a")))
+    cache.put("b", (None, Resource(id="b")))
+    assert cache.get("a") == (False, None)
+    assert "a" not in cache._keys
+    cache.clear()
+    assert cache._keys == {} and cache.stats()["entries"] == 0
@@ -14,7 +14,9 @@ import re
 import pytest
 from kgforge.specializations.stores import BlueBrainNexus
 
-from kgforge.core.commons.sparql_query_builder import SPARQLQueryBuilder
+from rdflib import URIRef
+
+from kgforge.core.commons.sparql_query_builder import PreparedSparql, SPARQLQueryBuilder, _ConstructCompaction
 from kgforge.core.commons.context import Context
 from kgforge.core.commons.exceptions import QueryingError
 from kgforge.core.resource import Resource
@@ -635,3 +637,133 @@ class TestSPARQLQueryBuilder:
         assert len(results) == 1
         assert isinstance(results[0], Resource)
         assert resource_json == forge.as_json(results[0])
+
+
+def test_rewrite_sparql_keeps_parameters(metadata_context):
+    context_as_dict, context_prefixes, vocab = BlueBrainNexus.reformat_contexts(
+        Context(document=context), metadata_context
+    )
+    query = "SELECT ?x WHERE { ?x agent/name $name ; type $type }"
+    result = SPARQLQueryBuilder.rewrite_sparql(query, context_as_dict, context_prefixes, vocab)
+    assert result.endswith("SELECT ?x WHERE { ?x prov:agent/schema:name $name ; rdf:type $type }")
+    assert PreparedSparql(result).parameters == {"name", "type"}
+
+
+def test_prepared_sparql_bind():
+    prepared = PreparedSparql(
+        "SELECT ?x WHERE { VALUES ?x { $ids } ?x <http://schema.org/name> $name ; "
+        "<http://schema.org/age> $age FILTER regex(?n, \"^a$\") }"
+    )
+    assert prepared.form == "SELECT"
+    result = prepared.bind({
+        "ids": [URIRef("http://example.org/1"), URIRef("http://example.org/2")],
+        "name": 'Jane "J" Doe',
+    })
+    assert result == (
+        "SELECT ?x WHERE { VALUES ?x { <http://example.org/1> <http://example.org/2> } "
+        "?x <http://schema.org/name> \"Jane \\\"J\\\" Doe\" ; <http://schema.org/age> $age "
+        "FILTER regex(?n, \"^a$\") }"
+    )
+    assert prepared.bind(None) == prepared.query
+
+
+def test_prepared_sparql_ignores_parameters_in_iris_strings_and_comments():
+    query = (
+        "SELECT ?x WHERE { ?x <http://example.org/$name> $name ; <http://schema.org/price> ?p\n"
+        "# $name in a comment\n"
+        "FILTER (?p != \"$name\" && ?p != '$name \\' $name' && ?p != \"\"\"$name \" $name\"\"\") }"
+    )
+    prepared = PreparedSparql(query)
+    assert prepared.parameters == {"name"}
+    assert prepared.bind({"name": "a"}) == query.replace("> $name ;", '> "a" ;')
+
+
+@pytest.mark.parametrize("bindings", [
+    pytest.param({"unknown": "x"}, id="unknown-parameter"),
+    pytest.param({"id": URIRef("http://example.org/1> } ; DELETE WHERE {")}, id="invalid-iri"),
+    pytest.param({"id": object()}, id="unsupported-type"),
+])
+def test_prepared_sparql_bind_exception(bindings):
+    with pytest.raises(QueryingError):
+        PreparedSparql("SELECT ?x WHERE { $id ?p ?x }").bind(bindings)
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("SELECT ?x WHERE { ?x ?p ?o }", "SELECT"),
+    ("PREFIX construct: <http://example.org/select#>\n# ASK\nconstruct { ?s ?p ?o } WHERE { ?s ?p ?o }",
+     "CONSTRUCT"),
+    ("ASK { ?s ?p ?o }", "ASK"),
+    ("DESCRIBE <http://example.org/1>", "DESCRIBE"),
+    ("PREFIX x: <http://example.org/>", None),
+])
+def test_query_form(query, expected):
+    assert SPARQLQueryBuilder.query_form(query) == expected
+
+
+def triple(subject, predicate, object_, object_type="uri", datatype=None):
+    subject_type = "bnode" if subject.startswith("_:") else "uri"
+    binding = {
+        "subject": {"type": subject_type, "value": subject.replace("_:", "")},
+        "predicate": {"type": "uri", "value": predicate},
+        "object": {"type": object_type, "value": object_},
+    }
+    if datatype:
+        binding["object"]["datatype"] = datatype
+    return binding
+
+
+SUBJECT = "http://api.brain-map.org/api/v2/data/Structure/315"
+XSD = "http://www.w3.org/2001/XMLSchema#"
+
+
+@pytest.mark.parametrize("results", [
+    pytest.param([
+        triple(SUBJECT, "http://www.w3.org/1999/02/22-rdf-syntax-ns#type", "http://www.w3.org/2002/07/owl#Class"),
+        triple(SUBJECT, "http://www.w3.org/1999/02/22-rdf-syntax-ns#type", "http://example.org/Other"),
+        triple(SUBJECT, "http://www.w3.org/2000/01/rdf-schema#label", "a", "literal"),
+        triple(SUBJECT, "http://www.w3.org/2000/01/rdf-schema#label", "b", "literal"),
+        triple(SUBJECT, "http://schema.org/isPartOf", "http://api.brain-map.org/api/v2/data/Structure/8"),
+        triple(SUBJECT, "http://schema.org/isPartOf", "literal", "literal"),
+    ], id="types-and-coercions"),
+    pytest.param([
+        triple(SUBJECT, "http://schema.org/identifier", "0315", "literal", XSD + "integer"),
+        triple(SUBJECT, "http://other.org/flag", "1", "literal", XSD + "boolean"),
+        triple(SUBJECT, "http://other.org/flag", "true", "literal", XSD + "boolean"),
+        triple(SUBJECT, "http://other.org/date", "2020-01-01T00:00:00Z", "literal", XSD + "dateTime"),
+        triple(SUBJECT, "http://xmlns.com/foaf/0.1/name", "2.5", "literal", XSD + "decimal"),
+    ], id="datatypes"),
+    pytest.param([
+        triple(SUBJECT, "https://neuroshapes.org/atlasRelease", "http://example.org/a/b"),
+        triple(SUBJECT, "http://other.org/p", "http://xmlns.com/foaf/0.1/Person"),
+        triple("http://example.org/a", "http://www.w3.org/2004/02/skos/core#notation", "n", "literal"),
+    ], id="references-and-subjects"),
+])
+def test_build_resource_from_construct_query_matches_pyld(results, custom_context, forge):
+    context = Context(custom_context, "http://store.org/metadata.json")
+    assert _ConstructCompaction.from_context(context) is not None
+    expected = SPARQLQueryBuilder._build_resource_from_construct_query_with_pyld(results, context)
+    resources = SPARQLQueryBuilder.build_resource_from_construct_query(results, context)
+    assert [forge.as_json(r) for r in resources] == [forge.as_json(r) for r in expected]
+    assert [r.context for r in resources] == [r.context for r in expected]
+
+
+def test_build_resource_from_construct_query_with_blank_nodes(custom_context, forge):
+    results = [
+        triple(SUBJECT, "http://schema.org/isPartOf", "b0", "bnode"),
+        triple("_:b0", "http://xmlns.com/foaf/0.1/name", 'say "hi"', "literal"),
+        triple("_:b0", "http://schema.org/isPartOf", "b1", "bnode"),
+        triple("_:b1", "http://www.w3.org/2000/01/rdf-schema#label", "nested", "literal"),
+    ]
+    resources = SPARQLQueryBuilder.build_resource_from_construct_query(results, Context(custom_context))
+    assert [forge.as_json(r) for r in resources] == [
+        {"id": SUBJECT, "isPartOf": {"name": 'say "hi"', "isPartOf": {"label": "nested"}}}
+    ]
+
+
+def test_build_resource_from_construct_query_unsupported_context(forge):
+    context = Context({"@language": "en", "label": "http://www.w3.org/2000/01/rdf-schema#label"})
+    assert _ConstructCompaction.from_context(context) is None
+    results = [triple(SUBJECT, "http://www.w3.org/2000/01/rdf-schema#label", "a", "literal")]
+    resources = SPARQLQueryBuilder.build_resource_from_construct_query(results, context)
+    # a literal without language is not compacted to a string with a default language
+    assert [forge.as_json(r) for r in resources] == [{"id": SUBJECT, "label": {"@value": "a"}}]
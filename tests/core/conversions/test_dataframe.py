@@ -20,7 +20,7 @@ from pandas import DataFrame
 # Test suite for conversion of resource to / from Pandas DataFrame.
 
 from kgforge.core.resource import Resource
-from kgforge.core.conversions.dataframe import deflatten
+from kgforge.core.conversions.dataframe import deflatten, sparql_results_as_dataframe
 
 
 @pytest.fixture
@@ -282,3 +282,38 @@ def test_deflatten_raises():
         deflatten([('a','A'), ('a.p', 'Q')], '.')
     msg = str(exc.value)
     assert 'Mix of' in msg and 'Cannot be processed' in msg
+
+
+def test_sparql_results_as_dataframe():
+    xsd = "http://www.w3.org/2001/XMLSchema#"
+    results = {
+        "head": {"vars": ["s", "n", "f", "b", "d", "x", "m"]},
+        "results": {"bindings": [
+            {
+                "s": {"type": "uri", "value": "http://ex/a"},
+                "n": {"type": "literal", "datatype": f"{xsd}integer", "value": "9007199254740993"},
+                "f": {"type": "literal", "datatype": f"{xsd}double", "value": "1.5E0"},
+                "b": {"type": "literal", "datatype": f"{xsd}boolean", "value": "true"},
+                "d": {"type": "literal", "datatype": f"{xsd}dateTime", "value": "2021-01-01T01:00:00+01:00"},
+                "x": {"type": "literal", "value": "x"},
+                "m": {"type": "literal", "datatype": f"{xsd}integer", "value": "1"},
+            },
+            {
+                "s": {"type": "uri", "value": "http://ex/b"},
+                "b": {"type": "literal", "datatype": f"{xsd}boolean", "value": "0"},
+                "d": {"type": "literal", "datatype": f"{xsd}dateTime", "value": "not a date"},
+                "m": {"type": "literal", "value": "one"},
+            },
+        ]},
+    }
+    df = sparql_results_as_dataframe(results)
+    assert list(df.columns) == ["s", "n", "f", "b", "d", "x", "m"]
+    assert [str(t) for t in df.dtypes] == ["object", "Int64", "float64", "boolean", "object", "object", "object"]
+    assert list(df["s"]) == ["http://ex/a", "http://ex/b"]
+    assert df["n"][0] == 9007199254740993 and df["n"].isna()[1]
+    assert df["f"][0] == 1.5 and np.isnan(df["f"][1])
+    assert list(df["b"]) == [True, False]
+    # values which cannot be converted to the datatype are kept as str
+    assert list(df["d"]) == ["2021-01-01T01:00:00+01:00", "not a date"]
+    assert list(df["x"]) == ["x", None] and list(df["m"]) == ["1", "one"]
+
@@ -12,8 +12,19 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
 
+import json
+from collections import namedtuple
+from decimal import Decimal
+
+import hjson
 import pytest
 
+from kgforge.core.commons.actions import LazyAction
+from kgforge.core.commons.attributes import sort_attrs
+from kgforge.core.conversions.json import as_json
+from kgforge.core.resource import Resource, encode
+from kgforge.core.wrappings.dict import wrap_dict
+
 
 # Test suite for conversion of a resource to / from JSON.
 
@@ -142,3 +153,23 @@ class TestConversionFromJson:
         del r2.p1
         rcs = [r3, r4]
         assert x == rcs
+
+
+def test_as_json_matches_hjson_round_trip():
+    Point = namedtuple("Point", ["x", "y"])
+    contribution = Resource(type="Contribution", context="http://context", agent=Resource(id="a", context={"a": 1}))
+    resource = Resource(
+        id="r", type=["Dataset", "Entity"], context={"@vocab": "http://vocab/"}, name="é", size=12, ratio=0.5,
+        missing=float("nan"), flag=True, nothing=None, decimal=Decimal("1.10"), point=Point(1, 2),
+        keys={2: "two", 1.5: "one and a half"}, contribution=[contribution, (1, "a")],
+        action=LazyAction(sorted, [2, 1]), nested={"context": "removed", "b": [{"context": "removed", "c": 1}]},
+    )
+    resource._store_metadata = wrap_dict({"_rev": 2, "_self": "http://self", "context": "kept"})
+    expected = json.loads(hjson.dumpsJSON(resource, default=encode, item_sort_key=sort_attrs))
+    del expected["context"], expected["nested"]["context"], expected["nested"]["b"][0]["context"]
+    del expected["contribution"][0]["context"], expected["contribution"][0]["agent"]["context"]
+    expected.update(json.loads(hjson.dumpsJSON(resource._store_metadata, item_sort_key=sort_attrs)))
+    result = as_json(resource, False, True, None, None, None)
+    assert result == expected
+    assert json.dumps(result) == json.dumps(expected)
+
@@ -20,8 +20,12 @@ from urllib.parse import urljoin
 from urllib.request import pathname2url
 
 import json
+from unittest import mock
+
 import pytest
+from pyld import jsonld
 from rdflib import Graph, BNode, term
+from rdflib.compare import isomorphic
 from rdflib.namespace import RDF, Namespace
 
 from kgforge.core.resource import Resource
@@ -141,6 +145,23 @@ class TestJsonLd:
             payload["@id"] = self.AN_ID_WITH_SPACE
             from_jsonld(payload) 
 
+    def test_as_jsonld_without_metadata_builds_no_graph(self, organization, organization_jsonld_compacted,
+                                                        model_context, metadata_context):
+        document = deepcopy(model_context.document)
+        with mock.patch("kgforge.core.conversions.rdf.Graph", wraps=Graph) as graph:
+            result = as_jsonld(organization, form=Form.COMPACTED.value, store_metadata=False,
+                               model_context=model_context, metadata_context=metadata_context,
+                               context_resolver=None)
+            as_jsonld(organization, form=Form.EXPANDED.value, store_metadata=False,
+                      model_context=model_context, metadata_context=metadata_context, context_resolver=None)
+        graph.assert_not_called()
+        compacted = organization_jsonld_compacted(organization, store_metadata=False)
+        compacted["founder"]["@type"] = sorted(compacted["founder"]["@type"])
+        result["founder"]["@type"] = sorted(result["founder"]["@type"])
+        assert result == compacted
+        # the context document is shared, not copied, and should be left untouched
+        assert model_context.document == document
+
     def test_as_jsonld(self, building, model_context, building_jsonld, forge):
         building.context = model_context.document["@context"]
         building.context["embedding"] = {
@@ -225,6 +246,40 @@ class TestGraph:
         result = as_graph([building, organization], store_metadata, model_context, None, None)
         _assert_same_graph(result, expected)
 
+    def test_as_graph_many_parses_one_document(self, building, model_context):
+        resources = []
+        expected = Graph()
+        for i in range(3):
+            resource = deepcopy(building)
+            resource.id = f"http://test/{i}"
+            resource.geo = Resource(id=f"_:geo{i}", latitude=40 + i)
+            expected += as_graph(resource, False, model_context, None, None)
+            resource.geo.id = "_:geo"
+            resources.append(resource)
+
+        with mock.patch("kgforge.core.conversions.rdf.jsonld.expand", wraps=jsonld.expand) as expand:
+            result = as_graph(resources, False, model_context, None, None)
+
+        expand.assert_called_once()
+        assert isomorphic(result, expected)
+        # blank nodes with the same identifier in different resources are kept distinct
+        assert len(set(result.objects(None, term.URIRef("https://schema.org/geo")))) == 3
+
+    def test_as_graph_many_relabels_coerced_blank_nodes(self, custom_context):
+        resources = []
+        expected = Graph()
+        for i in range(2):
+            resource = Resource(context=custom_context["@context"], id=f"http://test/{i}", isPartOf=f"_:whole{i}")
+            expected += as_graph(resource, False, None, None, None)
+            resource.isPartOf = "_:whole"
+            resources.append(resource)
+
+        result = as_graph(resources, False, None, None, None)
+
+        assert isomorphic(result, expected)
+        # blank node identifiers given as strings of terms coerced to @id are relabeled too
+        assert len(set(result.objects(None, term.URIRef("http://schema.org/isPartOf")))) == 2
+
     @pytest.mark.parametrize("store_metadata", store_metadata_params)
     def test_from_graph(self, building, organization, building_jsonld, model_context, store_metadata, metadata_context):
         store_metadata = False
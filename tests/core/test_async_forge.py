@@ -0,0 +1,42 @@
+#
+# Blue Brain Nexus Forge is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Blue Brain Nexus Forge is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU Lesser
+# General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
+import asyncio
+
+from kgforge.core import AsyncKnowledgeGraphForge, Resource
+
+
+def test_async_forge(config):
+
+    async def main():
+        async with await AsyncKnowledgeGraphForge.create(config) as forge:
+            resource = Resource(type="Person", name="Jane Doe")
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0)
+
+            # the event loop keeps running other coroutines during the operations
+            ticker = asyncio.ensure_future(tick())
+            await forge.aregister(resource)
+            retrieved = await forge.aretrieve(resource.id)
+            ticker.cancel()
+            return resource, retrieved, ticks
+
+    resource, retrieved, ticks = asyncio.run(main())
+    assert resource._synchronized
+    assert retrieved.name == "Jane Doe"
+    assert ticks > 0
@@ -13,12 +13,15 @@
 # along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
 
 import json
+from unittest import mock
+
 import pytest
 from rdflib import RDFS
 
 from kgforge.core.resource import Resource
 from kgforge.core.commons.exceptions import ValidationError
 from kgforge.specializations.models import RdfModel
+from kgforge.specializations.models.rdf.service import RdfService
 from tests.specializations.models.data import *
 
 
@@ -172,3 +175,74 @@ class TestValidation:
             == invalid_activity_resource._last_action.operation
             == rdf_model_from_dir._validate_many.__name__
         )
+
+    def test_validate_many_reuses_validation_pool(
+        self,
+        rdf_model_from_dir: RdfModel,
+        valid_activity_resource,
+        invalid_activity_resource,
+    ):
+        service = rdf_model_from_dir.service
+        executor = rdf_model_from_dir._validation_executor
+        resources = [valid_activity_resource, invalid_activity_resource]
+        with mock.patch.object(service, "get_shape_graph", wraps=service.get_shape_graph) as get_shape_graph:
+            rdf_model_from_dir.validate(resources, False, type_="Activity")
+            pool = executor._pool
+            rdf_model_from_dir.validate(resources, False, type_="Activity")
+        assert executor._pool is pool
+        # shapes are loaded once in the workers, only the resources are sent afterwards
+        get_shape_graph.assert_called_once()
+        assert valid_activity_resource._validated is True
+        assert invalid_activity_resource._validated is False
+        rdf_model_from_dir.close()
+        assert executor._pool is None
+
+    def test_validate_many_groups_resources_by_shape(
+        self,
+        rdf_model_from_dir: RdfModel,
+        activity_json,
+    ):
+        activities = [Resource(id=f"http://testing/{i}", **activity_json) for i in range(6)]
+        activities[1].status = "unknown"
+        del activities[2].generated
+        # a second description of the same node is validated on its own
+        duplicate = Resource(id="http://testing/0", **activity_json)
+        duplicate.status = "unknown"
+        person = Resource(id="http://testing/person", type="Person", givenName="John", gender="other")
+        resources = activities + [duplicate, person]
+        expected = []
+        for r in resources:
+            try:
+                rdf_model_from_dir._validate_one(r, type_=None, inference=None)
+            except ValidationError:
+                pass
+            expected.append(r._validated)
+        assert expected == [True, False, False, True, True, True, False, False]
+
+        rdf_model_from_dir.validate(resources, False, type_=None, inference=None)
+
+        assert [r._validated for r in resources] == expected
+        messages = [r._last_action.message for r in resources]
+        assert messages[0] is None
+        assert messages[1] == messages[6] == "violation(s) of type(s) Has Value Constraint Component"
+        assert messages[2] == "violation(s) of type(s) Min Count Constraint Component"
+        assert messages[7] == "violation(s) of type(s) In Constraint Component, Min Count Constraint Component"
+
+    def test_validate_many_does_not_depend_on_other_resources(self, rdf_model_from_dir: RdfModel):
+        # the entity generated by the first activity is only typed by the second one
+        referring = Resource(id="http://testing/a", type="Activity", status="completed",
+                             generated=Resource(id="http://testing/e"))
+        describing = Resource(id="http://testing/b", type="Activity", status="completed",
+                              generated=Resource(id="http://testing/e", type="Entity"))
+        service = rdf_model_from_dir.service
+        type_to_validate, shape_uriref = rdf_model_from_dir._prepare_shape_uriref(referring, None)
+        shape, shacl_graph, ont_graph = service.get_shape_graph(shape_uriref)
+        validated = RdfService.validate_many(
+            [describing, referring], shape, shacl_graph, ont_graph, type_to_validate, None, service.context
+        )
+        alone = [
+            RdfService.validate(r, shape, shacl_graph, ont_graph, type_to_validate, None, service.context)[0]
+            for r in (describing, referring)
+        ]
+        assert [conforms for conforms, _ in validated] == alone == [True, False]
+
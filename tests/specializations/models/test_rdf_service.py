@@ -14,10 +14,14 @@
 
 
 import itertools
+from unittest import mock
+
 from pyshacl import Shape
 import pytest
 from rdflib import OWL, RDF, SH, Graph, URIRef
+from rdflib import Dataset as RDFDataset
 from kgforge.specializations.models.rdf.directory_service import DirectoryService
+from kgforge.specializations.models.rdf.service import ShapesGraphWrapper
 from kgforge.specializations.models.rdf_model import RdfModel
 from tests.specializations.models.data import TYPES_SHAPES_MAP
 
@@ -168,3 +172,27 @@ def test_get_shape_uriref_from_class_fragment(rdf_model_from_dir):
             t
         )
         assert shape_uriref == URIRef(v["shape"])
+
+
+def test_get_shape_graph_is_memoized(rdf_model_from_dir: RdfModel):
+    service = rdf_model_from_dir.service
+    with mock.patch.object(service, "_init_shape_graph_wrapper") as init_shape_graph_wrapper:
+        for s in TYPES_SHAPES_MAP.values():
+            shape_graph = service.get_shape_graph(URIRef(s["shape"]))
+            assert service.get_shape_graph(URIRef(s["shape"])) is shape_graph
+    # importing a schema does not rebuild the shapes of the schemas imported before
+    init_shape_graph_wrapper.assert_not_called()
+
+
+def test_register_shapes(rdf_model_from_dir: RdfModel):
+    service = rdf_model_from_dir.service
+    s = TYPES_SHAPES_MAP["Person"]
+    _, shape_graph, _ = service.get_shape_graph(URIRef(s["shape"]))
+    wrapper = ShapesGraphWrapper(RDFDataset())
+    assert len(wrapper.shapes) == 0
+    wrapper.register_shapes(shape_graph)
+    shape = wrapper.lookup_shape_from_node(URIRef(s["shape"]))
+    assert shape.node == URIRef(s["shape"])
+    registered = dict(wrapper._node_shape_cache)
+    wrapper.register_shapes(shape_graph)
+    assert all(wrapper._node_shape_cache[node] is shape for node, shape in registered.items())
@@ -0,0 +1,91 @@
+#
+# Blue Brain Nexus Forge is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Blue Brain Nexus Forge is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU Lesser
+# General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
+from unittest import mock
+
+import pytest
+from rdflib import RDF, SH, URIRef
+
+from kgforge.core.commons.sparql_query_builder import PreparedSparql
+from kgforge.core.resource import Resource
+from kgforge.core.wrappings.dict import wrap_dict
+from kgforge.specializations.models.rdf.store_service import StoreService
+
+CONTEXT = {
+    "sh": "http://www.w3.org/ns/shacl#",
+    "nxv": "https://bluebrain.github.io/nexus/vocabulary/",
+    "shapes": {"@id": "nxv:shapes", "@type": "@id"},
+}
+SCHEMA_ID = "http://shapes.ex/person"
+SHAPE_ID = "http://shapes.ex/PersonShape"
+
+
+def schema(rev):
+    resource = Resource(
+        context=CONTEXT,
+        id=SCHEMA_ID,
+        shapes=Resource(id=SHAPE_ID, type="sh:NodeShape", **{"sh:targetClass": {"id": "http://schema.org/Person"}})
+    )
+    resource._store_metadata = wrap_dict({"_rev": rev})
+    return resource
+
+
+@pytest.fixture
+def store():
+    revisions = {"current": 1}
+    store = mock.MagicMock(endpoint="https://nexus-instance.org", bucket="test/kgforge")
+    store.service.resolve_context.return_value = CONTEXT
+
+    def sparql(query, bindings=None, **kwargs):
+        query = query.bind(bindings)
+        if "VALUES" in query:
+            return [Resource(resource_id=SCHEMA_ID, rev=revisions["current"])]
+        if "targetClass" in query:
+            return [Resource(type="http://schema.org/Person", shape=SHAPE_ID, resource_id=SCHEMA_ID)]
+        return []
+
+    store.prepare_sparql.side_effect = lambda query, rewrite: PreparedSparql(query)
+    store.sparql.side_effect = sparql
+    store.retrieve.side_effect = lambda *args, **kwargs: schema(revisions["current"])
+    return store, revisions
+
+
+def load(service):
+    return service.load_resource_graph_from_source(URIRef(f"{SCHEMA_ID}/graph"), URIRef(SCHEMA_ID))
+
+
+def test_schemas_are_cached_by_revision(store, tmp_path):
+    store, revisions = store
+    graph = load(StoreService(store, "http://context.ex", None, str(tmp_path)))
+    assert (URIRef(SHAPE_ID), RDF.type, SH.NodeShape) in graph
+    assert store.retrieve.call_count == 1
+    assert len(list(tmp_path.iterdir())) == 1
+
+    cached = load(StoreService(store, "http://context.ex", None, str(tmp_path)))
+    assert store.retrieve.call_count == 1
+    assert set(cached) == set(graph)
+
+    revisions["current"] = 2
+    load(StoreService(store, "http://context.ex", None, str(tmp_path)))
+    assert store.retrieve.call_count == 2
+    # the graph of the previous revision is replaced
+    assert [p.name.endswith("-2.nt") for p in tmp_path.iterdir()] == [True]
+
+
+def test_schemas_are_not_cached_by_default(store):
+    store, _ = store
+    service = StoreService(store, "http://context.ex")
+    load(service)
+    load(service)
+    assert store.retrieve.call_count == 2
+    assert not any("VALUES" in c.args[0].query for c in store.sparql.call_args_list)
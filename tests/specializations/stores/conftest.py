@@ -0,0 +1,43 @@
+#
+# Blue Brain Nexus Forge is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Blue Brain Nexus Forge is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU Lesser
+# General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
+from unittest import mock
+
+import pytest
+
+from kgforge.specializations.models import DemoModel
+from kgforge.specializations.stores.bluebrain_nexus import BlueBrainNexus
+from kgforge.specializations.stores.nexus import Service
+from utils import full_path_relative_to_root
+
+NEXUS = "https://nexus-instance.org"
+BUCKET = "test/kgforge"
+NEXUS_PROJECT_CONTEXT = {"base": "http://data.net", "vocab": "http://vocab.net", "apiMappings": []}
+NEXUS_METADATA_CONTEXT = {
+    "nxv": "https://bluebrain.github.io/nexus/vocabulary/",
+    "_rev": "nxv:rev",
+    "_project": {"@id": "nxv:project", "@type": "@id"},
+    "_deprecated": "nxv:deprecated",
+}
+
+
+@pytest.fixture
+def offline_nexus_store():
+    model = DemoModel(origin="directory", source=full_path_relative_to_root("tests/data/demo-model/"))
+    with mock.patch(
+        "kgforge.specializations.stores.nexus.http_helpers.project_fetch",
+        return_value=NEXUS_PROJECT_CONTEXT
+    ), mock.patch.object(Service, "resolve_context", return_value=NEXUS_METADATA_CONTEXT):
+        store = BlueBrainNexus(model=model, endpoint=NEXUS, bucket=BUCKET, token="token", max_connection=2)
+    yield store
+    store.close()
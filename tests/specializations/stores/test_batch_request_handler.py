@@ -0,0 +1,210 @@
+#
+# Blue Brain Nexus Forge is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Blue Brain Nexus Forge is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU Lesser
+# General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pytest
+from aiohttp import hdrs, web
+
+from kgforge.core.commons.exceptions import QueryingError
+from kgforge.core.commons.execution import run_in_thread
+from kgforge.core.resource import Resource
+from kgforge.specializations.stores.nexus.batch_request_handler import BatchRequestHandler
+from kgforge.specializations.stores.nexus.throttling import AdaptiveLimiter, RetryPolicy, parse_retry_after
+
+
+@pytest.fixture
+def local_server(offline_nexus_store):
+    peers = []
+    in_flight = {"current": 0, "max": 0}
+    attempts = {}
+
+    async def handler(request: web.Request):
+        peers.append(request.transport.get_extra_info("peername"))
+        in_flight["current"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["current"])
+        await asyncio.sleep(0.01)
+        in_flight["current"] -= 1
+        id_ = request.match_info["id"]
+        attempts[id_] = attempts.get(id_, 0) + 1
+        if id_ == "missing":
+            return web.json_response({"reason": "Not found."}, status=404)
+        if id_.startswith("throttled") and attempts[id_] < 3:
+            return web.Response(status=429, headers={"Retry-After": "0"})
+        if id_ == "unavailable":
+            return web.Response(status=503, text="<html>Service Unavailable</html>")
+        return web.json_response({"@id": request.match_info["id"]})
+
+    async def start():
+        app = web.Application()
+        app.router.add_get("/resources/{id}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        return runner, site._server.sockets[0].getsockname()[1]
+
+    service = offline_nexus_store.service
+    runner, port = service.run_async(start())
+    yield f"http://127.0.0.1:{port}", peers, in_flight, attempts
+    service.run_async(runner.cleanup())
+
+
+def prepare_get(service, resource, **kwargs):
+    url = f"{kwargs['base_url']}/resources/{resource.id}"
+    return hdrs.METH_GET, url, resource, QueryingError, service.headers, None, None
+
+
+def test_batch_request_reuses_pooled_session(offline_nexus_store, local_server):
+    base_url, peers, _, _ = local_server
+    service = offline_nexus_store.service
+    resources = [Resource(id=str(i)) for i in range(10)]
+
+    first = BatchRequestHandler.batch_request_on_resources(
+        service, resources, prepare_get, base_url=base_url
+    )
+    session = service.get_session()
+    second = BatchRequestHandler.batch_request_on_resources(
+        service, resources, prepare_get, base_url=base_url
+    )
+
+    assert [r.response["@id"] for r in first + second] == [r.id for r in resources] * 2
+    assert service.get_session() is session
+    # keep-alive connections are shared across calls and bounded by max_connection
+    assert len(set(peers)) <= service.max_connection
+
+
+def test_stream_request_bounds_resources_in_flight(offline_nexus_store, local_server):
+    base_url, _, in_flight, _ = local_server
+    service = offline_nexus_store.service
+    service.max_connection = 10
+    pulled = []
+
+    def generate():
+        for i in range(20):
+            pulled.append(i)
+            yield Resource(id="missing" if i == 3 else str(i))
+
+    results = BatchRequestHandler.stream_request_on_resources(
+        service, generate(), prepare_get, window=4, base_url=base_url
+    )
+    first = next(results)
+    assert len(pulled) == 4
+    results = [first] + list(results)
+
+    assert in_flight["max"] <= 4
+    assert sorted(r.resource.id for r in results) == sorted(["missing"] + [str(i) for i in range(20) if i != 3])
+    errors = [r for r in results if isinstance(r.response, Exception)]
+    assert [r.resource.id for r in errors] == ["missing"]
+    assert isinstance(errors[0].response, QueryingError)
+
+
+def test_stream_request_skips_unverified(offline_nexus_store, local_server):
+    base_url, peers, _, _ = local_server
+    service = offline_nexus_store.service
+    resources = [Resource(id=str(i)) for i in range(3)]
+
+    results = list(BatchRequestHandler.stream_request_on_resources(
+        service, iter(resources), prepare_get, window=2, verify=lambda r: r.id != "1", base_url=base_url
+    ))
+
+    assert {r.resource.id: r.response for r in results}["1"] is None
+    assert len(peers) == 2
+
+
+def test_batch_request_retries_throttled_requests(offline_nexus_store, local_server):
+    base_url, _, _, attempts = local_server
+    service = offline_nexus_store.service
+    service.retry_policy = RetryPolicy(max_attempts=3, backoff_factor=0)
+    resources = [Resource(id="throttled"), Resource(id="unavailable"), Resource(id="0")]
+
+    with mock.patch.object(AdaptiveLimiter, "throttled", autospec=True) as throttled:
+        results = BatchRequestHandler.batch_request_on_resources(
+            service, resources, prepare_get, base_url=base_url
+        )
+
+    assert results[0].response == {"@id": "throttled"}
+    assert attempts["throttled"] == 3
+    assert isinstance(results[1].response, QueryingError)
+    assert attempts["unavailable"] == 3
+    assert results[2].response == {"@id": "0"}
+    assert throttled.call_count == 4
+
+
+def test_retry_policy():
+    policy = RetryPolicy(max_attempts=3, backoff_factor=1, max_backoff=3)
+    assert policy.is_retryable("GET", 1, 502)
+    assert policy.is_retryable("GET", 1, None)
+    assert policy.is_retryable("POST", 1, 429)
+    assert not policy.is_retryable("POST", 1, 502)
+    assert not policy.is_retryable("POST", 1, None)
+    assert not policy.is_retryable("GET", 1, 404)
+    assert not policy.is_retryable("GET", 3, 503)
+    assert all(0 <= policy.delay(attempt) <= 3 for attempt in range(1, 10))
+    assert policy.delay(1, "7") == 7
+    assert policy.delay(1, "86400") == 300
+    assert RetryPolicy(max_retry_after=10).delay(1, "Wed, 21 Oct 2099 07:28:00 GMT") == 10
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert parse_retry_after("soon") is None
+
+
+def test_adaptive_limiter():
+    limiter = AdaptiveLimiter(8)
+    # requests sent at the same epoch are throttled together
+    limiter.throttled(0)
+    limiter.throttled(0)
+    assert limiter.limit == 4
+    limiter.throttled(limiter.epoch)
+    assert limiter.limit == 2
+    for _ in range(2):
+        limiter.succeeded(0.1)
+    assert limiter.limit == 3
+    limiter.succeeded(10)
+    assert limiter.limit == 3
+    static = AdaptiveLimiter(8, adaptive=False)
+    static.throttled(static.epoch)
+    assert static.limit == 8
+
+
+def test_batch_request_runs_on_awaiting_loop(offline_nexus_store):
+    service = offline_nexus_store.service
+    resources = [Resource(id=str(i)) for i in range(5)]
+
+    async def handler(request: web.Request):
+        return web.json_response({"@id": request.match_info["id"]})
+
+    async def main():
+        app = web.Application()
+        app.router.add_get("/resources/{id}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        base_url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # the server runs on this loop: the requests would never be answered if they were not sent from it
+            results = await run_in_thread(
+                executor, BatchRequestHandler.batch_request_on_resources,
+                service, resources, prepare_get, base_url=base_url
+            )
+            session = service._sessions[loop]
+            await run_in_thread(executor, offline_nexus_store.close)
+        await runner.cleanup()
+        return results, session
+
+    results, session = asyncio.run(main())
+    assert [r.response["@id"] for r in results] == [r.id for r in resources]
+    assert session.closed
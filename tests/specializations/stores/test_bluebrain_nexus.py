@@ -11,8 +11,14 @@
 #
 # You should have received a copy of the GNU Lesser General Public License
 # along with Blue Brain Nexus Forge. If not, see <https://choosealicense.com/licenses/lgpl-3.0/>.
+import asyncio
 import copy
+import gzip
+import hashlib
+import json
 import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest import mock
 from urllib.parse import quote_plus, urljoin
 from urllib.request import pathname2url
@@ -20,10 +26,14 @@ from uuid import uuid4
 from contextlib import nullcontext as does_not_raise
 
 import pytest
+from aiohttp import hdrs, web
 from typing import Callable, Union, List
 
 
+from kgforge.core.commons.exceptions import DownloadingError, UploadingError
 from kgforge.core.commons.files import load_yaml_from_file
+from kgforge.core.commons.query_cache import QueryCache
+from kgforge.core.commons.resource_cache import ResourceCache
 from kgforge.core.resource import Resource
 from kgforge.core.archetypes.store import Store
 from kgforge.core.commons.context import Context
@@ -32,12 +42,15 @@ from kgforge.core.wrappings.dict import wrap_dict
 from kgforge.core.wrappings.paths import Filter, create_filters_from_dict
 from kgforge.core.commons.sparql_query_builder import SPARQLQueryBuilder
 from kgforge.specializations.models import DemoModel
-from kgforge.specializations.stores.bluebrain_nexus import BlueBrainNexus
+from kgforge.specializations.stores.bluebrain_nexus import BlueBrainNexus, _search_by_terms
 
 # FIXME mock Nexus for unittests
 # TODO To be port to the generic parameterizable test suite for stores in test_stores.py. DKE-135.
 from kgforge.specializations.stores.nexus import Service, prepare_methods
+from kgforge.specializations.stores.nexus.batch_request_handler import BatchRequestHandler, BatchResult
+from kgforge.specializations.stores.nexus.http_helpers import GzipAdapter
 from kgforge.specializations.stores.nexus.prepare_methods import _prepare_uri
+from kgforge.specializations.stores.nexus.throttling import RetryPolicy
 from utils import full_path_relative_to_root
 
 MODEL = DemoModel(
@@ -784,3 +797,509 @@ def do_recursive(fun: Callable, data: Union[Resource, List[Resource]], *args) ->
                 do_recursive(fun, v, *args)
     else:
         raise TypeError("not a Resource nor a list of Resource")
+
+
+def test_close_releases_session(offline_nexus_store):
+    service = offline_nexus_store.service
+    session = service.run_async(_get_session(service))
+    offline_nexus_store.close()
+    assert session.closed
+    assert service._loop is None
+
+
+async def _get_session(service):
+    return service.get_session()
+
+
+def test_search_hydrates_sources_in_bulk(offline_nexus_store):
+    project = f"{NEXUS}/projects/{BUCKET}"
+    resources = [Resource(id=f"{NEXUS}/{i}", _project=project, _rev=1) for i in range(4)]
+    hits = [
+        {"_source": {"@id": f"{NEXUS}/0", "_rev": 1, "_original_source": '{"@id": "0", "name": "a"}'}},
+        {"_source": {"@id": f"{NEXUS}/2", "_rev": 2, "_original_source": '{"@id": "2"}'}},
+        {"_source": {"@id": f"{NEXUS}/3", "_rev": 1, "_original_source": '{"@id": "3"}'}},
+    ]
+    response = mock.Mock(status_code=200)
+    response.json.return_value = {"hits": {"hits": hits}}
+
+    def fetch(service, resources, **kwargs):
+        return [BatchResult(r, {"@id": r.id}) for r in resources]
+
+    with mock.patch.object(offline_nexus_store.service.http, "post", return_value=response) as post, \
+            mock.patch.object(BatchRequestHandler, "batch_request_on_resources", side_effect=fetch) as get:
+        results = offline_nexus_store._hydrate(resources, True, True)
+
+    assert post.call_count == 1
+    assert post.call_args.args[0].endswith("_search")
+    # the resource missing from the view and the one indexed at another revision are fetched
+    assert [r.id for r in get.call_args.kwargs["resources"]] == [f"{NEXUS}/1", f"{NEXUS}/2"]
+    assert [r.resource for r in results] == resources
+    assert [r.response for r in results] == [
+        {"@id": "0", "name": "a"}, {"@id": f"{NEXUS}/1"}, {"@id": f"{NEXUS}/2"}, {"@id": "3"}
+    ]
+
+
+def test_elastic_iter_chains_pages_with_search_after(offline_nexus_store):
+    hits = [{"_id": str(i), "_source": {"@id": str(i)}, "sort": [str(i)]} for i in range(5)]
+    queries = []
+
+    def elastic(query, view, as_resource, build_resource_from):
+        queries.append(query)
+        start = int(query["search_after"][0]) + 1 if "search_after" in query else 0
+        return hits[start:start + query["size"]]
+
+    with mock.patch.object(BlueBrainNexus, "_elastic", side_effect=elastic):
+        results = list(offline_nexus_store.elastic_iter(
+            '{"query": {"match_all": {}}, "from": 10}', False, 2, True, as_resource=False
+        ))
+
+    assert results == hits
+    assert [q.get("search_after") for q in queries] == [None, ["1"], ["3"]]
+    assert all(q["sort"] == [{"@id": "asc"}] and "from" not in q for q in queries)
+
+
+def test_sparql_search_iter_sorts_pages(offline_nexus_store):
+    with mock.patch.object(BlueBrainNexus, "sparql", return_value=[]) as sparql:
+        assert list(offline_nexus_store.search_iter(
+            None, {"type": "Person"}, page_size=2, prefetch=False, retrieve_source=False, order_by_id=False
+        )) == []
+
+    query = sparql.call_args.args[0]
+    assert query.endswith(" ORDER BY ?id")
+    assert sparql.call_args.kwargs["limit"] == 2
+
+
+def test_query_cache(offline_nexus_store):
+    offline_nexus_store.query_cache = QueryCache()
+    query = "SELECT ?id WHERE { ?id ?p ?o }"
+
+    with mock.patch.object(BlueBrainNexus, "_sparql", return_value=[Resource(id="a")]) as sparql:
+        first = offline_nexus_store.sparql(query, debug=False, limit=10, rewrite=False)
+        second = offline_nexus_store.sparql(query, debug=False, limit=10, rewrite=False)
+        offline_nexus_store.sparql(query, debug=False, limit=20, rewrite=False)
+        assert sparql.call_count == 2
+        assert first == second and first is not second
+
+        offline_nexus_store.clear_query_cache()
+        offline_nexus_store.sparql(query, debug=False, limit=10, rewrite=False)
+        assert sparql.call_count == 3
+
+    assert offline_nexus_store.query_cache.stats()["hits"] == 1
+    assert offline_nexus_store.query_cache.stats()["misses"] == 3
+
+
+def test_query_cache_is_per_user(offline_nexus_store, tmp_path):
+    offline_nexus_store.query_cache = QueryCache(directory=tmp_path)
+    query = "SELECT ?id WHERE { ?id ?p ?o }"
+
+    with mock.patch.object(BlueBrainNexus, "_sparql", return_value=[Resource(id="a")]) as sparql:
+        offline_nexus_store.token = "user-a"
+        offline_nexus_store.sparql(query, debug=False, limit=10, rewrite=False)
+        offline_nexus_store.query_cache = QueryCache(directory=tmp_path)
+        offline_nexus_store.token = "user-b"
+        offline_nexus_store.sparql(query, debug=False, limit=10, rewrite=False)
+        assert sparql.call_count == 2
+        offline_nexus_store.token = "user-a"
+        offline_nexus_store.sparql(query, debug=False, limit=10, rewrite=False)
+        assert sparql.call_count == 2
+
+
+def test_sparql_prepared_statement(offline_nexus_store):
+    prepared = offline_nexus_store.prepare_sparql("SELECT ?id WHERE { ?id <http://schema.org/name> $name }", False)
+
+    with mock.patch.object(BlueBrainNexus, "_sparql", return_value=[]) as sparql:
+        with mock.patch.object(offline_nexus_store, "prepare_sparql") as prepare:
+            offline_nexus_store.sparql(prepared, debug=False, limit=10, bindings={"name": "a"})
+            offline_nexus_store.sparql(prepared, debug=False, limit=10, bindings={"name": 'b"'})
+            prepare.assert_not_called()
+
+    queries = [call.args[0] for call in sparql.call_args_list]
+    assert queries[0].startswith('SELECT ?id WHERE { ?id <http://schema.org/name> "a" }')
+    assert queries[1].startswith('SELECT ?id WHERE { ?id <http://schema.org/name> "b\\"" }')
+
+
+def test_retrieve_many_in_bulk(offline_nexus_store):
+    hits = [
+        {"_source": {"@id": f"{NEXUS}/a", "_rev": 3, "_original_source": '{"@id": "a", "name": "A"}'}},
+        {"_source": {"@id": f"{NEXUS}/b", "_rev": 1, "_original_source": '{"@id": "b", "name": "B"}'}},
+    ]
+    response = mock.Mock(status_code=200)
+    response.json.return_value = {"hits": {"hits": hits}}
+
+    def fetch(ids, versions, cross_bucket, **params):
+        return [Resource(id=id_) for id_ in ids]
+
+    ids = [f"{NEXUS}/b", f"{NEXUS}/a", f"{NEXUS}/c", f"{NEXUS}/b", f"{NEXUS}/a?rev=1"]
+    with mock.patch.object(offline_nexus_store.service.http, "post", return_value=response) as post, \
+            mock.patch.object(BlueBrainNexus, "_fetch_many", side_effect=fetch) as get:
+        results = offline_nexus_store.retrieve(ids, None, bulk_retrieve=True)
+
+    assert post.call_count == 1
+    query = json.loads(post.call_args.kwargs["data"])
+    assert query["query"]["bool"]["filter"] == [{"terms": {"@id": [f"{NEXUS}/b", f"{NEXUS}/a", f"{NEXUS}/c"]}}]
+    # the resource missing from the view and the versioned one are fetched
+    assert get.call_args.args[0] == [f"{NEXUS}/c", f"{NEXUS}/a?rev=1"]
+    assert [r.name if hasattr(r, "name") else r.id for r in results] == ["B", "A", f"{NEXUS}/c", "B", f"{NEXUS}/a?rev=1"]
+    assert results[1]._store_metadata._rev == 3 and results[1]._synchronized
+    assert results[0] is not results[3]
+
+
+def test_retrieve_with_resource_cache(offline_nexus_store):
+    offline_nexus_store.resource_cache = ResourceCache()
+    id_ = f"{NEXUS}/a"
+
+    def respond(status_code, rev=None):
+        response = mock.Mock(status_code=status_code, headers={"ETag": f'"{rev}"'})
+        response.json.return_value = {"id": id_, "type": "Person", "_rev": rev}
+        return response
+
+    with mock.patch.object(
+        offline_nexus_store.service.http, "request",
+        side_effect=[respond(200, 1), respond(304), respond(200, 2)]
+    ) as request:
+        first = offline_nexus_store.retrieve(id_, None)
+        # revalidated with the ETag of the cached resource
+        second = offline_nexus_store.retrieve(id_, None)
+        assert request.call_args.kwargs["headers"][hdrs.IF_NONE_MATCH] == '"1"'
+        assert second._store_metadata._rev == 1 and second is not first
+        # served from the cache without request
+        assert offline_nexus_store.retrieve(id_, 1)._store_metadata._rev == 1
+        assert request.call_count == 2
+        offline_nexus_store.clear_resource_cache(first)
+        third = offline_nexus_store.retrieve(id_, None)
+        assert hdrs.IF_NONE_MATCH not in request.call_args.kwargs["headers"]
+        assert third._store_metadata._rev == 2
+    assert offline_nexus_store.resource_cache.stats()["hits"] == 2
+
+
+def test_download_pipelines_metadata_and_files(offline_nexus_store, tmp_path):
+    service = offline_nexus_store.service
+    service.download_concurrency = 2
+    events = []
+
+    async def handler(request: web.Request):
+        id_ = request.match_info["id"]
+        await asyncio.sleep(0.01)
+        if "ld+json" in request.headers[hdrs.ACCEPT]:
+            events.append(("metadata", id_))
+            media_type = "image/png" if id_ == "image" else "text/plain"
+            return web.json_response({"_filename": f"{id_}.txt", "_mediaType": media_type})
+        events.append(("file", id_))
+        return web.Response(text=f"content of {id_}")
+
+    async def start():
+        app = web.Application()
+        app.router.add_get("/files/{id}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        return runner, site._server.sockets[0].getsockname()[1]
+
+    runner, port = service.run_async(start())
+    ids = [str(i) for i in range(6)] + ["image"]
+    urls = [f"http://127.0.0.1:{port}/files/{id_}" for id_ in ids]
+    try:
+        downloaded = offline_nexus_store._download_files(
+            urls, [None] * len(urls), [BUCKET] * len(urls), tmp_path, False, "ts", False, "text/plain"
+        )
+    finally:
+        service.run_async(runner.cleanup())
+
+    assert downloaded == 6
+    assert sorted(p.name for p in tmp_path.iterdir()) == [f"{i}.txt" for i in range(6)]
+    assert (tmp_path / "0.txt").read_text() == "content of 0"
+    # the first files are downloaded before the metadata of the last ones are retrieved
+    assert events.index(("file", "0")) < events.index(("metadata", "image"))
+
+
+@pytest.fixture
+def files_server(offline_nexus_store):
+    content = b"0123456789" * 1000
+    requests_ = []
+    state = {"drop": 0, "pause": 0, "digest": hashlib.sha256(content).hexdigest()}
+
+    async def handler(request: web.Request):
+        requests_.append(request.headers.get(hdrs.RANGE))
+        if "ld+json" in request.headers[hdrs.ACCEPT]:
+            return web.json_response({
+                "_filename": "file.bin",
+                "_mediaType": "application/octet-stream",
+                "_digest": {"_algorithm": "SHA-256", "_value": state["digest"]},
+            })
+        start = int(request.headers[hdrs.RANGE][6:-1]) if hdrs.RANGE in request.headers else 0
+        response = web.StreamResponse(status=206 if start else 200)
+        response.content_length = len(content) - start
+        await response.prepare(request)
+        if state["drop"]:
+            # the connection is lost in the middle of the transfer
+            state["drop"] -= 1
+            await response.write(content[start:start + 3000])
+            request.transport.close()
+            return response
+        if state["pause"]:
+            for i in range(start, len(content), 2000):
+                await asyncio.sleep(state["pause"])
+                await response.write(content[i:i + 2000])
+            return response
+        await response.write(content[start:])
+        return response
+
+    async def start():
+        app = web.Application()
+        app.router.add_get("/files/{id}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        return runner, site._server.sockets[0].getsockname()[1]
+
+    service = offline_nexus_store.service
+    service.retry_policy = RetryPolicy(backoff_factor=0)
+    runner, port = service.run_async(start())
+    yield f"http://127.0.0.1:{port}/files/file", content, requests_, state
+    service.run_async(runner.cleanup())
+
+
+def download(store, url, path):
+    return store._download_files([url], [None], [BUCKET], path, True, "ts", False, None)
+
+
+def test_download_resumes_and_verifies_digest(offline_nexus_store, files_server, tmp_path):
+    url, content, requests_, state = files_server
+    state["drop"] = 1
+    assert download(offline_nexus_store, url, tmp_path) == 1
+    assert (tmp_path / "file.bin").read_bytes() == content
+    # the transfer is resumed where the connection was lost
+    assert requests_[-1].startswith("bytes=") and requests_[-1] != "bytes=0-"
+    assert [p.name for p in tmp_path.iterdir()] == ["file.bin"]
+
+    state["digest"] = "0" * 64
+    (tmp_path / "other").mkdir()
+    with pytest.raises(DownloadingError, match="digest"):
+        download(offline_nexus_store, url, tmp_path / "other")
+    assert list((tmp_path / "other").iterdir()) == []
+
+
+def test_download_is_not_bounded_by_the_session_timeout(offline_nexus_store, files_server, tmp_path):
+    url, content, requests_, state = files_server
+    state["pause"] = 0.1
+    with mock.patch.object(Service, "REQUEST_TIMEOUT", 0.2):
+        assert download(offline_nexus_store, url, tmp_path) == 1
+    assert (tmp_path / "file.bin").read_bytes() == content
+    # the file was downloaded with a single request
+    assert len(requests_) == 2
+
+
+def test_download_skips_identical_files(offline_nexus_store, files_server, tmp_path):
+    url, content, requests_, _ = files_server
+    (tmp_path / "file.bin").write_bytes(content)
+    offline_nexus_store.service.download_skip_identical = True
+    assert download(offline_nexus_store, url, tmp_path) == 1
+    # only the metadata are retrieved
+    assert len(requests_) == 1
+    (tmp_path / "file.bin").write_bytes(b"changed")
+    download(offline_nexus_store, url, tmp_path)
+    assert (tmp_path / "file.bin").read_bytes() == content
+
+
+def test_upload_deduplicates_files(offline_nexus_store, tmp_path):
+    service = offline_nexus_store.service
+    uploads = []
+
+    async def handler(request: web.Request):
+        async for part in await request.multipart():
+            content = await part.read()
+            uploads.append(content)
+            return web.json_response({
+                "@id": f"{NEXUS}/files/{part.filename}",
+                "_filename": part.filename,
+                "_digest": {"_algorithm": "SHA-256", "_value": hashlib.sha256(content).hexdigest()},
+            }, status=201)
+
+    async def start():
+        app = web.Application()
+        app.router.add_post("/files", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        return runner, site._server.sockets[0].getsockname()[1]
+
+    runner, port = service.run_async(start())
+    service.url_files = f"http://127.0.0.1:{port}/files"
+    service.upload_deduplicate = True
+    service.upload_manifest = str(tmp_path / "manifest.json")
+    files = tmp_path / "files"
+    files.mkdir()
+    for name, content in [("a", b"x"), ("b", b"x"), ("c", b"y"), ("d", b"z")]:
+        (files / name).write_bytes(content)
+    paths = sorted(files.iterdir())
+    digest_y = hashlib.sha256(b"y").hexdigest()
+    response = mock.Mock(status_code=200)
+    response.json.return_value = {"hits": {"hits": [{"_source": {
+        "@id": f"{NEXUS}/files/existing", "_digest": {"_algorithm": "SHA-256", "_value": digest_y}
+    }}]}}
+    try:
+        with mock.patch.object(offline_nexus_store.service.http, "post", return_value=response) as post:
+            uploaded = offline_nexus_store._upload_many(paths, None)
+            assert post.call_count == 1
+            # the files already uploaded are found in the manifest
+            again = offline_nexus_store._upload_many(paths, None)
+            assert post.call_count == 1
+    finally:
+        service.run_async(runner.cleanup())
+
+    assert sorted(uploads) == [b"x", b"z"]
+    assert [x["@id"] for x in uploaded] == [f"{NEXUS}/files/{x}" for x in ["a", "a", "existing", "d"]]
+    assert again == uploaded and again[0] is not again[1]
+
+
+@pytest.mark.parametrize("response, message", [
+    pytest.param(
+        lambda: web.Response(status=502, text="<html>Bad Gateway</html>", content_type="text/html"),
+        "502 Bad Gateway: <html>Bad Gateway</html>",
+        id="not-json",
+    ),
+    pytest.param(
+        lambda: web.json_response({"@type": "FileTooLarge"}, status=413),
+        "file too large",
+        id="nexus-error",
+    ),
+    pytest.param(
+        lambda: web.json_response({"reason": "unknown"}, status=500),
+        '500 Internal Server Error: {"reason": "unknown"}',
+        id="untyped-error",
+    ),
+])
+def test_upload_errors(offline_nexus_store, tmp_path, response, message):
+    service = offline_nexus_store.service
+
+    async def handler(request: web.Request):
+        await request.read()
+        return response()
+
+    async def start():
+        app = web.Application()
+        app.router.add_post("/files", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        return runner, site._server.sockets[0].getsockname()[1]
+
+    runner, port = service.run_async(start())
+    service.url_files = f"http://127.0.0.1:{port}/files"
+    path = tmp_path / "file.txt"
+    path.write_bytes(b"x")
+    try:
+        with pytest.raises(UploadingError) as e:
+            offline_nexus_store._upload_one(path, None)
+    finally:
+        service.run_async(runner.cleanup())
+
+    assert str(e.value) == message
+
+
+def test_run_async_from_running_loop(offline_nexus_store):
+    service = offline_nexus_store.service
+
+    async def answer():
+        await asyncio.sleep(0)
+        return 42
+
+    async def main():
+        # e.g. in a Jupyter notebook, without nest_asyncio
+        return service.run_async(answer())
+
+    assert asyncio.run(main()) == 42
+
+
+def test_sync_requests_reuse_kept_alive_connection(offline_nexus_store):
+    peers = []
+    bodies = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            peers.append(self.client_address)
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            bodies.append(gzip.decompress(body) if self.headers.get("Content-Encoding") == "gzip" else None)
+            payload = json.dumps({"hits": {"hits": [{"_source": {"@id": "a"}}]}}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    service = offline_nexus_store.service
+    service.http.mount("http://", GzipAdapter(min_size=200))
+    endpoint = f"http://127.0.0.1:{server.server_port}/_search"
+    ids = [f"{NEXUS}/{i}" for i in range(20)]
+    try:
+        assert _search_by_terms(service, endpoint, "@id", ids, ["@id"]) == [{"@id": "a"}]
+        assert _search_by_terms(service, endpoint, "@id", ids[:1], ["@id"]) == [{"@id": "a"}]
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert len(peers) == 2 and len(set(peers)) == 1
+    # only the body large enough is compressed
+    assert json.loads(bodies[0])["query"]["bool"]["filter"] == [{"terms": {"@id": ids}}]
+    assert bodies[1] is None
+
+
+def test_query_iter_streams_results(offline_nexus_store):
+    def respond(document):
+        data = json.dumps(document).encode()
+        response = mock.Mock(status_code=200)
+        response.iter_content.side_effect = lambda size: (data[i:i + 7] for i in range(0, len(data), 7))
+        return response
+
+    bindings = [{"name": {"type": "literal", "value": name}} for name in ("a", "b", "c")]
+    hits = [{"_id": name, "_source": {"@id": name, "name": name}, "sort": [name]} for name in ("a", "b", "c")]
+    http = offline_nexus_store.service.http
+    with mock.patch.object(http, "post", return_value=respond({"results": {"bindings": bindings}})) as post:
+        results = offline_nexus_store.sparql_iter(
+            "SELECT ?name WHERE { ?s ?p ?name }", False, 2, True, rewrite=False, stream=True
+        )
+        assert post.call_count == 0
+        assert [r.name for r in results] == ["a", "b", "c"]
+    # the query is sent once, as is
+    assert post.call_count == 1 and post.call_args.kwargs["stream"]
+    assert post.call_args.kwargs["data"] == "SELECT ?name WHERE { ?s ?p ?name }"
+
+    pages = [respond({"hits": {"hits": hits[:2]}}), respond({"hits": {"hits": hits[2:]}})]
+    with mock.patch.object(http, "post", side_effect=pages) as post:
+        results = list(offline_nexus_store.elastic_iter('{"query": {"match_all": {}}}', False, 2, True, stream=True))
+    assert [r.name for r in results] == ["a", "b", "c"]
+    assert json.loads(post.call_args.kwargs["data"])["search_after"] == ["b"]
+    assert all(p.close.called for p in pages)
+
+
+def test_sparql_as_dataframe(offline_nexus_store):
+    response = mock.Mock(status_code=200)
+    response.json.return_value = {
+        "head": {"vars": ["id", "age"]},
+        "results": {"bindings": [
+            {
+                "id": {"type": "uri", "value": f"{NEXUS}/a"},
+                "age": {"type": "literal", "datatype": "http://www.w3.org/2001/XMLSchema#integer", "value": "3"},
+            },
+            {"id": {"type": "uri", "value": f"{NEXUS}/b"}},
+        ]},
+    }
+    query = "SELECT ?id ?age WHERE { ?id <https://schema.org/age> ?age }"
+    with mock.patch.object(offline_nexus_store.service.http, "post", return_value=response), \
+            mock.patch("kgforge.core.commons.sparql_query_builder.SPARQLQueryBuilder.build_resource_from_select_query") as build:
+        df = offline_nexus_store.sparql(query, False, rewrite=False, as_dataframe=True)
+    build.assert_not_called()
+    assert list(df["id"]) == [f"{NEXUS}/a", f"{NEXUS}/b"]
+    assert str(df["age"].dtype) == "Int64" and df["age"][0] == 3 and df["age"].isna()[1]
+    with pytest.raises(ValueError):
+        offline_nexus_store.sparql("CONSTRUCT { ?s ?p ?o } WHERE { ?s ?p ?o }", False, rewrite=False, as_dataframe=True)
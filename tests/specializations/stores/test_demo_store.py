@@ -15,7 +15,7 @@
 from pytest_bdd import given, parsers, scenarios, then, when
 
 from kgforge.specializations.stores.demo_store import DemoStore
-from tests.conftest import check_report, do
+from tests.conftest import check_report, do, resource
 
 # TODO To be port to the generic parameterizable test suite for stores in test_stores.py. DKE-135.
 
@@ -64,3 +64,23 @@ def register_exception(monkeypatch, capsys, store, data):
 def check_metadata(data, metadata):
     def fun(x): assert str(x._store_metadata) == metadata
     do(fun, data)
+
+
+def test_register_stream(valid_resources):
+    store = DemoStore()
+    stream = store.register_stream((x for x in valid_resources), None, 1)
+    registered = list(stream)
+    assert registered == valid_resources
+    for x in registered:
+        assert x._synchronized is True
+        assert x._last_action.succeeded is True
+
+
+def test_search_iter():
+    store = DemoStore()
+    data = [resource(True, i) for i in range(5)]
+    store.register(data)
+    found = list(store.search_iter(None, {"type": "Person"}, page_size=2, prefetch=True))
+    assert sorted(x.id for x in found) == sorted(x.id for x in data)
+    assert [x.id for x in store.search_iter(None, {"type": "Person"}, page_size=2, prefetch=False, offset=3)] \
+        == [x.id for x in found[3:]]